@@ -5,18 +5,141 @@ Name: Arowosegbe Victor\n
 Email: Iyanuvicky@gmail.com\n
 GitHub: https://github.com/Iyanuvicky22/projects
 """
-import json
+import dataclasses
+import hashlib
 import os
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from processor import load_data as ld
 from processor import clean as cl
 from processor import aggregate as ag
+from processor import cache
+from processor import lazy
+from processor import chunked
+from processor import cube as cb
+from processor import append as ap
+from processor import query as qy
+from processor import report as rp
+from processor import respond as rsp
+from processor import sharded
+from processor import benchmark as bm
+from processor import export as ex
+from processor import dtypes as dt
+from processor import stats as st
+from processor import metrics as mt
+from processor.store import CleanedStore
+from processor.registry import DatasetRegistry
+from processor.jobs import JobManager, validate_params
 
-app = FastAPI()
 
-RAW_PANDAS_DF = None
-RAW_POLARS_DF = None
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Application startup and shutdown.
+
+    With PRELOAD_DATA=1 the datasets start loading in the
+    background at startup; see /ready.
+    """
+    if PRELOAD_DATA:
+        DATASETS.preload()
+    yield
+    DATASETS.shutdown()
+    JOBS.shutdown()
+    sharded.shutdown()
+    rp.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+OPTIMIZE_DTYPES = os.environ.get("OPTIMIZE_DTYPES", "0") == "1"
+TYPED_TRANSFORM = os.environ.get("TYPED_TRANSFORM", "0") == "1"
+PRELOAD_DATA = os.environ.get("PRELOAD_DATA", "0") == "1"
+STORE = CleanedStore()
+APPENDER = ap.Appender(typed=TYPED_TRANSFORM)
+APPEND_LOCK = threading.Lock()
+JOBS = JobManager()
+MODES = ("eager", "lazy", "chunked", "sharded")
+# Processing modes that read the source file instead of the
+# loaded frames.
+SOURCE_MODES = ("lazy", "chunked")
+# Media type of each cleaned dataset export format.
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/octet-stream",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def load_datasets(path: str):
+    """
+    Load the raw datasets of both engines.
+
+    Both sheets of the workbook are loaded in parallel and
+    unioned; per-sheet timings are kept for /load-report. The
+    revenue cube is built from the cleaned polars data here, so it
+    is swapped in with the frames it belongs to. With
+    QUANTILE_EPSILON set, a quantile sketch per numeric column of
+    the NA-handled rows is kept as well; appends extend it, and
+    'cap' and 'mean' take their outlier limits from it.
+
+    Args:
+        path (str): Source workbook.
+    """
+    frames, reports = {}, {}
+    for engine in ("pandas", "polars"):
+        df, reports[engine] = ld.read_all_sheets(engine, path)
+        frames[engine] = dt.optimize(df) if OPTIMIZE_DTYPES else df
+    version = cache.source_version(path)
+    if OPTIMIZE_DTYPES:
+        # Optimized frames have other dtypes, so they get their own keys.
+        version = hashlib.sha256(f"{version}|dtypes".encode()).hexdigest()
+    if TYPED_TRANSFORM:
+        version = hashlib.sha256(f"{version}|typed".encode()).hexdigest()
+    if st.QUANTILE_EPSILON:
+        # Approximate quartiles give other outlier limits.
+        version = hashlib.sha256(f"{version}|q{st.QUANTILE_EPSILON}".encode()).hexdigest()
+    sketches = {}
+    if st.QUANTILE_EPSILON:
+        sketches = {engine: st.sketch_columns(chunked.NaCarry(engine)(df),
+                                              st.QUANTILE_EPSILON)
+                    for engine, df in frames.items()}
+    # Nothing is appended to a fresh load, so no frozen limits apply.
+    cleaned = STORE.get(("polars", "drop", version), lambda: cl.clean_pipeline(
+        frames["polars"], "drop", typed=TYPED_TRANSFORM))
+    derived = {"cube": cb.Cube(cleaned, version=version), "sketches": sketches}
+    return frames, reports, version, derived
+
+
+def forget_replaced(old, new):
+    """
+    Reload callback: batch cleaning state and cleaned frames belong
+    to the replaced dataset.
+
+    Args:
+        old (Dataset): Replaced dataset.
+        new (Dataset): Dataset loaded in its place.
+    """
+    APPENDER.reset()
+    if old.version != new.version:
+        STORE.drop_version(old.version)
+
+
+DATASETS = DatasetRegistry(ld.DATA_FILE, load_datasets)
+DATASETS.on_reload(forget_replaced)
+
+
+class JobRequest(BaseModel):
+    """
+    Body of POST /jobs.
+    """
+
+    kind: str
+    params: dict = {}
 
 
 @app.get("/home")
@@ -27,67 +150,155 @@ def home():
     return """Welcome to: Data processing packages comparison (pandas vs polars) API project"""
 
 
+@app.get("/health")
+async def health():
+    """
+    Liveness check; never waits on processing work.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness check: 200 once the datasets are loaded, 503 before.
+    """
+    status = DATASETS.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Per-stage latency histograms, row counts and peak memory in the
+    Prometheus text format.
+    """
+    return Response(mt.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def data_loading():
     """
     API call to load datasets.
+
+    Returns the current Dataset of the registry; concurrent first
+    calls share one load.
     """
-    global RAW_PANDAS_DF, RAW_POLARS_DF
-    if RAW_PANDAS_DF is None:
-        pd_df = ld.read_pandas()
-        RAW_PANDAS_DF = pd_df
-    if RAW_POLARS_DF is None:
-        pl_df = ld.read_polars()
-        RAW_POLARS_DF = pl_df
+    return DATASETS.get()
 
 
-@app.get("/Data Processing")
-async def processing():
+def cleaned_data(engine: str, method: str, data=None):
     """
-    API call to process the data sets.
+    Cleaned and transformed dataset for one engine and outlier
+    method, computed once per raw data version.
+
+    Args:
+        engine (str): 'pandas' or 'polars'.
+        method (str): Outlier method ('cap', 'drop' or 'mean').
+        data (Dataset, optional): Dataset to clean; the current one
+        by default.
     """
+    data = data or data_loading()
+    raw = data.frames[engine]
+    return STORE.get(
+        (engine, method, data.version),
+        lambda: APPENDER.clean_frame(engine, raw, method,
+                                     data.derived["sketches"].get(engine)),
+    )
 
-    try:
-        data_loading()
-        pd_na_free = cl.pd_na_handler(RAW_PANDAS_DF)
-        cl.viz_data(pd_na_free)
-        pd_df_clean = cl.handle_outlier_pandas(pd_na_free, col="Quantity",
-                                               method="cap")
-        pd_df_clean = cl.handle_outlier_pandas(
-            pd_na_free, col="Price", method="cap"
-        )
-        pd_df_trans = cl.transform_df(pd_df_clean)
-        cl.viz_data(pd_df_trans)
-        clean_pandas_df = pd_df_trans
 
-        pandas_aggregate = ag.aggregate_pandas(clean_pandas_df)
+def data_cube() -> cb.Cube:
+    """
+    Revenue rollup cube of the cleaned polars dataset, built with
+    each load and replaced as a whole by appends.
+    """
+    return data_loading().derived["cube"]
+
 
-        json_pandas = pandas_aggregate.to_json()
+@app.get("/Data Processing")
+def processing(request: Request, mode: str = "eager", report: bool = False,
+               report_format: str = "html", format: str = "json"):
+    """
+    API call to process the data sets.
 
-        # Polars
-        pl_na_free = cl.pl_na_handler(RAW_POLARS_DF)
-        cl.viz_data(pl_na_free)
-        pl_df_clean = cl.handle_outlier_polars(
-            pl_na_free, col="Quantity", method="drop"
-        )
-        pl_df_clean = cl.handle_outlier_polars(
-            pl_na_free, col="Price", method="drop"
-        )
-        pl_df_trans = cl.transform_df(pl_df_clean)
-        cl.viz_data(pl_df_trans)
-        clean_polars_df = pl_df_trans
+    mode='lazy' runs the polars side as a single lazy query
+    over the columnar cache instead of eager steps.
+    mode='chunked' streams both engines through the pipeline in
+    row batches, for datasets larger than memory.
+    mode='sharded' runs the pandas side in row shards across
+    SHARD_WORKERS processes.
+    mode='lazy' and 'chunked' read the source file, so they answer
+    409 once rows were appended to the loaded data.
+    report=True queues box plots of the cleaned data for
+    background rendering; see /reports. It needs mode='eager', the
+    only mode that keeps cleaned frames of both engines.
+    format='arrow' sends both aggregates as one Arrow IPC table.
+    The body is compressed as the Accept-Encoding header allows;
+    the Server-Timing header reports the serialization time.
+    """
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode: {mode}")
+    if format not in rsp.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    if report_format not in rp.FORMATS:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown report format: {report_format}")
+    if report and mode != "eager":
+        raise HTTPException(status_code=400,
+                            detail=f"report=true needs mode=eager, not mode={mode}")
+    if mode in SOURCE_MODES and DATASETS.status()["appended_rows"]:
+        raise HTTPException(status_code=409, detail=(
+            f"mode={mode} reads the source file, which lacks the appended rows; "
+            "use mode=eager or mode=sharded"))
 
-        polars_aggregate = ag.aggregate_polars(clean_polars_df)
+    try:
+        data = None if mode == "chunked" else data_loading()
+        if mode == "chunked":
+            pandas_aggregate = chunked.run_chunked(ld.DATA_FILE, "pandas", "cap",
+                                                   typed=TYPED_TRANSFORM)
+        elif mode == "sharded":
+            stats = APPENDER.frozen("pandas", "cap")
+            if stats is None and data.derived["sketches"]:
+                # The same limits as the eager frames, without a pass.
+                stats = ap.pipeline_stats(data.frames["pandas"], "cap",
+                                          data.derived["sketches"]["pandas"])
+            pandas_aggregate = sharded.run_sharded(
+                data.frames["pandas"], "cap", typed=TYPED_TRANSFORM, stats=stats,
+            )
+        else:
+            clean_pandas_df = cleaned_data("pandas", "cap", data)
+            if report:
+                rp.submit_report(clean_pandas_df, data.version, "pandas-cap",
+                                 fmt=report_format)
+            pandas_aggregate = ag.aggregate_pandas(clean_pandas_df)
 
-        json_polars = polars_aggregate.write_json()
+        # Polars
+        if mode == "chunked":
+            polars_aggregate = chunked.run_chunked(ld.DATA_FILE, "polars", "drop",
+                                                   typed=TYPED_TRANSFORM)
+        elif mode == "lazy":
+            polars_aggregate = lazy.run_pipeline(ld.DATA_FILE, method="drop",
+                                                 typed=TYPED_TRANSFORM)
+        else:
+            clean_polars_df = cleaned_data("polars", "drop", data)
+            polars_aggregate = ag.aggregate_polars(clean_polars_df)
+        if report:
+            rp.submit_report(cleaned_data("polars", "drop", data), data.version,
+                             "polars-drop", fmt=report_format)
 
-        return {
-            "message": "Data Processing Results",
-            "success": True,
-            "data": {
-                "pandas": json.loads(json_pandas),
-                "polars": json.loads(json_polars),
-            },
-        }
+        start = time.perf_counter()
+        if format == "arrow":
+            body = rsp.arrow_aggregates(
+                {"pandas": pandas_aggregate, "polars": polars_aggregate}
+            )
+        else:
+            body = rsp.envelope("Data Processing Results", {
+                "pandas": rsp.frame_json(pandas_aggregate),
+                "polars": rsp.frame_json(polars_aggregate),
+            })
+        serialized = time.perf_counter()
+        encoding = rsp.negotiate(request.headers.get("accept-encoding"), len(body))
+        body = rsp.compress(body, encoding)
+        compressed = time.perf_counter()
     except Exception as e:
         print(f"Error Returned: {e}")
         return {
@@ -95,19 +306,323 @@ async def processing():
             "success": False,
             "next step": f"Resolve error {e}",
         }
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Server-Timing": (
+            f"serialize;dur={(serialized - start) * 1000:.3f}, "
+            f"compress;dur={(compressed - serialized) * 1000:.3f}"
+        ),
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=rsp.MEDIA_TYPES[format], headers=headers)
+
+
+def append_rows(body: bytes, fmt: str) -> dict:
+    """
+    Append a batch to the loaded datasets and extend every cleaned
+    frame in memory and the revenue cube with its cleaned rows.
+
+    Everything that can fail runs before the appended dataset, with
+    a new cube, is swapped in; the store and the cleaning state are
+    only updated once it is.
+
+    Args:
+        body (bytes): Uploaded batch.
+        fmt (str): 'csv', 'parquet' or 'json'.
+    """
+    with APPEND_LOCK:
+        data = data_loading()
+        raws = data.frames
+        batches, frames = {}, {}
+        for engine, raw in raws.items():
+            batch = ap.read_batch(body, fmt, raw)
+            if OPTIMIZE_DTYPES:
+                frames[engine] = dt.extend(raw, batch)
+                # Rows are cleaned with the dtypes they are stored with.
+                batch = frames[engine].tail(len(batch))
+            else:
+                frames[engine] = ap.concat([raw, batch])
+            batches[engine] = batch
+        version = ap.next_version(data.version, body)
+        extended, states, cube, sketches = {}, {}, None, {}
+        for engine, batch in batches.items():
+            methods = [m for m in cl.METHODS if (engine, m, data.version) in STORE]
+            if engine == "polars" and "drop" not in methods:
+                methods.append("drop")
+            kept = data.derived["sketches"].get(engine)
+            cleaned, states[engine] = APPENDER.prepare(engine, batch, raws[engine],
+                                                       methods, kept)
+            for method, rows in cleaned.items():
+                old = STORE.get((engine, method, data.version),
+                                lambda: APPENDER.clean_frame(engine, raws[engine],
+                                                             method, kept))
+                extended[engine, method, version] = ap.concat([old, rows])
+            if engine == "polars":
+                cube = data.derived["cube"].appended(cleaned["drop"], version)
+            if kept:
+                sketches[engine] = states[engine].sketches
+        appended = dataclasses.replace(
+            data, frames=frames, version=version,
+            appended_rows=data.appended_rows + len(batches["pandas"]),
+            derived={**data.derived, "cube": cube, "sketches": sketches},
+        )
+
+        def publish():
+            for engine, state in states.items():
+                APPENDER.commit(engine, state)
+            for key, frame in extended.items():
+                STORE.put(key, frame)
+
+        if not DATASETS.swap(data, appended, publish):
+            raise HTTPException(status_code=409,
+                                detail="The source file was reloaded; append again")
+        STORE.drop_version(data.version)
+    return {
+        "rows": len(batches["pandas"]),
+        "version": version,
+        "updated": [f"{engine}-{method}" for engine, method, _ in extended] + ["cube"],
+        "total_rows": {"pandas": len(frames["pandas"]),
+                       "polars": frames["polars"].height},
+    }
+
+
+@app.post("/append")
+async def append(request: Request, format: str | None = None):
+    """
+    Append new invoice rows sent as the request body.
+
+    The format is taken from ?format=csv|parquet|json or the
+    Content-Type header. Rows are cleaned with the outlier limits
+    of the loaded data; cleaned frames and the cube are extended
+    instead of rebuilt.
+    """
+    body = await request.body()
+    try:
+        fmt = ap.batch_format(request.headers.get("content-type"), format)
+        result = await run_in_threadpool(append_rows, body, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {"message": "Append Results", **result}
+
+
+@app.get("/cube")
+def cube_query(by: str = "", NameOfDay: str | None = None,
+               Hour: str | None = None, Month: str | None = None,
+               Country: str | None = None, StockCode: str | None = None):
+    """
+    Revenue sum, mean and count from the rollup cube.
+
+    by is a comma-separated list of dimensions; each dimension
+    parameter restricts it to a comma-separated list of values,
+    e.g. /cube?by=Hour&Country=France,Germany&Month=12
+    """
+    start = time.perf_counter()
+    filters = {
+        dim: [value.strip() for value in values.split(",")]
+        for dim, values in zip(
+            cb.DIMENSIONS, (NameOfDay, Hour, Month, Country, StockCode)
+        )
+        if values
+    }
+    data = data_cube()
+    try:
+        result, cuboid = data.query(
+            [dim.strip() for dim in by.split(",") if dim.strip()], filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {
+        "message": "Cube Query",
+        "cuboid": cuboid,
+        "filters": filters,
+        "rows": result.height,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        "data": result.to_dicts(),
+    }
+
+
+@app.get("/query")
+def query_rows(start: str | None = None, end: str | None = None,
+               country: str | None = None, stock_code: str | None = None,
+               customer_id: str | None = None, columns: str | None = None,
+               limit: int = 100, offset: int = 0, engine: str = "polars"):
+    """
+    Page of cleaned rows filtered by InvoiceDate range (start, end,
+    inclusive ISO dates), Country, StockCode and Customer ID
+    (comma-separated values), with the chosen columns,
+    e.g. /query?start=2010-12-01&end=2010-12-01&country=France&limit=50
+    Only row groups whose statistics can match are read.
+    """
+    methods = {"pandas": "cap", "polars": "drop"}
+    if engine not in methods:
+        raise HTTPException(status_code=400, detail=f"Unknown engine: {engine}")
+    data = data_loading()
+    path = qy.layout_path(data.version, engine, methods[engine])
+    qy.ensure_layout(path, lambda: cleaned_data(engine, methods[engine], data))
+    filters = {
+        column: [value.strip() for value in values.split(",")]
+        for column, values in zip(qy.FILTER_COLUMNS.values(),
+                                  (country, stock_code, customer_id))
+        if values
+    }
+    start_time = time.perf_counter()
+    try:
+        result = qy.run_query(
+            path, start, end, filters,
+            columns=[c.strip() for c in columns.split(",")] if columns else None,
+            limit=limit, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {
+        "message": "Query Results",
+        "engine": engine,
+        "filters": filters,
+        "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 3),
+        **result,
+    }
+
+
+@app.get("/load-report")
+def load_report():
+    """
+    Per-sheet load timings of the combined dataset.
+    """
+    data = data_loading()
+    return {
+        "message": "Load Report",
+        "sheets": [sheet["name"] for sheet in data.reports["pandas"]["sheets"]],
+        "data": data.reports,
+    }
+
+
+@app.get("/reports")
+def reports():
+    """
+    Rendered box plot reports per dataset version.
+    """
+    return {"message": "Reports", **rp.list_reports()}
+
+
+@app.get("/reports/{folder}/{filename}")
+def report_file(folder: str, filename: str):
+    """
+    Serve one rendered report file.
+    """
+    path = rp.find_report(folder, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return FileResponse(path)
+
+
+@app.get("/memory-report")
+def memory_report(engine: str = "pandas", stage: str = "raw",
+                  method: str = "cap"):
+    """
+    Bytes per column before and after the memory-optimized
+    dtype profile, for the loaded or a cleaned dataset. Reports on
+    the frames already in memory: 'cleaned' answers 404 until that
+    engine and method were cleaned, e.g. by /Data Processing.
+    """
+    if (engine not in ("pandas", "polars") or stage not in ("raw", "cleaned")
+            or method not in cl.METHODS):
+        raise HTTPException(status_code=400, detail="Unknown engine, stage or method")
+    data = data_loading()
+    if stage == "raw":
+        df = data.frames[engine]
+    else:
+        df = STORE.peek((engine, method, data.version))
+        if df is None:
+            raise HTTPException(status_code=404, detail=(
+                f"No cleaned {engine} data for method={method} yet"))
+    return {
+        "message": "Memory Report",
+        "engine": engine,
+        "stage": stage,
+        "profile_enabled": OPTIMIZE_DTYPES,
+        **dt.memory_report(df),
+    }
+
+
+@app.get("/transform-report")
+def transform_report(engines: str = "pandas,polars", iterations: int = 5,
+                     warmup: int = 1, method: str = "cap"):
+    """
+    Transform stage time and size of the derived date columns,
+    current versus typed derivation (TYPED_TRANSFORM=1).
+    """
+    try:
+        data = bm.bench_transform(
+            ld.DATA_FILE, engines=tuple(e.strip() for e in engines.split(",")),
+            method=method, iterations=iterations, warmup=warmup,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {
+        "message": "Transform Report",
+        "typed_enabled": TYPED_TRANSFORM,
+        "data": data,
+    }
+
+
+@app.get("/sharded-report")
+def sharded_report(cores: str = "1,2,4", iterations: int = 3, warmup: int = 1,
+                   method: str = "cap"):
+    """
+    Time of the pandas pipeline eager and sharded over each number
+    of worker processes, with the speedup per core count.
+    """
+    try:
+        counts = tuple(int(c) for c in cores.split(","))
+        data = bm.bench_sharded(ld.DATA_FILE, cores=counts, method=method,
+                                iterations=iterations, warmup=warmup)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {"message": "Sharded Execution Report", "data": data}
+
+
+@app.get("/lazy-plan")
+def lazy_plan(optimized: bool = True):
+    """
+    Query plan of the lazy polars pipeline.
+    """
+    return {
+        "message": "Lazy Pipeline Plan",
+        "optimized": optimized,
+        "plan": lazy.explain(ld.DATA_FILE, method="drop", optimized=optimized,
+                             typed=TYPED_TRANSFORM),
+    }
 
 
 @app.get("/Time Comparison")
-async def time_compare():
+def time_compare(stages: str = ",".join(bm.STAGES),
+                 engines: str = ",".join(bm.ENGINES), iterations: int = 5,
+                 warmup: int = 1, cold: int = 1, method: str = "cap"):
     """
     This function show the time comparison
-    between pandas and polars.
+    between the engines (pandas, polars, duckdb), stage by stage.
+
+    stages and engines are comma-separated lists. Cold runs
+    load the raw Excel file; warm runs use the columnar cache.
+    Stage outputs are checked against the first engine's. Run
+    counts have the limits of benchmark jobs.
     """
-    data_loading()
+    params = {
+        "engines": [e.strip() for e in engines.split(",")],
+        "stages": [s.strip() for s in stages.split(",")],
+        "iterations": iterations, "warmup": warmup, "cold": cold, "method": method,
+    }
+    try:
+        validate_params("benchmark", params)
+        time_comp = bm.run_benchmark(
+            ld.DATA_FILE,
+            engines=tuple(params["engines"]), stages=tuple(params["stages"]),
+            iterations=iterations, warmup=warmup, cold=cold, method=method,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
-    # Loading time comparison
-    time_comp = ld.compare_time(ld.read_pandas, ld.read_polars)
-    
     return {
         "message": "Time Comparison Results",
         "status": "Success",
@@ -115,60 +630,154 @@ async def time_compare():
     }
 
 
-@app.get("/download-json")
-def download_json():
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
     """
-    Download the processed data as a JSON file
+    Submit a 'processing' or 'benchmark' job to the process pool.
+    Identical jobs share one run and its cached result.
+
+    Jobs re-read the source file in their worker, so they are keyed
+    by the loaded version and refused once rows were appended.
+    Processing jobs run with the server's TYPED_TRANSFORM,
+    OPTIMIZE_DTYPES and QUANTILE_EPSILON.
     """
+    data = data_loading()
+    if data.appended_rows:
+        raise HTTPException(status_code=409, detail=(
+            "Jobs read the source file, which lacks the appended rows"))
+    config = {}
+    if request.kind == "processing":
+        config = {"typed": TYPED_TRANSFORM, "optimize": OPTIMIZE_DTYPES,
+                  "epsilon": st.QUANTILE_EPSILON}
     try:
-        data_loading()
-        pl_na_free = cl.pl_na_handler(RAW_POLARS_DF)
-        pl_df_clean = cl.handle_outlier_polars(
-            pl_na_free, col="Quantity", method="drop"
-        )
-        pl_df_clean = cl.handle_outlier_polars(
-            pl_na_free, col="Price", method="drop"
-        )
-        pl_df_trans = cl.transform_df(pl_df_clean)
-        clean_polars_df = pl_df_trans
-        file_path = "polars_data.json"
-        clean_polars_df.write_json(file_path)
+        job = JOBS.submit(request.kind, request.params, data.version, config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {**job, "status_url": f"/jobs/{job['id']}",
+            "result_url": f"/jobs/{job['id']}/result"}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """
+    Status of a submitted job.
+    """
+    job = JOBS.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
 
-        if not os.path.exists(file_path):
-            return f"File not found: {file_path}"
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """
+    Result of a finished job.
+    """
+    job = JOBS.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return {"message": "Job Result", "job": job, "data": JOBS.result(job_id)}
+
+
+def _artifact(engine: str, method: str, fmt: str, data):
+    """
+    Key, location and chunk producer of a cleaned dataset export.
+    """
+    key = ex.artifact_key(data.version, engine, method, fmt)
+    writers = {"ndjson": ex.iter_ndjson, "arrow": ex.iter_arrow_ipc,
+               "parquet": ex.iter_parquet}
+
+    def chunks():
+        return writers[fmt](cleaned_data(engine, method, data))
+
+    return key, ex.artifact_path(key, fmt), chunks
+
+
+def _download(request: Request, engine: str, method: str, fmt: str):
+    """
+    Stream a cleaned dataset as NDJSON, Arrow IPC or Parquet, stored
+    as a content-addressed artifact on first use.
+
+    A client holding the current version (If-None-Match) gets a 304.
+    Stored artifacts answer Range and HEAD requests; those build the
+    artifact first, since ranges need the finished file.
+    """
+    data = data_loading()
+    key, path, chunks = _artifact(engine, method, fmt, data)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "no-cache"}
+    if ex.etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    filename = f"{engine}_data.{fmt}"
+    media_type = MEDIA_TYPES[fmt]
+    if not os.path.exists(path):
+        if request.method == "HEAD" or "range" in request.headers:
+            ex.ensure_artifact(path, chunks)
+        else:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return StreamingResponse(ex.stream_artifact(path, chunks),
+                                     media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, filename=filename,
+                        headers=headers)
+
+
+@app.api_route("/download-json", methods=["GET", "HEAD"])
+def download_json(request: Request):
+    """
+    Download the processed data as newline-delimited JSON,
+    streamed in row batches.
+    """
+    try:
+        return _download(request, "polars", "drop", "ndjson")
     except Exception as e:
         return f"Error while downloading file: {e}"
 
-    return FileResponse(
-        file_path, media_type="application/json", filename="polars_data.json"
-    )
+
+@app.api_route("/download-parquet", methods=["GET", "HEAD"])
+def download_parquet(request: Request):
+    """
+    Download the processed data as a Parquet file,
+    streamed one row group at a time. Supports Range, If-Range and
+    If-None-Match; see /download-parquet/metadata for the byte
+    ranges of row groups and columns.
+    """
+    try:
+        return _download(request, "pandas", "cap", "parquet")
+    except Exception as e:
+        return f"Error while downloading file: {e}"
 
 
-@app.get("/download-parquet")
-def download_parquet():
+@app.get("/download-parquet/metadata")
+def download_parquet_metadata():
     """
-    Download the processed data as a Parquet file
+    Footer metadata of the Parquet download: schema, row groups and
+    the byte range and statistics of every column chunk, so remote
+    readers can fetch only what they need with Range requests.
     """
+    data = data_loading()
+    key, path, chunks = _artifact("pandas", "cap", "parquet", data)
+    ex.ensure_artifact(path, chunks)
+    return {
+        "message": "Parquet Metadata",
+        "url": "/download-parquet",
+        "etag": f'"{key}"',
+        "data": ex.parquet_footer(path),
+    }
+
+
+@app.api_route("/download-arrow", methods=["GET", "HEAD"])
+def download_arrow(request: Request, engine: str = "polars"):
+    """
+    Download the processed data as an Arrow IPC file,
+    streamed one record batch at a time.
+    """
+    methods = {"pandas": "cap", "polars": "drop"}
+    if engine not in methods:
+        raise HTTPException(status_code=400, detail=f"Unknown engine: {engine}")
     try:
-        data_loading()
-        pd_na_free = cl.pd_na_handler(RAW_PANDAS_DF)
-        pd_df_clean = cl.handle_outlier_pandas(pd_na_free, col="Quantity",
-                                               method="cap")
-        pd_df_clean = cl.handle_outlier_pandas(
-            pd_na_free, col="Price", method="cap"
-        )
-        pd_df_trans = cl.transform_df(pd_df_clean)
-        pd_df_trans["Description"] = pd_df_trans["Description"].astype(str)
-        clean_pandas_df = pd_df_trans
-        file_path = "pandas_data.parquet"
-        clean_pandas_df.to_parquet(file_path, engine="pyarrow",
-                                   compression="snappy")
-
-        if not os.path.exists(file_path):
-            return f"File not found: {file_path}"
+        return _download(request, engine, methods[engine], "arrow")
     except Exception as e:
         return f"Error while downloading file: {e}"
-    return FileResponse(
-        file_path, media_type="application/octet-stream",
-        filename="pandas_data.parquet"
-    )
@@ -2,6 +2,9 @@
 This function perform aggregation
 of the dataset using pandas and polars.
 
+Every aggregate lists the days in weekday order, whichever mode
+and NameOfDay dtype produced it.
+
 Name: Arowosegbe Victor\n
 Email: Iyanuvicky@gmail.com\n
 GitHub: https://github.com/Iyanuvicky22/projects
@@ -9,8 +12,22 @@ GitHub: https://github.com/Iyanuvicky22/projects
 
 import pandas as pd
 import polars as pl
+from processor import metrics as mt
+from processor.clean import DAY_NAMES
+
+
+def _weekdays_pandas(res: pd.DataFrame) -> pd.DataFrame:
+    if isinstance(res.index, pd.CategoricalIndex):
+        # Typed NameOfDay: the categories are already in weekday order.
+        return res
+    return res.reindex([day for day in DAY_NAMES if day in res.index])
+
 
+def _weekdays_polars(res: pl.DataFrame | pl.LazyFrame):
+    return res.sort(pl.col("NameOfDay").cast(pl.String).cast(pl.Enum(DAY_NAMES)))
 
+
+@mt.instrument("aggregate")
 def aggregate_pandas(df: pd.DataFrame):
     """
     Aggregation function using pandas
@@ -19,29 +36,93 @@ def aggregate_pandas(df: pd.DataFrame):
         df (pd.DataFrame): _description_
     """
     try:
-        return round(
-            df.groupby(["NameOfDay"])["Price"].agg(["sum", "mean", "count"]), 2
-        )
+        return _weekdays_pandas(round(
+            df.groupby(["NameOfDay"], observed=True)["Price"].agg(
+                ["sum", "mean", "count"]
+            ), 2
+        ))
     except Exception as e:
         print(f"Error while aggregating Polars DataFrame: {e}")
         return df
 
 
-def aggregate_polars(df: pl.DataFrame):
+@mt.instrument("aggregate")
+def aggregate_polars(df: pl.DataFrame | pl.LazyFrame):
     """
     Aggregation function using pandas
 
     Args:
-        df (pl.DataFrame): _description_
+        df (pl.DataFrame | pl.LazyFrame): _description_
     """
     try:
-        return df.group_by("NameOfDay").agg(
+        return _weekdays_polars(df.group_by("NameOfDay").agg(
             [
                 pl.col("Price").sum().alias("sum"),
                 pl.col("Price").mean().alias("mean"),
                 pl.col("Price").count().alias("count"),
             ]
-        )
+        ))
     except Exception as e:
         print(f"Error while aggregating Polars DataFrame: {e}")
         return df
+
+
+@mt.instrument("aggregate")
+def partial_aggregate_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Price sum and count per day of one row batch.
+    Partials of all batches are combined with merge_partials_pandas.
+
+    Args:
+        df (pd.DataFrame): Cleaned and transformed batch.
+    """
+    return df.groupby("NameOfDay", observed=True)["Price"].agg(["sum", "count"])
+
+
+def merge_partials_pandas(partials: list) -> pd.DataFrame:
+    """
+    Combine batch partials into the result of aggregate_pandas.
+
+    Args:
+        partials (list): Frames from partial_aggregate_pandas.
+    """
+    merged = pd.concat(partials).groupby(level=0, observed=True).sum()
+    merged["mean"] = merged["sum"] / merged["count"]
+    return _weekdays_pandas(round(merged[["sum", "mean", "count"]], 2))
+
+
+@mt.instrument("aggregate")
+def partial_aggregate_polars(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Price sum and count per day of one row batch.
+    Partials of all batches are combined with merge_partials_polars.
+
+    Args:
+        df (pl.DataFrame): Cleaned and transformed batch.
+    """
+    return df.group_by("NameOfDay").agg(
+        [
+            pl.col("Price").sum().alias("sum"),
+            pl.col("Price").count().alias("count"),
+        ]
+    )
+
+
+def merge_partials_polars(partials: list) -> pl.DataFrame:
+    """
+    Combine batch partials into the result of aggregate_polars.
+
+    Args:
+        partials (list): Frames from partial_aggregate_polars.
+    """
+    return _weekdays_polars(
+        pl.concat(partials)
+        .group_by("NameOfDay")
+        .agg([pl.col("sum").sum(), pl.col("count").sum().cast(pl.UInt32)])
+        .select(
+            "NameOfDay",
+            "sum",
+            (pl.col("sum") / pl.col("count")).alias("mean"),
+            "count",
+        )
+    )
@@ -0,0 +1,333 @@
+"""
+Incremental ingest of new invoice rows.
+
+An appended batch is parsed, conformed to the schema of the loaded
+dataset and cleaned on its own: the forward fill of Customer ID
+continues from the rows already loaded, and outliers are handled
+with the limits of the dataset the batch is appended to. Those
+limits are computed once and then frozen, so earlier rows never
+change and cleaned frames and aggregates can be extended instead
+of rebuilt.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import hashlib
+import io
+import threading
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import polars as pl
+from processor import clean as cl
+from processor import cache
+from processor import stats as st
+from processor.chunked import NaCarry, clean_batch
+
+FORMATS = ("csv", "parquet", "json")
+MEDIA_TYPES = {
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/octet-stream": "parquet",
+    "application/json": "json",
+    "application/x-ndjson": "json",
+}
+
+
+def batch_format(content_type: str | None, fmt: str | None = None) -> str:
+    """
+    Format of an uploaded batch: the explicit fmt, or else the
+    request's content type.
+
+    Args:
+        content_type (str): Content-Type header.
+        fmt (str, optional): 'csv', 'parquet' or 'json'.
+    """
+    if fmt is None:
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        fmt = MEDIA_TYPES.get(media_type)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported batch format: {fmt or content_type}")
+    return fmt
+
+
+def _is_json_array(body: bytes) -> bool:
+    return body.lstrip()[:1] == b"["
+
+
+def _cast_numeric(values: pd.Series, dtype) -> pd.Series:
+    # Integers outside the range of an optimized dtype keep 64 bits.
+    if pd.api.types.is_integer_dtype(dtype):
+        info = np.iinfo(getattr(dtype, "numpy_dtype", dtype))
+        present = values.dropna()
+        if len(present) and (present.min() < info.min or present.max() > info.max):
+            dtype = "Int64" if pd.api.types.is_extension_array_dtype(dtype) else "int64"
+    return values.astype(dtype)
+
+
+def _conform_pandas(df: pd.DataFrame, like: pd.DataFrame) -> pd.DataFrame:
+    missing = [col for col in like.columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+    df = df[list(like.columns)].copy()
+    # Appended rows are numbered after the loaded ones.
+    df.index = pd.RangeIndex(len(like), len(like) + len(df))
+    for col, dtype in like.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            df[col] = pd.to_datetime(df[col]).astype(dtype)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            df[col] = _cast_numeric(pd.to_numeric(df[col]), dtype)
+        else:
+            df[col] = df[col].astype(object)
+    return cache.arrow_safe(df)
+
+
+def _conform_polars(df: pl.DataFrame, like: pl.DataFrame) -> pl.DataFrame:
+    missing = [col for col in like.columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+    exprs = []
+    for col, dtype in like.schema.items():
+        values = pl.col(col)
+        if df.schema[col] == pl.String and dtype.is_temporal():
+            values = values.str.to_datetime()
+        elif df.schema[col] == pl.String and dtype.is_integer():
+            values = values.cast(pl.Float64)
+        exprs.append(values.cast(pl.Int64 if dtype.is_integer() else dtype))
+    df = df.select(exprs)
+    # Integers outside the range of an optimized dtype keep 64 bits.
+    narrow = []
+    for col, dtype in like.schema.items():
+        if dtype.is_integer() and dtype != pl.Int64:
+            info = np.iinfo(str(dtype).lower())
+            low, high = df[col].min(), df[col].max()
+            if low is None or (info.min <= low and high <= info.max):
+                narrow.append(pl.col(col).cast(dtype))
+    return df.with_columns(narrow) if narrow else df
+
+
+def read_batch(body: bytes, fmt: str, like: pd.DataFrame | pl.DataFrame):
+    """
+    Parse an uploaded batch with the engine of the loaded dataset
+    and give it that dataset's columns and dtypes.
+
+    JSON may be an array of records or newline-delimited records.
+
+    Args:
+        body (bytes): Uploaded file content.
+        fmt (str): 'csv', 'parquet' or 'json'.
+        like (Dataframe): Loaded Pandas or Polars dataset.
+    """
+    try:
+        if isinstance(like, pl.DataFrame):
+            if fmt == "csv":
+                df = pl.read_csv(io.BytesIO(body), infer_schema=False)
+            elif fmt == "parquet":
+                df = pl.read_parquet(io.BytesIO(body))
+            elif _is_json_array(body):
+                df = pl.read_json(io.BytesIO(body))
+            else:
+                df = pl.read_ndjson(io.BytesIO(body))
+            return _conform_polars(df, like)
+        if fmt == "csv":
+            df = pd.read_csv(io.BytesIO(body))
+        elif fmt == "parquet":
+            df = pd.read_parquet(io.BytesIO(body), engine="pyarrow")
+        else:
+            df = pd.read_json(io.BytesIO(body), lines=not _is_json_array(body),
+                              convert_dates=False)
+        return _conform_pandas(df, like)
+    except (pl.exceptions.PolarsError, TypeError) as e:
+        raise ValueError(f"Batch does not match the dataset: {e}") from e
+
+
+def next_version(version: str, body: bytes) -> str:
+    """
+    Data version after appending a batch to the given version.
+
+    Args:
+        version (str): Current data version.
+        body (bytes): Uploaded batch.
+    """
+    digest = hashlib.sha256(body).hexdigest()
+    return hashlib.sha256(f"{version}|{digest}".encode()).hexdigest()
+
+
+def pipeline_stats(raw, method: str = "cap", sketches: dict | None = None) -> dict:
+    """
+    Statistics clean_pipeline uses for each outlier column, in order.
+
+    Args:
+        raw (Dataframe): Raw Pandas or Polars Dataframe.
+        method (str, optional): Outlier method.
+        sketches (dict, optional): QuantileSketch per column of the
+        NA-handled rows. 'cap' and 'mean' change no other column's
+        values or rows, so they take their statistics from the
+        sketches instead of a pass over the rows; 'drop' stays exact.
+    """
+    if sketches and method != "drop":
+        return {col: sketches[col].to_stats() for col in cl.COLS}
+    stats = {}
+    if isinstance(raw, pl.DataFrame):
+        df = cl.pl_na_handler(raw)
+        for col in cl.COLS:
+            stats[col] = st.compute_stats(df, [col])[col]
+            df = cl.handle_outlier_polars(df, col, method, stats=stats[col])
+        return stats
+    df = cl.pd_na_handler(raw)
+    for col in cl.COLS:
+        stats[col] = st.compute_stats(df, [col])[col]
+        df = cl.handle_outlier_pandas(df, col, method, stats=stats[col])
+    return stats
+
+
+@dataclass(frozen=True)
+class BatchState:
+    """
+    State after a prepared batch: the forward-fill carry, the limits
+    per method and, when given, the sketches with the batch's rows.
+    """
+
+    carry: NaCarry
+    stats: dict
+    sketches: dict | None = None
+
+
+class Appender:
+    """
+    Cleaning state for batches appended to the loaded dataset:
+    one forward-fill carry per engine and frozen outlier limits
+    per engine and method. The limits of every method are frozen
+    together, from the dataset the first batch is appended to.
+
+    Args:
+        typed (bool, optional): Transform batches with the typed
+        datetime derivation, like the frames they extend.
+    """
+
+    def __init__(self, typed: bool = False):
+        self.typed = typed
+        self._carries = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def frozen(self, engine: str, method: str) -> dict | None:
+        """
+        Frozen statistics for one engine and method, or None while
+        nothing was appended.
+
+        Args:
+            engine (str): 'pandas' or 'polars'.
+            method (str): Outlier method.
+        """
+        with self._lock:
+            return self._stats.get(engine, {}).get(method)
+
+    def clean_frame(self, engine: str, raw, method: str, sketches: dict | None = None):
+        """
+        Clean a whole raw dataset as the frames extended by append
+        are: with the frozen limits once a batch was appended, and
+        like clean_pipeline, or with the limits from the sketches,
+        before.
+
+        Args:
+            engine (str): 'pandas' or 'polars'.
+            raw (Dataframe): Raw dataset, with any appended rows.
+            method (str): Outlier method.
+            sketches (dict, optional): Kept sketches of the dataset;
+            see pipeline_stats.
+        """
+        stats = self.frozen(engine, method)
+        if stats is None and sketches and method != "drop":
+            stats = pipeline_stats(raw, method, sketches)
+        if stats is None:
+            return cl.clean_pipeline(raw, method, typed=self.typed)
+        return clean_batch(NaCarry(engine)(raw), stats, method, self.typed)
+
+    def prepare(self, engine: str, batch, raw, methods,
+                sketches: dict | None = None) -> tuple:
+        """
+        Clean a batch once per outlier method without changing any
+        state. Returns the cleaned rows per method and the
+        BatchState after the batch, for commit() once the batch is
+        published.
+
+        Args:
+            engine (str): 'pandas' or 'polars'.
+            batch (Dataframe): Conformed raw batch.
+            raw (Dataframe): Raw dataset the batch is appended to.
+            methods (list): Outlier methods to clean with.
+            sketches (dict, optional): Kept sketches of the dataset;
+            the state holds new ones with the batch's NA-handled rows.
+        """
+        with self._lock:
+            stats = self._stats.get(engine)
+            carry = self._carries.get(engine)
+        if stats is None:
+            stats = {m: pipeline_stats(raw, m, sketches) for m in cl.METHODS}
+        if carry is None:
+            carry = NaCarry(engine)
+            carry(raw)
+        else:
+            carry = NaCarry(engine, carry.last)
+        batch = carry(batch)
+        if engine == "pandas":
+            cleaned = {m: clean_batch(batch.copy(), stats[m], m, self.typed)
+                       for m in methods}
+        else:
+            cleaned = {m: clean_batch(batch, stats[m], m, self.typed) for m in methods}
+        if sketches:
+            sketches = st.extend_sketches(sketches, batch)
+        return cleaned, BatchState(carry, stats, sketches)
+
+    def commit(self, engine: str, state: BatchState):
+        """
+        Keep the state prepare() returned for a published batch:
+        the next batch continues its forward fill, and the limits
+        are frozen if they were not yet.
+
+        Args:
+            engine (str): 'pandas' or 'polars'.
+            state (BatchState): State returned by prepare().
+        """
+        with self._lock:
+            self._carries[engine] = state.carry
+            self._stats.setdefault(engine, state.stats)
+
+    def clean(self, engine: str, batch, raw, methods) -> dict:
+        """
+        Clean a batch once per outlier method and keep the state,
+        as prepare() followed by commit().
+
+        Args:
+            engine (str): 'pandas' or 'polars'.
+            batch (Dataframe): Conformed raw batch.
+            raw (Dataframe): Raw dataset the batch is appended to.
+            methods (list): Outlier methods to clean with.
+        """
+        cleaned, state = self.prepare(engine, batch, raw, methods)
+        self.commit(engine, state)
+        return cleaned
+
+    def reset(self):
+        """
+        Forget all state, e.g. after the source file was reloaded.
+        """
+        with self._lock:
+            self._carries.clear()
+            self._stats.clear()
+
+
+def concat(frames: list):
+    """
+    Stack a loaded frame and appended rows of the same engine.
+
+    Args:
+        frames (list): Pandas or Polars Dataframes.
+    """
+    if isinstance(frames[0], pl.DataFrame):
+        return pl.concat(frames, how="vertical_relaxed")
+    return pd.concat(frames)
@@ -0,0 +1,485 @@
+"""
+Stage-level benchmark of the registered processing engines.
+
+Every stage (load, NA handling, outliers, transform, aggregate,
+serialization of the aggregate) is timed on its own with perf_counter_ns over cold and warm
+iterations. Peak memory is taken from separate runs: the Python
+allocation peak with tracemalloc and the rise of the resident set
+size over its value before the call, sampled in a thread.
+Results are saved as JSON and compared with the previous run of
+the same engines, method and iterations, so regressions between
+versions show up.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import gc
+import glob
+import importlib.metadata
+import json
+import math
+import os
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import pandas as pd
+import polars as pl
+from processor import load_data as ld
+from processor import cache
+from processor import engines as en
+from processor import stats as st
+from processor import clean as cl
+from processor import dtypes as dt
+from processor import aggregate as ag
+from processor import sharded as sh
+from processor import metrics as mt
+
+BENCH_DIR = os.environ.get("PROCESSOR_BENCH_DIR", "benchmarks")
+# Saved reports kept per directory; older ones are removed.
+MAX_SAVED = int(os.environ.get("PROCESSOR_BENCH_KEEP", 50))
+STAGES = en.STAGES
+ENGINES = en.ENGINES
+
+
+def percentile(values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list): Measurements.
+        pct (float): Percentile between 0 and 100.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings_ns: list) -> dict:
+    """
+    Median and p95 of a list of nanosecond timings, in milliseconds.
+
+    Args:
+        timings_ns (list): perf_counter_ns deltas.
+    """
+    if not timings_ns:
+        return {"runs": 0}
+    return {
+        "runs": len(timings_ns),
+        "median_ms": round(statistics.median(timings_ns) / 1e6, 3),
+        "p95_ms": round(percentile(timings_ns, 95) / 1e6, 3),
+    }
+
+
+def check_runs(iterations: int, warmup: int = 0, cold: int = 0):
+    """
+    Reject run counts that leave nothing to summarize.
+
+    Args:
+        iterations (int): Timed warm runs; at least one.
+        warmup (int, optional): Untimed runs; not negative.
+        cold (int, optional): Timed cold runs; not negative.
+    """
+    if iterations < 1:
+        raise ValueError(f"iterations must be at least 1: {iterations}")
+    if warmup < 0 or cold < 0:
+        raise ValueError(f"warmup and cold must not be negative: {warmup}, {cold}")
+
+
+def _fresh(df):
+    """
+    Independent input for one run, since pandas steps change frames in place.
+    """
+    return df.copy() if isinstance(df, pd.DataFrame) else df
+
+
+def _stage_call(engine: en.Engine, stage: str, path: str, method: str):
+    func = engine.stage(stage)
+    if stage == "load":
+        return lambda _, cold: func(path, use_cache=not cold)
+    if stage == "outliers":
+        return lambda df, cold: func(_fresh(df), method)
+    return lambda df, cold: func(_fresh(df))
+
+
+def _timed(call, df, cold: bool) -> int:
+    gc.collect()
+    if cold:
+        st.clear()
+    start = time.perf_counter_ns()
+    call(df, cold)
+    return time.perf_counter_ns() - start
+
+
+class RssSampler:
+    """
+    Highest resident set size above the value at entry, polled in a
+    thread while the block runs. increase is None where the RSS
+    cannot be read.
+
+    Args:
+        interval (float, optional): Seconds between samples.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.baseline = self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, mt.current_rss())
+
+    def __enter__(self):
+        self.baseline = self.peak = mt.current_rss()
+        if self.baseline is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.baseline is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, mt.current_rss())
+
+    @property
+    def increase(self) -> int | None:
+        """
+        Peak minus baseline in bytes.
+        """
+        return None if self.baseline is None else self.peak - self.baseline
+
+
+def _peak_memory(call, df) -> dict:
+    gc.collect()
+    with RssSampler() as rss:
+        call(df, False)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call(df, False)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"python_peak_bytes": peak, "rss_peak_increase_bytes": rss.increase}
+
+
+def bench_engine(
+    engine: str, stages=STAGES, path: str = ld.DATA_FILE, method="cap",
+    iterations=5, warmup=1, cold=1,
+) -> dict:
+    """
+    Benchmark the requested stages of one engine.
+
+    Each stage gets the previous stage's output as input, prepared
+    outside the timed region. The output of every timed stage is
+    fingerprinted for the equivalence check; serialized output is
+    measured in bytes instead. Cold runs read the raw Excel file
+    and start with empty statistics caches; warm runs follow the
+    warm-up runs and use the columnar cache. Engines without their
+    own Excel reader have no cold load runs.
+
+    Args:
+        engine (str): Name of a registered engine.
+        stages (tuple, optional): Stages to time.
+        path (str, optional): Source workbook.
+        method (str, optional): Outlier method.
+        iterations (int, optional): Timed warm runs per stage.
+        warmup (int, optional): Untimed runs before the warm runs.
+        cold (int, optional): Timed cold runs per stage.
+    """
+    impl = ENGINES[engine]
+    results = {}
+    df = None
+    for stage in STAGES:
+        call = _stage_call(impl, stage, path, method)
+        if stage in stages:
+            no_cold = stage == "load" and not impl.cold_load
+            cold_ns = [] if no_cold else [_timed(call, df, True) for _ in range(cold)]
+            for _ in range(warmup):
+                call(df, False)
+            warm_ns = [_timed(call, df, False) for _ in range(iterations)]
+            results[stage] = {
+                "cold": {**summarize(cold_ns), "applicable": False} if no_cold
+                else summarize(cold_ns),
+                "warm": summarize(warm_ns),
+                **_peak_memory(call, df),
+            }
+        df = call(df, False)
+        if stage in stages and isinstance(df, bytes):
+            results[stage]["bytes"] = len(df)
+        elif stage in stages:
+            results[stage]["fingerprint"] = en.fingerprint(impl.to_pandas(df))
+        if stage == stages[-1]:
+            break
+    return results
+
+
+# Parameters two runs must share for their timings to be compared.
+COMPARABLE_PARAMS = ("engines", "method", "iterations")
+
+
+def _previous_run(output_dir: str, params: dict) -> dict | None:
+    """
+    Latest saved run with the same COMPARABLE_PARAMS.
+    """
+    for run in sorted(glob.glob(os.path.join(output_dir, "*.json")), reverse=True):
+        with open(run, encoding="utf-8") as file:
+            previous = json.load(file)
+        old = previous.get("params", {})
+        # Runs saved before engines were recorded list them in results.
+        old.setdefault("engines", list(previous.get("results", {})))
+        if all(old.get(name) == params[name] for name in COMPARABLE_PARAMS):
+            return previous
+    return None
+
+
+def _prune(output_dir: str, keep: int | None = None):
+    """
+    Remove all but the newest saved runs.
+    """
+    keep = MAX_SAVED if keep is None else keep
+    runs = sorted(glob.glob(os.path.join(output_dir, "*.json")))
+    for run in runs[: max(len(runs) - keep, 0)]:
+        try:
+            os.remove(run)
+        except FileNotFoundError:
+            pass
+
+
+def _compare(results: dict, previous: dict | None):
+    if not previous:
+        return
+    for engine, stages in results.items():
+        for stage, res in stages.items():
+            old = previous["results"].get(engine, {}).get(stage, {}).get("warm", {})
+            new = res["warm"]
+            if old.get("median_ms") and new.get("median_ms") is not None:
+                res["previous_warm_median_ms"] = old["median_ms"]
+                res["change_pct"] = round(
+                    100 * (new["median_ms"] - old["median_ms"]) / old["median_ms"], 1
+                )
+
+
+def _package_version(name: str) -> str | None:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _equivalence(results: dict, stages: tuple) -> dict:
+    engines = list(results)
+    return {
+        stage: en.compare(
+            {engine: results[engine][stage]["fingerprint"] for engine in engines},
+            reference=engines[0],
+        )
+        for stage in stages
+        if "fingerprint" in results[engines[0]][stage]
+    }
+
+
+def _fastest(results: dict, stages: tuple) -> dict:
+    return {
+        stage: min(
+            results, key=lambda engine: results[engine][stage]["warm"]["median_ms"]
+        )
+        for stage in stages
+    }
+
+
+# Columns transform_df derives from InvoiceDate.
+DERIVED_COLUMNS = ("InvoiceDate", "InvoiceTime", "NameOfDay")
+
+
+def bench_transform(
+    path: str = ld.DATA_FILE, engines=("pandas", "polars"), method="cap",
+    iterations=5, warmup=1,
+) -> dict:
+    """
+    Time and size of the transform stage with the current (object
+    and string) and the typed datetime derivation.
+
+    Both variants get the same outlier-handled input, prepared
+    outside the timed region, and must give the same aggregate.
+
+    Args:
+        path (str, optional): Source workbook.
+        engines (tuple, optional): 'pandas' and/or 'polars'.
+        method (str, optional): Outlier method.
+        iterations (int, optional): Timed runs per variant.
+        warmup (int, optional): Untimed runs before the timed runs.
+    """
+    unknown = set(engines) - {"pandas", "polars"}
+    if unknown:
+        raise ValueError(f"Unknown engine: {sorted(unknown)}")
+    check_runs(iterations, warmup)
+    report = {}
+    for engine in engines:
+        impl = ENGINES[engine]
+        df = impl.outliers(impl.na(impl.load(path)), method)
+        res = {}
+        for name, typed in (("current", False), ("typed", True)):
+            call = lambda frame, _cold, typed=typed: cl.transform_df(_fresh(frame), typed)
+            for _ in range(warmup):
+                call(df, False)
+            out = call(df, False)
+            sizes = dt.memory_by_column(out)
+            res[name] = {
+                "warm": summarize([_timed(call, df, False) for _ in range(iterations)]),
+                **_peak_memory(call, df),
+                "dtypes": {col: str(out[col].dtype) for col in DERIVED_COLUMNS},
+                "derived_bytes": sum(sizes[col] for col in DERIVED_COLUMNS),
+                "fingerprint": en.fingerprint(impl.to_pandas(impl.aggregate(out))),
+            }
+        current, typed = res["current"], res["typed"]
+        res["speedup"] = round(
+            current["warm"]["median_ms"] / max(typed["warm"]["median_ms"], 1e-3), 2
+        )
+        res["derived_bytes_reduction_pct"] = round(
+            100 * (1 - typed["derived_bytes"] / current["derived_bytes"]), 1
+        ) if current["derived_bytes"] else 0.0
+        res["equivalent"] = en.compare(
+            {name: res[name]["fingerprint"] for name in ("current", "typed")},
+            reference="current",
+        )["typed"]["equivalent"]
+        report[engine] = res
+    return report
+
+
+def bench_sharded(
+    path: str = ld.DATA_FILE, cores=(1, 2, 4), method="cap", iterations=3, warmup=1,
+) -> dict:
+    """
+    Time of the pandas pipeline from raw frame to aggregate, eager on
+    one core and sharded over each number of worker processes, with
+    the speedup over the eager run.
+
+    Each core count gets its own worker pool, started and warmed
+    up before the timed runs and shut down after them. Core counts
+    above the machine's CPUs run, but cannot speed up.
+
+    Args:
+        path (str, optional): Source workbook.
+        cores (tuple, optional): Worker process counts, at most
+        sharded.MAX_WORKERS each.
+        method (str, optional): Outlier method.
+        iterations (int, optional): Timed runs per variant.
+        warmup (int, optional): Untimed runs before the timed runs.
+    """
+    cores = sorted(set(cores))
+    if not cores or cores[0] < 1 or cores[-1] > sh.MAX_WORKERS:
+        raise ValueError(
+            f"Core counts must be between 1 and {sh.MAX_WORKERS}: {list(cores)}")
+    check_runs(iterations, warmup)
+    df = ENGINES["pandas"].load(path)
+
+    def eager(frame, _cold):
+        return ag.aggregate_pandas(cl.clean_pipeline(_fresh(frame), method))
+
+    for _ in range(warmup):
+        eager(df, False)
+    fingerprints = {"eager": en.fingerprint(eager(df, False))}
+    baseline = summarize([_timed(eager, df, False) for _ in range(iterations)])
+    report = {
+        "cpu_count": os.cpu_count(),
+        "rows": len(df),
+        "method": method,
+        "eager": baseline,
+        "sharded": {},
+    }
+    for workers in cores:
+        with sh.new_pool(workers) as executor:
+            call = lambda frame, _cold, workers=workers, executor=executor: (
+                sh.run_sharded(frame, method, workers=workers, executor=executor))
+            # The first run also starts the pool.
+            for _ in range(max(warmup, 1)):
+                out = call(df, False)
+            fingerprints[workers] = en.fingerprint(out)
+            warm = summarize([_timed(call, df, False) for _ in range(iterations)])
+        report["sharded"][workers] = {
+            "warm": warm,
+            "speedup": round(baseline["median_ms"] / max(warm["median_ms"], 1e-3), 2),
+            "equivalent": en.compare(fingerprints, reference="eager")[workers]["equivalent"],
+        }
+    return report
+
+
+def run_benchmark(
+    path: str = ld.DATA_FILE, engines=("pandas", "polars"), stages=STAGES,
+    iterations=5, warmup=1, cold=1, method="cap", output_dir: str | None = None,
+    save=True,
+) -> dict:
+    """
+    Benchmark the engines stage by stage and save the report.
+
+    Every stage's output is checked against the first engine's
+    ('equivalence') and the engine with the lowest warm median is
+    reported per stage ('fastest').
+
+    Args:
+        path (str, optional): Source workbook.
+        engines (tuple, optional): Engines to run; the first one is
+        the reference for the equivalence check.
+        stages (tuple, optional): Stages to time, in pipeline order.
+        iterations (int, optional): Timed warm runs per stage.
+        warmup (int, optional): Untimed runs before the warm runs.
+        cold (int, optional): Timed cold runs per stage.
+        method (str, optional): Outlier method, same for all engines.
+        output_dir (str, optional): Where JSON reports are kept.
+        save (bool, optional): Write the report to output_dir.
+    """
+    unknown = set(stages) - set(STAGES) or set(engines) - set(ENGINES)
+    if unknown:
+        raise ValueError(f"Unknown stage or engine: {sorted(unknown)}")
+    if not engines or not stages:
+        raise ValueError("At least one engine and one stage are needed")
+    check_runs(iterations, warmup, cold)
+    stages = tuple(s for s in STAGES if s in stages)
+    output_dir = output_dir or BENCH_DIR
+    now = datetime.now(timezone.utc)
+    report = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "data_version": cache.source_version(path),
+        "versions": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "polars": pl.__version__,
+            **{
+                name: _package_version(name)
+                for name in engines
+                if name not in ("pandas", "polars")
+            },
+        },
+        "params": {
+            "engines": list(engines),
+            "stages": list(stages),
+            "iterations": iterations,
+            "warmup": warmup,
+            "cold": cold,
+            "method": method,
+        },
+        "results": {
+            engine: bench_engine(engine, stages, path, method, iterations, warmup, cold)
+            for engine in engines
+        },
+    }
+    report["equivalence"] = _equivalence(report["results"], stages)
+    report["fastest"] = _fastest(report["results"], stages)
+    previous = _previous_run(output_dir, report["params"])
+    _compare(report["results"], previous)
+    report["compared_with"] = previous["timestamp"] if previous else None
+    if save:
+        os.makedirs(output_dir, exist_ok=True)
+        name = f"{now:%Y%m%dT%H%M%S%f}-{report['data_version'][:8]}.json"
+        with open(os.path.join(output_dir, name), "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        report["saved_to"] = os.path.join(output_dir, name)
+        _prune(output_dir)
+    return report
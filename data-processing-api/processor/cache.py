@@ -0,0 +1,161 @@
+"""
+Columnar on-disk cache for the Excel source.
+
+The workbook is parsed once and stored as Parquet next to a small
+manifest. Cache entries are keyed by the source file's size, mtime
+and SHA-256 content hash, so editing or replacing the workbook
+invalidates them automatically.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import pandas as pd
+import polars as pl
+
+CACHE_DIR = os.environ.get("PROCESSOR_CACHE_DIR", ".cache")
+MANIFEST = "manifest.json"
+
+_LOCK = threading.Lock()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash a file in fixed-size chunks.
+
+    Args:
+        path (str): File to hash.
+        chunk_size (int, optional): Bytes read per chunk.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST), encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(cache_dir: str, manifest: dict):
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+
+
+def source_version(path: str, cache_dir: str | None = None) -> str:
+    """
+    Content hash of the source file.
+
+    The hash is only recomputed when the file's size or mtime
+    differ from what the manifest recorded last time.
+
+    Args:
+        path (str): Source workbook.
+        cache_dir (str, optional): Cache directory.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    with _LOCK:
+        manifest = _read_manifest(cache_dir)
+        entry = manifest.get(key)
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["sha256"]
+        sha = file_sha256(path)
+        manifest[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha,
+        }
+        _write_manifest(cache_dir, manifest)
+    return sha
+
+
+def cache_file(path: str, sheet, engine: str, cache_dir: str | None = None) -> str:
+    """
+    Location of the Parquet cache entry for one sheet of the source.
+
+    Args:
+        path (str): Source workbook.
+        sheet (int | str): Sheet identifier as passed to the reader.
+        engine (str): 'pandas' or 'polars'.
+        cache_dir (str, optional): Cache directory.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    version = source_version(path, cache_dir)
+    return os.path.join(cache_dir, f"{version[:16]}-{engine}-{sheet}.parquet")
+
+
+def arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make a pandas frame writable by pyarrow.
+
+    Excel columns such as Invoice and StockCode mix integers and
+    strings, which Arrow cannot store in one column. Mixed object
+    columns are converted to strings and missing values become None,
+    which is what reading the Parquet copy back gives.
+
+    Args:
+        df (pd.DataFrame): Pandas Dataframe
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        kinds = values.dropna().map(type).unique()
+        if len(kinds) > 1:
+            values = values.where(values.isna(), values.astype(str))
+        df[col] = values.astype(object).where(values.notna(), None)
+    return df
+
+
+def _atomic_write(path: str, write):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+def write_pandas(df: pd.DataFrame, path: str):
+    """
+    Store a pandas frame as a Parquet cache entry.
+
+    Args:
+        df (pd.DataFrame): Frame already passed through arrow_safe.
+        path (str): Cache entry location.
+    """
+    _atomic_write(path, lambda tmp: df.to_parquet(tmp, engine="pyarrow"))
+
+
+def write_polars(df: pl.DataFrame, path: str):
+    """
+    Store a polars frame as a Parquet cache entry.
+
+    Args:
+        df (pl.DataFrame): Polars Dataframe
+        path (str): Cache entry location.
+    """
+    _atomic_write(path, df.write_parquet)
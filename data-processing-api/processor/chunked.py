@@ -0,0 +1,205 @@
+"""
+Out-of-core processing of the retail dataset in row batches.
+
+The columnar source is streamed with pyarrow one record batch at a
+time. A first pass over the batches collects mergeable column
+summaries for the outlier limits; the second pass runs NA handling,
+outlier handling and the date transform per batch and keeps only
+the partial aggregates, so memory is bounded by the batch size.
+With QUANTILE_EPSILON set, the summaries are fixed-size quantile
+sketches instead of exact value counts.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import os
+import polars as pl
+import pyarrow.parquet as pq
+from processor import load_data as ld
+from processor import clean as cl
+from processor import aggregate as ag
+from processor import cache
+from processor import stats as st
+
+BATCH_ROWS = int(os.environ.get("CHUNK_ROWS", 100_000))
+ENGINES = ("pandas", "polars")
+
+
+def source_file(path: str = ld.DATA_FILE, engine: str = "pandas") -> str:
+    """
+    Parquet file to stream. A workbook is converted to the
+    combined columnar cache entry once; Parquet is used as is.
+
+    Args:
+        path (str, optional): Source workbook or Parquet file.
+        engine (str, optional): 'pandas' or 'polars'.
+    """
+    if path.endswith(".parquet"):
+        return path
+    combined = cache.cache_file(path, "all", engine)
+    if not os.path.exists(combined):
+        ld.read_all_sheets(engine, path)
+    return combined
+
+
+def iter_batches(source: str, engine: str, batch_rows: int = BATCH_ROWS):
+    """
+    Yield the source as pandas or polars frames of batch_rows rows.
+
+    Args:
+        source (str): Parquet file.
+        engine (str): 'pandas' or 'polars'.
+        batch_rows (int, optional): Rows per batch.
+    """
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_rows):
+        if engine == "pandas":
+            yield batch.to_pandas()
+        else:
+            yield pl.from_arrow(batch)
+
+
+class NaCarry:
+    """
+    NA handling for consecutive batches.
+
+    The forward fill of a batch starts from the last value seen in
+    the previous batch, so the batches are filled as if they were
+    one frame.
+
+    Args:
+        engine (str): 'pandas' or 'polars'.
+        last (dict, optional): Column to the last value seen before
+        the first batch.
+    """
+
+    def __init__(self, engine: str, last: dict | None = None):
+        self.engine = engine
+        self.last = dict(last or {})
+
+    def __call__(self, df):
+        if self.engine == "pandas":
+            df = cl.pd_na_handler(df)
+            columns = ["Customer ID"]
+        else:
+            df = cl.pl_na_handler(df)
+            columns = df.columns
+        for col in columns:
+            if col in self.last:
+                df = _fill_leading(df, col, self.last[col])
+            last = _last_valid(df, col)
+            if last is not None:
+                self.last[col] = last
+        return df
+
+
+def _fill_leading(df, col: str, value):
+    if isinstance(df, pl.DataFrame):
+        return df.with_columns(pl.col(col).fill_null(pl.lit(value, df.schema[col])))
+    df.loc[:, col] = df[col].fillna(value)
+    return df
+
+
+def _last_valid(df, col: str):
+    if isinstance(df, pl.DataFrame):
+        values = df.get_column(col).drop_nulls()
+        return values[-1] if len(values) else None
+    index = df[col].last_valid_index()
+    return None if index is None else df.at[index, col]
+
+
+def _handle_outliers(df, stats: dict, method: str, columns):
+    for col in columns:
+        if isinstance(df, pl.DataFrame):
+            df = cl.handle_outlier_polars(df, col, method, stats=stats[col])
+        else:
+            df = cl.handle_outlier_pandas(df, col, method, stats=stats[col])
+    return df
+
+
+def clean_batch(batch, stats: dict, method: str = "cap", typed: bool = False):
+    """
+    Outlier handling with fixed limits and the date transform of
+    one batch that already went through NaCarry.
+
+    Args:
+        batch (Dataframe): NA-handled Pandas or Polars batch.
+        stats (dict): ColumnStats per outlier column.
+        method (str, optional): Outlier method.
+        typed (bool, optional): Typed datetime derivation.
+    """
+    return cl.transform_df(_handle_outliers(batch, stats, method, cl.COLS), typed)
+
+
+def _summarize(source, engine, batch_rows, stats, method, columns, done, epsilon):
+    summaries = {}
+    na = NaCarry(engine)
+    for batch in iter_batches(source, engine, batch_rows):
+        batch = _handle_outliers(na(batch), stats, method, done)
+        for col in columns:
+            part = st.summarize(batch[col], epsilon)
+            summaries[col] = summaries[col].merge(part) if col in summaries else part
+    return {col: summary.to_stats() for col, summary in summaries.items()}
+
+
+def global_stats(source: str, engine: str, method: str = "cap",
+                 batch_rows: int = BATCH_ROWS, epsilon: float | None = None) -> dict:
+    """
+    Statistics of the outlier columns over the whole source, as the
+    eager pipeline sees them.
+
+    'cap' and 'mean' keep every row, so one pass summarizes all
+    columns. 'drop' removes rows, so the statistics of each column
+    come from a pass that already drops the earlier columns' outliers.
+
+    Args:
+        source (str): Parquet file.
+        engine (str): 'pandas' or 'polars'.
+        method (str, optional): Outlier method.
+        batch_rows (int, optional): Rows per batch.
+        epsilon (float, optional): Rank error of approximate quartiles
+        from a QuantileSketch; QUANTILE_EPSILON by default, exact
+        when that is unset.
+    """
+    epsilon = st.QUANTILE_EPSILON if epsilon is None else epsilon
+    if method != "drop":
+        return _summarize(source, engine, batch_rows, {}, method, cl.COLS, [], epsilon)
+    stats = {}
+    for i, col in enumerate(cl.COLS):
+        stats.update(_summarize(source, engine, batch_rows, stats, method, [col],
+                                cl.COLS[:i], epsilon))
+    return stats
+
+
+def run_chunked(path: str = ld.DATA_FILE, engine: str = "pandas",
+                method: str = "cap", batch_rows: int = BATCH_ROWS,
+                epsilon: float | None = None, typed: bool = False):
+    """
+    Clean, transform and aggregate the source batch by batch.
+
+    Returns the same frame as aggregate_pandas or aggregate_polars
+    on the eagerly cleaned dataset.
+
+    Args:
+        path (str, optional): Source workbook or Parquet file.
+        engine (str, optional): 'pandas' or 'polars'.
+        method (str, optional): Outlier method.
+        batch_rows (int, optional): Rows per batch.
+        epsilon (float, optional): Rank error of approximate outlier
+        limits; see global_stats.
+        typed (bool, optional): Typed datetime derivation.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    source = source_file(path, engine)
+    stats = global_stats(source, engine, method, batch_rows, epsilon)
+    partial = (ag.partial_aggregate_pandas if engine == "pandas"
+               else ag.partial_aggregate_polars)
+    na = NaCarry(engine)
+    partials = []
+    for batch in iter_batches(source, engine, batch_rows):
+        partials.append(partial(clean_batch(na(batch), stats, method, typed)))
+    if engine == "pandas":
+        return ag.merge_partials_pandas(partials)
+    return ag.merge_partials_polars(partials)
@@ -11,6 +11,8 @@ import pandas as pd
 import polars as pl
 import numpy as np
 import plotly.express as px
+from processor import stats as st
+from processor import metrics as mt
 
 # Setting Display Options
 pd.set_option("display.max_columns", None)
@@ -21,6 +23,10 @@ COLS = [
     "Quantity",
     "Price",
 ]
+METHODS = ("cap", "drop", "mean")
+# Day names in weekday order; codes of the typed NameOfDay column.
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+             "Saturday", "Sunday"]
 
 
 def viz_data(df: pd.DataFrame | pl.DataFrame, columns=None):
@@ -45,6 +51,7 @@ def viz_data(df: pd.DataFrame | pl.DataFrame, columns=None):
         )
 
 
+@mt.instrument("na")
 def pd_na_handler(df: pd.DataFrame):
     """
     Description column has 2928 missing values.
@@ -59,7 +66,8 @@ def pd_na_handler(df: pd.DataFrame):
     return df
 
 
-def pl_na_handler(df: pl.DataFrame):
+@mt.instrument("na")
+def pl_na_handler(df: pl.DataFrame | pl.LazyFrame):
     """
     Invoice column has 10209 missing values.
     - That is 1.9% of total data.
@@ -75,24 +83,21 @@ def pl_na_handler(df: pl.DataFrame):
     return df
 
 
-def check_outliers_info_pandas(df: pd.DataFrame, col: str):
+def check_outliers_info_pandas(df: pd.DataFrame, col: str, stats=None):
     """
     Finds Outliers in a column
 
     Args:
         df (Dataframe): Pandas Dataframe
+        stats (ColumnStats, optional): Precomputed column statistics.
     """
     try:
         columns = df.columns.tolist()
         if col in columns:
-            q1 = df[col].quantile(0.25)
-            q3 = df[col].quantile(0.75)
+            stats = stats or st.column_stats(df, col)
+            low, high = stats.iqr_limits()
 
-            iqr = q3 - q1
-
-            outliers = df[col][
-                ((df[col] < (q1 - 1.5 * iqr)) | (df[col] > (q3 + 1.5 * iqr)))
-            ]
+            outliers = df[col][((df[col] < low) | (df[col] > high))]
 
             num_of_outliers = len(outliers)
             max_outlier = outliers.max()
@@ -110,24 +115,21 @@ def check_outliers_info_pandas(df: pd.DataFrame, col: str):
         print("Column not integer or float type.")
 
 
-def check_outliers_info_polars(df: pl.DataFrame, col: str):
+def check_outliers_info_polars(df: pl.DataFrame, col: str, stats=None):
     """
     Get Outliers Info from polars dataframe
     Args:
         df (pl.DataFrame): Polars Dataframe
         col (str): Column name
+        stats (ColumnStats, optional): Precomputed column statistics.
     """
     try:
         columns = df.columns
         if col in columns:
-            q1 = df.select(pl.col(col).quantile(0.25)).to_numpy()[0][0]
-            q3 = df.select(pl.col(col).quantile(0.75)).to_numpy()[0][0]
-
-            iqr = q3 - q1
+            stats = stats or st.column_stats(df, col)
+            low, high = stats.iqr_limits()
 
-            outliers = df.filter(
-                (pl.col(col) < (q1 - 1.5 * iqr)) | (pl.col(col) > (q3 + 1.5 * iqr))
-            )
+            outliers = df.filter((pl.col(col) < low) | (pl.col(col) > high))
 
             num_of_outliers = len(outliers)
             max_outlier = outliers.max()
@@ -145,7 +147,8 @@ def check_outliers_info_polars(df: pl.DataFrame, col: str):
         print("Column not integer or float type.")
 
 
-def handle_outlier_pandas(df: pd.DataFrame, col: str, method="cap"):
+@mt.instrument("outliers")
+def handle_outlier_pandas(df: pd.DataFrame, col: str, method="cap", stats=None):
     """
     This function handles the
     identified outliers in the pandas dataframe
@@ -154,36 +157,37 @@ def handle_outlier_pandas(df: pd.DataFrame, col: str, method="cap"):
         col (str): Column with outliers
         method (str, optional): Method to use in handling outliers.
         Defaults to 'cap'.
+        stats (ColumnStats, optional): Precomputed column statistics.
     """
-    q1 = df[col].quantile(0.25)
-    q3 = df[col].quantile(0.75)
-
-    iqr = q3 - q1
+    stats = stats or st.column_stats(df, col)
+    low, high = stats.iqr_limits()
 
     try:
         if method == "drop":
-            df[col] = df[col][
-                ~((df[col] < (q1 - 1.5 * iqr)) | (df[col] > (q3 + 1.5 * iqr)))
-            ]
+            df[col] = df[col][~((df[col] < low) | (df[col] > high))]
+            st.invalidate(df, col)
             df = df.dropna()
             return df
         if method == "cap":
-            upper_limit = df[col].mean() + 3 * df[col].std()
-            lower_limit = df[col].mean() - 3 * df[col].std()
+            lower_limit, upper_limit = stats.std_limits()
             df[col] = np.where(
                 df[col] > upper_limit,
                 upper_limit,
                 np.where(df[col] < lower_limit, lower_limit, df[col]),
             )
+            st.invalidate(df, col)
             return df
         if method == "mean":
-            lower_limit = df[col][~(df[col] < (q1 - 1.5 * iqr))].max()
-            upper_limit = df[col][~(df[col] > (q3 + 1.5 * iqr))].min()
+            # The largest value above the lower fence is the column
+            # maximum and the smallest below the upper fence its minimum.
+            lower_limit = stats.max
+            upper_limit = stats.min
             df[col] = np.where(
                 df[col] > upper_limit,
-                df[col].mean(),
-                np.where(df[col] < lower_limit, df[col].mean(), df[col]),
+                stats.mean,
+                np.where(df[col] < lower_limit, stats.mean, df[col]),
             )
+            st.invalidate(df, col)
             return df
     except NameError:
         print("Column not in dataframe columns.")
@@ -191,70 +195,108 @@ def handle_outlier_pandas(df: pd.DataFrame, col: str, method="cap"):
         print("Dataframe not of pandas type")
 
 
-def handle_outlier_polars(df: pl.DataFrame, col: str, method="cap"):
+@mt.instrument("outliers")
+def handle_outlier_polars(
+    df: pl.DataFrame | pl.LazyFrame, col: str, method="cap", stats=None
+):
     """
     This function handles the
     identified outliers in the polars dataframe
+    Every strategy is a single polars expression, so the work
+    stays multi-threaded and no pandas copy is made. Eager frames
+    use cached column statistics; lazy frames compute them in-plan.
     Args:
-        df (pd.DataFrame): Pandas Dataframe
+        df (pl.DataFrame): Polars Dataframe
         col (str): Column with outliers
         method (str, optional): Method to use in handling outliers.
         Defaults to 'cap'.
+        stats (ColumnStats, optional): Precomputed column statistics.
     """
-    df = df.to_pandas()
-    q1 = df[col].quantile(0.25)
-    q3 = df[col].quantile(0.75)
+    try:
+        values = pl.col(col)
+        if stats is None and isinstance(df, pl.DataFrame):
+            stats = st.column_stats(df, col)
+        if stats is not None:
+            q1, q3 = pl.lit(stats.q1), pl.lit(stats.q3)
+            mean, std = pl.lit(stats.mean), pl.lit(stats.std)
+            col_min, col_max = pl.lit(stats.min), pl.lit(stats.max)
+        else:
+            q1 = values.quantile(0.25, interpolation="linear")
+            q3 = values.quantile(0.75, interpolation="linear")
+            mean, std = values.mean(), values.std()
+            col_min, col_max = values.min(), values.max()
 
-    iqr = q3 - q1
+        iqr = q3 - q1
+        low = q1 - 1.5 * iqr
+        high = q3 + 1.5 * iqr
 
-    try:
         if method == "drop":
-            df[col] = df[col][
-                ~((df[col] < (q1 - 1.5 * iqr)) | (df[col] > (q3 + 1.5 * iqr)))
-            ]
-            df = df.dropna()
-            df = pl.from_pandas(df)
+            df = df.filter(~((values < low) | (values > high)))
+            df = df.drop_nulls()
             return df
         if method == "cap":
-            upper_limit = df[col].mean() + 3 * df[col].std()
-            lower_limit = df[col].mean() - 3 * df[col].std()
-            df[col] = df[col].astype(float)
-            df[col] = np.where(
-                df[col] > upper_limit,
-                upper_limit,
-                np.where(df[col] < lower_limit, lower_limit, df[col]),
+            upper_limit = mean + 3 * std
+            lower_limit = mean - 3 * std
+            result = df.with_columns(
+                values.cast(pl.Float64)
+                .clip(lower_limit, upper_limit)
+                .cast(pl.Int64)
             )
-            df[col] = df[col].astype(int)
-            df = pl.from_pandas(df)
-            return df
+            st.carry(df, result, exclude=col)
+            return result
         if method == "mean":
-            lower_limit = df[col][~(df[col] < (q1 - 1.5 * iqr))].max()
-            upper_limit = df[col][~(df[col] > (q3 + 1.5 * iqr))].min()
-            df[col] = df[col].astype(float)
-            df[col] = np.where(
-                df[col] > upper_limit,
-                df[col].mean(),
-                np.where(df[col] < lower_limit, df[col].mean(), df[col]),
+            # The largest value above the lower fence is the column
+            # maximum and the smallest below the upper fence its minimum.
+            lower_limit = col_max
+            upper_limit = col_min
+            result = df.with_columns(
+                pl.when(values > upper_limit)
+                .then(mean)
+                .when(values < lower_limit)
+                .then(mean)
+                .otherwise(values)
+                .cast(pl.Float64)
+                .cast(pl.Int64)
+                .alias(col)
             )
-            df[col] = df[col].astype(int)
-            df = pl.from_pandas(df)
-            return df
-    except NameError:
+            st.carry(df, result, exclude=col)
+            return result
+    except pl.exceptions.ColumnNotFoundError:
         print("Column not in dataframe columns.")
     except AttributeError:
         print("Dataframe not of polars type")
 
 
-def transform_df(df: pd.DataFrame | pl.DataFrame) -> pd.DataFrame | pl.DataFrame:
+def _as_str(values: pd.Series) -> pd.Series:
+    """
+    String form of a column. Categorical and Arrow string columns
+    from the optimized dtype profile are already strings.
+    """
+    if isinstance(values.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+        return values
+    return values.astype(str)
+
+
+@mt.instrument("transform")
+def transform_df(
+    df: pd.DataFrame | pl.DataFrame, typed: bool = False
+) -> pd.DataFrame | pl.DataFrame:
     """
     Data Transformation and new columns creation.
 
+    With typed=True the derived columns stay vectorized: pandas
+    keeps InvoiceDate as datetime64 (midnight) and InvoiceTime as
+    timedelta64 since midnight instead of Python date/time objects,
+    and NameOfDay is a categorical (polars Enum) of DAY_NAMES whose
+    codes are only decoded to names when the frame is serialized.
+
     Args:
-        df (Dataframe): Pandas or Polars Dataframe.
+        df (Dataframe): Pandas or Polars Dataframe (eager or lazy).
+        typed (bool, optional): Typed datetime derivation.
     """
     try:
-        if isinstance(df, pl.DataFrame):
-            columns = df.columns
+        if isinstance(df, (pl.DataFrame, pl.LazyFrame)):
+            columns = df.collect_schema().names()
             col = "InvoiceDate"
             if col in columns:
                 df = df.rename({"InvoiceDate": "InvoiceDateTime"})
@@ -264,9 +306,12 @@ def transform_df(df: pd.DataFrame | pl.DataFrame) -> pd.DataFrame | pl.DataFrame
                 df = df.with_columns(
                     pl.col("InvoiceDateTime").dt.time().alias("InvoiceTime")
                 )
-                df = df.with_columns(
-                    pl.col("InvoiceDateTime").dt.strftime("%A").alias("NameOfDay")
-                )
+                if typed:
+                    names = pl.Series(DAY_NAMES, dtype=pl.Enum(DAY_NAMES))
+                    day = pl.lit(names).gather(pl.col("InvoiceDateTime").dt.weekday() - 1)
+                else:
+                    day = pl.col("InvoiceDateTime").dt.strftime("%A")
+                df = df.with_columns(day.alias("NameOfDay"))
             return df
         if isinstance(df, pd.DataFrame):
             columns = df.columns.tolist()
@@ -276,13 +321,21 @@ def transform_df(df: pd.DataFrame | pl.DataFrame) -> pd.DataFrame | pl.DataFrame
                 if col == "InvoiceDate":
                     df = df.rename(columns={"InvoiceDate": "InvoiceDateTime"})
                     df["InvoiceDateTime"] = pd.to_datetime(df["InvoiceDateTime"])
-                    df["InvoiceDate"] = df["InvoiceDateTime"].dt.date
-                    df["InvoiceTime"] = df["InvoiceDateTime"].dt.time
-                    df["NameOfDay"] = df["InvoiceDateTime"].dt.day_name()
+                    stamps = df["InvoiceDateTime"].dt
+                    if typed:
+                        df["InvoiceDate"] = stamps.normalize()
+                        df["InvoiceTime"] = df["InvoiceDateTime"] - df["InvoiceDate"]
+                        df["NameOfDay"] = pd.Categorical.from_codes(
+                            stamps.dayofweek, categories=DAY_NAMES
+                        )
+                    else:
+                        df["InvoiceDate"] = stamps.date
+                        df["InvoiceTime"] = stamps.time
+                        df["NameOfDay"] = stamps.day_name()
                 if col == "Invoice":
-                    df.loc[:, "Invoice"] = df.loc[:, "Invoice"].astype(str)
+                    df.loc[:, "Invoice"] = _as_str(df.loc[:, "Invoice"])
                 if col == "StockCode":
-                    df.loc[:, "StockCode"] = df.loc[:, "StockCode"].astype(str)
+                    df.loc[:, "StockCode"] = _as_str(df.loc[:, "StockCode"])
             return df
     except AttributeError:
         print(
@@ -292,6 +345,31 @@ def transform_df(df: pd.DataFrame | pl.DataFrame) -> pd.DataFrame | pl.DataFrame
         return None
 
 
+def clean_pipeline(
+    df: pd.DataFrame | pl.DataFrame, method="cap", typed: bool = False
+) -> pd.DataFrame | pl.DataFrame:
+    """
+    Full cleaning chain: NA handling, outlier handling on
+    Quantity and Price, then transformation.
+
+    Args:
+        df (Dataframe): Raw Pandas or Polars Dataframe. A polars
+        LazyFrame returns the chain as a lazy query.
+        method (str, optional): Outlier method. Defaults to 'cap'.
+        typed (bool, optional): Typed datetime derivation; see
+        transform_df.
+    """
+    if isinstance(df, (pl.DataFrame, pl.LazyFrame)):
+        df = pl_na_handler(df)
+        for col in COLS:
+            df = handle_outlier_polars(df, col=col, method=method)
+    else:
+        df = pd_na_handler(df)
+        for col in COLS:
+            df = handle_outlier_pandas(df, col=col, method=method)
+    return transform_df(df, typed=typed)
+
+
 # if __name__ == '__main__':
 # start = time.time()
 # # pl_data = ld.read_polars()
@@ -0,0 +1,152 @@
+"""
+Pre-aggregated rollup cube of revenue over the retail dimensions.
+
+Revenue (Quantity * Price) is summed and counted once per
+combination of day name, hour, month, country and stock code. The
+group-bys over subsets of those dimensions (cuboids) are rolled up
+from their smallest computed parent, so a query only scans the
+smallest cuboid that covers its dimensions and never the raw rows.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+from itertools import combinations
+import pandas as pd
+import polars as pl
+from processor import interchange as ic
+
+DIMENSIONS = ("NameOfDay", "Hour", "Month", "Country", "StockCode")
+# A cuboid is only kept when it is at most this fraction of the
+# parent it was rolled up from; otherwise queries use the parent.
+ROLLUP_RATIO = 0.5
+
+
+def base_cuboid(df: pd.DataFrame | pl.DataFrame) -> pl.DataFrame:
+    """
+    Revenue sum and count per combination of all dimensions.
+
+    Args:
+        df (Dataframe): Cleaned and transformed Pandas or Polars
+        Dataframe.
+    """
+    columns = ["InvoiceDateTime", "NameOfDay", "Country", "StockCode",
+               "Quantity", "Price"]
+    if isinstance(df, pd.DataFrame):
+        df = ic.pandas_to_polars(df[columns])
+    return (
+        df.lazy()
+        .select(
+            pl.col("NameOfDay", "Country", "StockCode").cast(pl.String),
+            pl.col("InvoiceDateTime").dt.hour().alias("Hour"),
+            pl.col("InvoiceDateTime").dt.month().alias("Month"),
+            (pl.col("Quantity") * pl.col("Price")).cast(pl.Float64).alias("Revenue"),
+        )
+        .group_by(DIMENSIONS)
+        .agg(
+            pl.col("Revenue").sum().alias("sum"),
+            pl.len().cast(pl.Int64).alias("count"),
+        )
+        .collect()
+    )
+
+
+def _rollup(cuboid: pl.DataFrame, dims: tuple) -> pl.DataFrame:
+    if not dims:
+        return cuboid.select(pl.col("sum").sum(), pl.col("count").sum())
+    return cuboid.group_by(dims).agg(pl.col("sum").sum(), pl.col("count").sum())
+
+
+class Cube:
+    """
+    Rollup cube with one cuboid per kept subset of DIMENSIONS.
+
+    Args:
+        df (Dataframe): Cleaned and transformed Pandas or Polars
+        Dataframe.
+        version (str, optional): Data version the cube was built from.
+        rollup_ratio (float, optional): See ROLLUP_RATIO.
+    """
+
+    def __init__(self, df, version: str = "", rollup_ratio: float = ROLLUP_RATIO):
+        self.version = version
+        self.cuboids = {frozenset(DIMENSIONS): base_cuboid(df)}
+        for size in range(len(DIMENSIONS) - 1, -1, -1):
+            for dims in combinations(DIMENSIONS, size):
+                key = frozenset(dims)
+                parent = self._parent(key)
+                cuboid = _rollup(self.cuboids[parent], dims)
+                if cuboid.height <= rollup_ratio * self.cuboids[parent].height:
+                    self.cuboids[key] = cuboid
+
+    def appended(self, df, version: str = "") -> "Cube":
+        """
+        New cube with cleaned rows added to every kept cuboid; this
+        cube is left unchanged, so queries on it stay consistent.
+
+        Args:
+            df (Dataframe): Cleaned and transformed Pandas or Polars
+            Dataframe of the new rows.
+            version (str, optional): Data version with the new rows.
+        """
+        base = base_cuboid(df)
+        cube = Cube.__new__(Cube)
+        cube.version = version
+        cube.cuboids = {}
+        for key, cuboid in self.cuboids.items():
+            dims = tuple(d for d in DIMENSIONS if d in key)
+            cube.cuboids[key] = _rollup(pl.concat([cuboid, _rollup(base, dims)]), dims)
+        return cube
+
+    def _parent(self, dims: frozenset) -> frozenset:
+        """
+        Smallest kept cuboid that has all the given dimensions.
+        """
+        return min(
+            (key for key in self.cuboids if dims <= key),
+            key=lambda key: self.cuboids[key].height,
+        )
+
+    def sizes(self) -> dict:
+        """
+        Rows per kept cuboid.
+        """
+        return {
+            ",".join(d for d in DIMENSIONS if d in key) or "(total)": cuboid.height
+            for key, cuboid in self.cuboids.items()
+        }
+
+    def query(self, by=(), filters: dict | None = None) -> tuple:
+        """
+        Revenue sum, mean and count grouped by some dimensions,
+        restricted to the given dimension values.
+
+        Returns the result and the dimensions of the cuboid it was
+        answered from.
+
+        Args:
+            by (list, optional): Dimensions to group by; none gives
+            the grand total.
+            filters (dict, optional): Dimension to allowed values.
+        """
+        by = list(by)
+        filters = filters or {}
+        unknown = (set(by) | set(filters)) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {', '.join(sorted(unknown))}")
+        source = self._parent(frozenset(by) | frozenset(filters))
+        cuboid = self.cuboids[source]
+        for dim, values in filters.items():
+            try:
+                values = pl.Series(values).cast(cuboid.schema[dim])
+            except pl.exceptions.InvalidOperationError as e:
+                raise ValueError(f"Invalid values for {dim}: {values}") from e
+            cuboid = cuboid.filter(pl.col(dim).is_in(values.to_list()))
+        result = _rollup(cuboid, tuple(by)).with_columns(
+            (pl.col("sum") / pl.col("count")).alias("mean")
+        )
+        result = result.select(*by, pl.col("sum", "mean").round(2), "count")
+        if by:
+            result = result.sort(by)
+        return result, [d for d in DIMENSIONS if d in source]
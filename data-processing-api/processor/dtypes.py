@@ -0,0 +1,213 @@
+"""
+Memory-optimized dtype profile for the retail dataset.
+
+Low-cardinality strings become categoricals, other strings Arrow
+strings, integers are downcast, and float columns that only hold
+whole numbers (e.g. Customer ID) become small nullable integers.
+Floats with fractions are kept at 64 bits unless asked otherwise,
+since float32 prices change aggregate sums.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+CATEGORY_RATIO = 0.5
+STRING_KINDS = ("string", "mixed-integer", "mixed-integer-float", "mixed")
+
+
+def _smallest_int(low, high, nullable: bool):
+    for bits in (8, 16, 32, 64):
+        info = np.iinfo(f"int{bits}")
+        if info.min <= low and high <= info.max:
+            return f"Int{bits}" if nullable else f"int{bits}"
+    return "Int64" if nullable else "int64"
+
+
+def optimize_pandas(
+    df: pd.DataFrame, category_ratio: float = CATEGORY_RATIO, downcast_floats=False
+) -> pd.DataFrame:
+    """
+    Return a copy of the frame using the memory-optimized profile.
+
+    Args:
+        df (pd.DataFrame): Pandas Dataframe
+        category_ratio (float, optional): Strings with at most this
+        share of distinct values become categoricals.
+        downcast_floats (bool, optional): Store fractional floats as float32.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object:
+            if pd.api.types.infer_dtype(values, skipna=True) in STRING_KINDS:
+                values = values.where(values.isna(), values.astype(str))
+                if values.nunique() <= category_ratio * len(values):
+                    values = values.astype("category")
+                else:
+                    values = values.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(values.dtype) and values.notna().any():
+            # Nullable Int columns, e.g. of an optimized frame, stay nullable.
+            nullable = values.hasnans or pd.api.types.is_extension_array_dtype(
+                values.dtype)
+            values = values.astype(
+                _smallest_int(values.min(), values.max(), nullable)
+            )
+        elif pd.api.types.is_float_dtype(values.dtype):
+            present = values.dropna()
+            if len(present) and (present == np.floor(present)).all():
+                values = values.astype(
+                    _smallest_int(present.min(), present.max(), True)
+                )
+            elif downcast_floats:
+                values = values.astype("float32")
+        out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def optimize_polars(
+    df: pl.DataFrame, category_ratio: float = CATEGORY_RATIO, downcast_floats=False
+) -> pl.DataFrame:
+    """
+    Return the frame using the memory-optimized profile.
+
+    Args:
+        df (pl.DataFrame): Polars Dataframe
+        category_ratio (float, optional): Strings with at most this
+        share of distinct values become categoricals.
+        downcast_floats (bool, optional): Store fractional floats as float32.
+    """
+    exprs = []
+    for col, dtype in df.schema.items():
+        values = df[col]
+        if dtype == pl.String:
+            if values.n_unique() <= category_ratio * len(values):
+                exprs.append(pl.col(col).cast(pl.Categorical))
+        elif dtype.is_integer() and values.null_count() < len(values):
+            smallest = _smallest_int(values.min(), values.max(), False)
+            exprs.append(pl.col(col).cast(getattr(pl, smallest.capitalize())))
+        elif dtype.is_float():
+            present = values.drop_nulls()
+            if len(present) and (present == present.floor()).all():
+                smallest = _smallest_int(present.min(), present.max(), False)
+                exprs.append(pl.col(col).cast(getattr(pl, smallest.capitalize())))
+            elif downcast_floats:
+                exprs.append(pl.col(col).cast(pl.Float32))
+    return df.with_columns(exprs) if exprs else df
+
+
+def optimize(df: pd.DataFrame | pl.DataFrame, **kwargs):
+    """
+    Apply the memory-optimized profile to a frame of either engine.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    if isinstance(df, pl.DataFrame):
+        return optimize_polars(df, **kwargs)
+    return optimize_pandas(df, **kwargs)
+
+
+def _extend_pandas(df: pd.DataFrame, batch: pd.DataFrame) -> pd.DataFrame:
+    batch = optimize_pandas(batch)
+    left, right = {}, {}
+    for col in df.columns:
+        dtype, values = df[col].dtype, batch[col]
+        if values.dtype == dtype:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+            new = pd.Index(values.dropna().unique()).difference(dtype.categories)
+            if len(new):
+                left[col] = df[col].cat.add_categories(new)
+                dtype = left[col].dtype
+            right[col] = values.astype(dtype)
+        elif (pd.api.types.is_integer_dtype(dtype)
+              and pd.api.types.is_integer_dtype(values.dtype)):
+            # Widen with the bounds of the frame's dtype, not its values.
+            info = np.iinfo(getattr(dtype, "numpy_dtype", dtype))
+            nullable = pd.api.types.is_extension_array_dtype(dtype) or values.hasnans
+            present = values.dropna()
+            low, high = (present.min(), present.max()) if len(present) else (0, 0)
+            dtype = _smallest_int(min(info.min, low), max(info.max, high), nullable)
+            if dtype != df[col].dtype:
+                left[col] = df[col].astype(dtype)
+            right[col] = values.astype(dtype)
+        else:
+            right[col] = values.astype(dtype)
+    df = df.assign(**left) if left else df
+    return pd.concat([df, batch.assign(**right) if right else batch])
+
+
+def _extend_polars(df: pl.DataFrame, batch: pl.DataFrame) -> pl.DataFrame:
+    batch = optimize_polars(batch)
+    # Integers widen to their common type in the concat.
+    exprs = [pl.col(col).cast(dtype) for col, dtype in df.schema.items()
+             if batch.schema[col] != dtype
+             and not (dtype.is_integer() and batch.schema[col].is_integer())]
+    batch = batch.with_columns(exprs) if exprs else batch
+    return pl.concat([df, batch], how="vertical_relaxed")
+
+
+def extend(df: pd.DataFrame | pl.DataFrame, batch):
+    """
+    Append rows to an optimized frame, profiling only the rows.
+
+    Columns keep the frame's dtypes; categoricals gain the new
+    values as categories and integers are widened only when the
+    rows do not fit.
+
+    Args:
+        df (Dataframe): Optimized Pandas or Polars Dataframe.
+        batch (Dataframe): Rows with the frame's columns.
+    """
+    if isinstance(df, pl.DataFrame):
+        return _extend_polars(df, batch)
+    return _extend_pandas(df, batch)
+
+
+def memory_by_column(df: pd.DataFrame | pl.DataFrame) -> dict:
+    """
+    Bytes used by each column.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    if isinstance(df, pl.DataFrame):
+        return {col: df[col].estimated_size() for col in df.columns}
+    usage = df.memory_usage(deep=True, index=False)
+    return {col: int(usage[col]) for col in df.columns}
+
+
+def memory_report(df: pd.DataFrame | pl.DataFrame, **kwargs) -> dict:
+    """
+    Bytes and dtype per column before and after optimization.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    optimized = optimize(df, **kwargs)
+    before, after = memory_by_column(df), memory_by_column(optimized)
+    dtypes_before = dict(zip(df.columns, map(str, df.dtypes)))
+    dtypes_after = dict(zip(optimized.columns, map(str, optimized.dtypes)))
+    columns = {
+        col: {
+            "dtype_before": dtypes_before[col],
+            "dtype_after": dtypes_after[col],
+            "bytes_before": before[col],
+            "bytes_after": after[col],
+        }
+        for col in df.columns
+    }
+    total_before, total_after = sum(before.values()), sum(after.values())
+    return {
+        "columns": columns,
+        "total_bytes_before": total_before,
+        "total_bytes_after": total_after,
+        "reduction_pct": round(100 * (1 - total_after / total_before), 1)
+        if total_before else 0.0,
+    }
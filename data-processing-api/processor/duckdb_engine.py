@@ -0,0 +1,214 @@
+"""
+Pipeline stages as SQL on an embedded DuckDB database.
+
+Every stage takes and returns a pyarrow Table; DuckDB queries the
+Arrow data in place and materializes the result, so each stage's
+time covers its own work. The stages follow the pandas pipeline:
+same NA handling, same outlier limits, float results for capped
+and mean-replaced values.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from processor import load_data as ld
+from processor import clean as cl
+from processor import metrics as mt
+
+# Row position, so order-dependent steps (forward fill) match the
+# frame engines. It is dropped from the aggregate.
+ROW = "_row"
+
+
+_DB = None
+_LOCK = threading.Lock()
+
+
+def _sql(query: str, table: pa.Table | None = None, params=None) -> pa.Table:
+    global _DB
+    with _LOCK:
+        if _DB is None:
+            import duckdb
+
+            _DB = duckdb.connect()
+    # A cursor per query is cheap and safe to use from any thread;
+    # opening a database each time costs more than small stages.
+    con = _DB.cursor()
+    try:
+        if table is not None:
+            con.register("t", table)
+        return con.execute(query, params).to_arrow_table()
+    finally:
+        con.close()
+
+
+@mt.instrument("load", engine="duckdb")
+def read_duckdb(path: str = ld.DATA_FILE, use_cache: bool = True) -> pa.Table:
+    """
+    Load all sheets into Arrow memory with DuckDB.
+
+    DuckDB reads the combined Parquet copy written by
+    read_all_sheets. It has no Excel reader without the 'excel'
+    extension, so there is no uncached load.
+
+    Args:
+        path (str, optional): Source workbook.
+        use_cache (bool, optional): Must be True.
+    """
+    if not use_cache:
+        raise ValueError("DuckDB loads from the columnar cache only")
+    table = _sql("SELECT * FROM read_parquet(?)", params=[ld.polars_source(path)])
+    return table.append_column(ROW, pa.array(np.arange(table.num_rows)))
+
+
+@mt.instrument("na")
+def duckdb_na_handler(table: pa.Table) -> pa.Table:
+    """
+    Drop rows without Description and forward fill Customer ID.
+
+    Args:
+        table (pa.Table): Raw table.
+    """
+    return _sql(
+        f"""
+        SELECT * REPLACE (
+            last_value("Customer ID" IGNORE NULLS) OVER (
+                ORDER BY {ROW} ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            ) AS "Customer ID"
+        )
+        FROM t
+        WHERE Description IS NOT NULL
+        ORDER BY {ROW}
+        """,
+        table,
+    )
+
+
+@mt.instrument("outliers")
+def handle_outlier_duckdb(table: pa.Table, col: str, method="cap") -> pa.Table:
+    """
+    Handle the outliers of one column with limits computed in SQL.
+
+    Args:
+        table (pa.Table): Table after NA handling.
+        col (str): Column with outliers.
+        method (str, optional): 'cap', 'drop' or 'mean'.
+    """
+    stats = f"""
+        WITH s AS (
+            SELECT
+                quantile_cont("{col}", 0.25) AS q1,
+                quantile_cont("{col}", 0.75) AS q3,
+                avg("{col}") AS mean,
+                stddev_samp("{col}") AS std,
+                min("{col}") AS lo,
+                max("{col}") AS hi
+            FROM t
+        )
+    """
+    if method == "drop":
+        query = f"""
+            {stats}
+            SELECT t.* FROM t, s
+            WHERE NOT (
+                "{col}" < q1 - 1.5 * (q3 - q1) OR "{col}" > q3 + 1.5 * (q3 - q1)
+            )
+            AND COLUMNS(t.*) IS NOT NULL
+        """
+    elif method == "cap":
+        query = f"""
+            {stats}
+            SELECT t.* REPLACE (
+                CASE
+                    WHEN "{col}" > mean + 3 * std THEN mean + 3 * std
+                    WHEN "{col}" < mean - 3 * std THEN mean - 3 * std
+                    ELSE CAST("{col}" AS DOUBLE)
+                END AS "{col}"
+            )
+            FROM t, s
+        """
+    elif method == "mean":
+        # Same limits as the pandas version: the column maximum and minimum.
+        query = f"""
+            {stats}
+            SELECT t.* REPLACE (
+                CASE
+                    WHEN "{col}" > lo THEN mean
+                    WHEN "{col}" < hi THEN mean
+                    ELSE CAST("{col}" AS DOUBLE)
+                END AS "{col}"
+            )
+            FROM t, s
+        """
+    else:
+        raise ValueError(f"Unknown outlier method: {method}")
+    return _sql(f"{query} ORDER BY {ROW}", table)
+
+
+@mt.instrument("transform")
+def transform_duckdb(table: pa.Table) -> pa.Table:
+    """
+    Split InvoiceDate into date, time and day name columns and
+    store Invoice and StockCode as strings.
+
+    Args:
+        table (pa.Table): Table after outlier handling.
+    """
+    return _sql(
+        f"""
+        SELECT
+            * EXCLUDE (InvoiceDate) REPLACE (
+                CAST(Invoice AS VARCHAR) AS Invoice,
+                CAST(StockCode AS VARCHAR) AS StockCode
+            ),
+            InvoiceDate AS InvoiceDateTime,
+            CAST(InvoiceDate AS DATE) AS InvoiceDate,
+            CAST(InvoiceDate AS TIME) AS InvoiceTime,
+            dayname(InvoiceDate) AS NameOfDay
+        FROM t
+        ORDER BY {ROW}
+        """,
+        table,
+    )
+
+
+@mt.instrument("aggregate")
+def aggregate_duckdb(table: pa.Table) -> pa.Table:
+    """
+    Price sum, mean and count per day in weekday order, rounded like
+    aggregate_pandas.
+
+    Args:
+        table (pa.Table): Transformed table.
+    """
+    return _sql(
+        """
+        SELECT
+            NameOfDay,
+            round(sum(Price), 2) AS sum,
+            round(avg(Price), 2) AS mean,
+            count(Price) AS count
+        FROM t
+        GROUP BY NameOfDay
+        ORDER BY list_position(?, NameOfDay)
+        """,
+        table,
+        [cl.DAY_NAMES],
+    )
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Stage output as a pandas frame, without the row position.
+
+    Args:
+        table (pa.Table): Output of any stage.
+    """
+    if ROW in table.column_names:
+        table = table.drop_columns([ROW])
+    return table.to_pandas()
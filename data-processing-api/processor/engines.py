@@ -0,0 +1,199 @@
+"""
+Processing engines compared by the project.
+
+An engine is a set of stage functions (load, NA handling, outlier
+handling, transform, aggregate, serialization of the aggregate to
+JSON bytes) plus a conversion of its stage outputs to pandas, used
+to check that engines agree. pandas and
+polars are always available; DuckDB is registered when installed.
+Further engines are added with register().
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import importlib.util
+import math
+from dataclasses import dataclass
+from typing import Callable
+import pandas as pd
+from processor import load_data as ld
+from processor import clean as cl
+from processor import aggregate as ag
+from processor import respond as rsp
+from processor import interchange as ic
+
+STAGES = ("load", "na", "outliers", "transform", "aggregate", "serialize")
+# Columns summed to compare stage outputs between engines.
+CHECK_COLUMNS = ("Quantity", "Price", "sum", "mean", "count")
+# Aggregates are published with two decimals.
+ROUNDED_COLUMNS = ("sum", "mean")
+
+
+@dataclass(frozen=True)
+class Engine:
+    """
+    Stage functions of one engine.
+
+    load(path, use_cache) returns the raw frame of all sheets,
+    outliers(df, method) handles both outlier columns and the other
+    stages take the previous stage's output. to_pandas converts any
+    stage output except the serialized bytes; serialize defaults to
+    the engine's own JSON writer. cold_load is False for engines
+    that cannot parse the Excel source themselves; their load stage
+    has no cold runs.
+    """
+
+    name: str
+    load: Callable
+    na: Callable
+    outliers: Callable
+    transform: Callable
+    aggregate: Callable
+    to_pandas: Callable
+    serialize: Callable = rsp.frame_json
+    cold_load: bool = True
+
+    def stage(self, stage: str) -> Callable:
+        """
+        Function of a stage by name.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        return getattr(self, stage)
+
+    def run(self, path: str = ld.DATA_FILE, method="cap", use_cache=True):
+        """
+        All stages up to the aggregate in order; returns the aggregate.
+
+        Args:
+            path (str, optional): Source workbook.
+            method (str, optional): Outlier method.
+            use_cache (bool, optional): Load from the columnar cache.
+        """
+        df = self.na(self.load(path, use_cache=use_cache))
+        return self.aggregate(self.transform(self.outliers(df, method)))
+
+
+def _outliers(handler):
+    def run(df, method):
+        for col in cl.COLS:
+            df = handler(df, col=col, method=method)
+        return df
+
+    return run
+
+
+def _load(engine: str):
+    def run(path=ld.DATA_FILE, use_cache=True):
+        return ld.read_all_sheets(engine, path, use_cache)[0]
+
+    return run
+
+
+def _frame_to_pandas(df) -> pd.DataFrame:
+    if isinstance(df, pd.DataFrame):
+        # aggregate_pandas keeps the day names in the index.
+        return df.reset_index() if df.index.name == "NameOfDay" else df
+    return ic.polars_to_pandas(df)
+
+
+ENGINES = {}
+
+
+def register(engine: Engine):
+    """
+    Make an engine available to the benchmark and the API.
+
+    Args:
+        engine (Engine): Engine to add; replaces one of the same name.
+    """
+    ENGINES[engine.name] = engine
+
+
+register(
+    Engine(
+        name="pandas",
+        load=_load("pandas"),
+        na=cl.pd_na_handler,
+        outliers=_outliers(cl.handle_outlier_pandas),
+        transform=cl.transform_df,
+        aggregate=ag.aggregate_pandas,
+        to_pandas=_frame_to_pandas,
+    )
+)
+register(
+    Engine(
+        name="polars",
+        load=_load("polars"),
+        na=cl.pl_na_handler,
+        outliers=_outliers(cl.handle_outlier_polars),
+        transform=cl.transform_df,
+        aggregate=ag.aggregate_polars,
+        to_pandas=_frame_to_pandas,
+    )
+)
+
+if importlib.util.find_spec("duckdb") is not None:
+    from processor import duckdb_engine as db
+
+    register(
+        Engine(
+            name="duckdb",
+            load=db.read_duckdb,
+            na=db.duckdb_na_handler,
+            outliers=_outliers(db.handle_outlier_duckdb),
+            transform=db.transform_duckdb,
+            aggregate=db.aggregate_duckdb,
+            to_pandas=db.to_pandas,
+            cold_load=False,
+        )
+    )
+
+
+def fingerprint(df: pd.DataFrame) -> dict:
+    """
+    Row count and column totals of a stage output, comparable
+    across engines.
+
+    Args:
+        df (pd.DataFrame): Stage output converted with to_pandas.
+    """
+    res = {"rows": len(df)}
+    for col in CHECK_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col])
+        if col in ROUNDED_COLUMNS:
+            values = values.round(2)
+        res[col] = float(values.sum())
+    return res
+
+
+def compare(fingerprints: dict, reference: str, rel_tol: float = 1e-6) -> dict:
+    """
+    Compare every engine's fingerprint of a stage with the reference
+    engine's.
+
+    Returns per engine whether it matches and, if not, which
+    values differ.
+
+    Args:
+        fingerprints (dict): Engine name to fingerprint.
+        reference (str): Engine the others are compared with.
+        rel_tol (float, optional): Relative tolerance for totals.
+    """
+    expected = fingerprints[reference]
+    res = {}
+    for engine, values in fingerprints.items():
+        if engine == reference:
+            continue
+        diff = {
+            key: {"expected": expected[key], "actual": values.get(key)}
+            for key in expected
+            if values.get(key) is None
+            or not math.isclose(values[key], expected[key], rel_tol=rel_tol)
+        }
+        res[engine] = {"equivalent": not diff, "differences": diff}
+    return res
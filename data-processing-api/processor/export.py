@@ -0,0 +1,333 @@
+"""
+Streaming exports of cleaned datasets.
+
+NDJSON and Arrow IPC are produced in row batches and Parquet one
+row group at a time, so the response starts before the whole file exists and
+memory stays bounded by the batch size. Finished exports are kept
+as content-addressed artifacts written atomically, so concurrent
+requests never share a half-written file.
+Stored artifacts are served with byte ranges, and the footer of a
+Parquet artifact is described per column chunk, so remote readers
+can fetch only the row groups and columns they need.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from processor import cache
+from processor import interchange as ic
+
+BATCH_ROWS = 50_000
+ROW_GROUP_ROWS = 100_000
+CHUNK_BYTES = 1 << 20
+
+
+def artifact_key(*parts) -> str:
+    """
+    Content address of an export, derived from everything that
+    determines its bytes (data version, engine, method, format).
+    """
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def artifact_path(key: str, ext: str) -> str:
+    """
+    Location of a finished artifact.
+
+    Args:
+        key (str): Content address from artifact_key.
+        ext (str): File extension.
+    """
+    return os.path.join(cache.CACHE_DIR, "artifacts", f"{key}.{ext}")
+
+
+def _batches(df: pd.DataFrame | pl.DataFrame, rows: int):
+    for offset in range(0, len(df), rows):
+        if isinstance(df, pl.DataFrame):
+            yield df.slice(offset, rows)
+        else:
+            yield df.iloc[offset:offset + rows]
+
+
+def iter_ndjson(df: pd.DataFrame | pl.DataFrame, batch_rows: int = BATCH_ROWS):
+    """
+    Yield the frame as newline-delimited JSON, one batch at a time.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        batch_rows (int, optional): Rows per yielded chunk.
+    """
+    for batch in _batches(df, batch_rows):
+        if isinstance(batch, pl.DataFrame):
+            text = batch.write_ndjson()
+        else:
+            text = batch.to_json(orient="records", lines=True, date_format="iso")
+        if text and not text.endswith("\n"):
+            text += "\n"
+        yield text.encode()
+
+
+def pandas_arrow_schema(df: pd.DataFrame) -> pa.Schema:
+    """
+    Arrow schema for a pandas frame whose object columns may mix
+    types. Mixed and string columns become Arrow strings.
+
+    Args:
+        df (pd.DataFrame): Pandas Dataframe
+    """
+    fields = []
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object:
+            sample = values.dropna().head(1000)
+            try:
+                dtype = pa.infer_type(sample) if len(sample) else pa.string()
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                dtype = pa.string()
+            if not (pa.types.is_date(dtype) or pa.types.is_time(dtype)):
+                dtype = pa.string()
+        else:
+            dtype = pa.Schema.from_pandas(df[[col]].head(0), preserve_index=False).field(col).type
+        fields.append(pa.field(str(col), dtype))
+    return pa.schema(fields)
+
+
+def _arrow_batch(batch: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    batch = batch.copy()
+    for field in schema:
+        if pa.types.is_string(field.type) and batch[field.name].dtype == object:
+            values = batch[field.name]
+            batch[field.name] = values.where(values.isna(), values.astype(str))
+    return ic.pandas_to_arrow(batch, schema)
+
+
+def arrow_schema(df: pd.DataFrame | pl.DataFrame) -> pa.Schema:
+    """
+    Arrow schema shared by every batch of the frame.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    if isinstance(df, pl.DataFrame):
+        return ic.to_arrow(df.head(0)).schema
+    return pandas_arrow_schema(df)
+
+
+def iter_arrow_tables(df: pd.DataFrame | pl.DataFrame, batch_rows: int, schema=None):
+    """
+    Yield the frame as Arrow tables of at most batch_rows rows.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        batch_rows (int): Rows per table.
+        schema (pa.Schema, optional): Schema from arrow_schema.
+    """
+    schema = schema or arrow_schema(df)
+    for batch in _batches(df, batch_rows):
+        if isinstance(batch, pl.DataFrame):
+            yield ic.to_arrow(batch)
+        else:
+            yield _arrow_batch(batch, schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back in chunks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(
+    df: pd.DataFrame | pl.DataFrame, row_group_rows: int = ROW_GROUP_ROWS,
+    compression="snappy",
+):
+    """
+    Yield a Parquet file one row group at a time.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        row_group_rows (int, optional): Rows per row group.
+        compression (str, optional): Parquet codec.
+    """
+    sink = _ChunkSink()
+    schema = arrow_schema(df)
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    for table in iter_arrow_tables(df, row_group_rows, schema):
+        writer.write_table(table, row_group_size=row_group_rows)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def iter_arrow_ipc(df: pd.DataFrame | pl.DataFrame, batch_rows: int = BATCH_ROWS):
+    """
+    Yield the frame as an Arrow IPC file, one record batch at a time.
+
+    The IPC file format ends with a footer, so the downloaded file
+    can be memory-mapped with pyarrow.ipc.open_file.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        batch_rows (int, optional): Rows per record batch.
+    """
+    sink = _ChunkSink()
+    schema = arrow_schema(df)
+    with pa.ipc.new_file(sink, schema) as writer:
+        for table in iter_arrow_tables(df, batch_rows, schema):
+            for batch in table.to_batches():
+                writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _read_chunks(path: str):
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_BYTES):
+            yield chunk
+
+
+def stream_artifact(path: str, chunks):
+    """
+    Stream an artifact, producing and storing it on first use.
+
+    The first request streams freshly produced chunks while teeing
+    them into a private temporary file, which is atomically moved
+    into place once complete. Later requests read the stored file.
+
+    Args:
+        path (str): Artifact location.
+        chunks (iterable): Zero-argument callable returning the bytes chunks.
+    """
+    if os.path.exists(path):
+        yield from _read_chunks(path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    complete = False
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for chunk in chunks():
+                file.write(chunk)
+                yield chunk
+        os.replace(tmp, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def ensure_artifact(path: str, chunks) -> str:
+    """
+    Produce and store an artifact unless it exists, for responses
+    that need the finished file (byte ranges, sizes).
+
+    Args:
+        path (str): Artifact location.
+        chunks (iterable): Zero-argument callable returning the bytes chunks.
+    """
+    if not os.path.exists(path):
+        for _ in stream_artifact(path, chunks):
+            pass
+    return path
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match header names the ETag, with the weak
+    comparison conditional GETs use.
+
+    Args:
+        if_none_match (str): If-None-Match request header.
+        etag (str): Current quoted ETag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _statistic(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def parquet_footer(path: str) -> dict:
+    """
+    File size, footer location, schema and the byte range of every
+    column chunk of a Parquet file, with its min/max statistics.
+
+    Args:
+        path (str): Parquet file.
+    """
+    parquet = pq.ParquetFile(path)
+    metadata = parquet.metadata
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        # The file ends with the footer length and the magic bytes.
+        file.seek(size - 8)
+        footer_length = int.from_bytes(file.read(4), "little")
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        columns = []
+        for j in range(row_group.num_columns):
+            chunk = row_group.column(j)
+            offset = chunk.data_page_offset
+            if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                offset = min(offset, chunk.dictionary_page_offset)
+            stats = chunk.statistics
+            has_min_max = stats is not None and stats.has_min_max
+            columns.append({
+                "name": chunk.path_in_schema,
+                "offset": offset,
+                "length": chunk.total_compressed_size,
+                "compression": chunk.compression,
+                "null_count": stats.null_count if stats is not None else None,
+                "min": _statistic(stats.min) if has_min_max else None,
+                "max": _statistic(stats.max) if has_min_max else None,
+            })
+        row_groups.append({
+            "index": i,
+            "num_rows": row_group.num_rows,
+            "total_byte_size": row_group.total_byte_size,
+            "columns": columns,
+        })
+    return {
+        "size": size,
+        "footer": {"offset": size - 8 - footer_length, "length": footer_length + 8},
+        "num_rows": metadata.num_rows,
+        "created_by": metadata.created_by,
+        "schema": [{"name": field.name, "type": str(field.type)}
+                   for field in parquet.schema_arrow],
+        "row_groups": row_groups,
+    }
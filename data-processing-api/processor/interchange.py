@@ -0,0 +1,75 @@
+"""
+Arrow-backed interchange between pandas and polars.
+
+Both engines can hold their columns in Arrow memory: polars
+natively and pandas through ArrowDtype. Converting through Arrow
+hands numeric buffers over without copying them, unlike
+to_pandas() / pl.from_pandas() on numpy-backed frames. Engine
+comparisons, the revenue cube, exports and Arrow responses convert
+through here.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+
+def pandas_to_arrow(df: pd.DataFrame, schema: pa.Schema | None = None) -> pa.Table:
+    """
+    Arrow table view of a pandas frame. ArrowDtype columns and
+    numpy numeric columns are wrapped without a copy.
+
+    Args:
+        df (pd.DataFrame): Pandas Dataframe
+        schema (pa.Schema, optional): Schema to convert to; inferred
+        by default.
+    """
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Pandas frame with ArrowDtype columns sharing the table's buffers.
+
+    Args:
+        table (pa.Table): Arrow table.
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def polars_to_pandas(df: pl.DataFrame) -> pd.DataFrame:
+    """
+    Convert a polars frame to pandas (ArrowDtype) without copying
+    numeric buffers.
+
+    Args:
+        df (pl.DataFrame): Polars Dataframe
+    """
+    return df.to_pandas(use_pyarrow_extension_array=True)
+
+
+def pandas_to_polars(df: pd.DataFrame) -> pl.DataFrame:
+    """
+    Convert a pandas frame to polars through Arrow. Numeric
+    buffers of ArrowDtype and numpy columns are reused.
+
+    Args:
+        df (pd.DataFrame): Pandas Dataframe
+    """
+    return pl.from_arrow(pandas_to_arrow(df))
+
+
+def to_arrow(df: pd.DataFrame | pl.DataFrame) -> pa.Table:
+    """
+    Arrow table for a frame of either engine.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    if isinstance(df, pl.DataFrame):
+        return df.to_arrow()
+    return pandas_to_arrow(df)
@@ -0,0 +1,285 @@
+"""
+Background jobs for the CPU-heavy endpoints.
+
+Processing and benchmark runs are executed in a process pool so
+the API's event loop stays free. Jobs are identified by a hash of
+their kind, parameters, server configuration and data version:
+submitting an identical job while it runs returns the running
+one, and finished results are served from memory.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from processor import load_data as ld
+from processor import append as ap
+from processor import clean as cl
+from processor import dtypes as dt
+from processor import stats as st
+from processor import aggregate as ag
+from processor import benchmark as bm
+from processor import lazy
+from processor import chunked
+
+MAX_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+MAX_FINISHED = 100
+
+
+def _clean(engine: str, raw, method: str, typed: bool, epsilon: float | None):
+    # The limits cleaned_data uses: from sketches with epsilon set,
+    # exact otherwise.
+    sketches = None
+    if epsilon:
+        sketches = st.sketch_columns(chunked.NaCarry(engine)(raw), epsilon)
+    return ap.Appender(typed=typed).clean_frame(engine, raw, method, sketches)
+
+
+def run_processing(
+    path: str = ld.DATA_FILE, mode="eager", pandas_method="cap", polars_method="drop",
+    typed: bool = False, optimize: bool = False, epsilon: float | None = None,
+) -> dict:
+    """
+    Job body of /Data Processing: aggregates of both engines.
+
+    The server's configuration is passed in rather than read from
+    the worker's environment, so a job computes what the endpoint
+    would on the same version.
+
+    Args:
+        path (str, optional): Source workbook.
+        mode (str, optional): 'eager' or 'lazy' for the polars side,
+        or 'chunked' for both engines.
+        pandas_method (str, optional): Outlier method for pandas.
+        polars_method (str, optional): Outlier method for polars.
+        typed (bool, optional): Typed datetime derivation
+        (TYPED_TRANSFORM).
+        optimize (bool, optional): Load with the memory-optimized
+        dtype profile (OPTIMIZE_DTYPES).
+        epsilon (float, optional): Rank error of approximate outlier
+        limits (QUANTILE_EPSILON); exact when None.
+    """
+    if mode == "chunked":
+        return {
+            "pandas": json.loads(chunked.run_chunked(
+                path, "pandas", pandas_method, epsilon=epsilon or 0, typed=typed,
+            ).to_json()),
+            "polars": json.loads(chunked.run_chunked(
+                path, "polars", polars_method, epsilon=epsilon or 0, typed=typed,
+            ).write_json()),
+        }
+
+    def raw(engine):
+        df = ld.read_all_sheets(engine, path)[0]
+        return dt.optimize(df) if optimize else df
+
+    pandas_aggregate = ag.aggregate_pandas(
+        _clean("pandas", raw("pandas"), pandas_method, typed, epsilon)
+    )
+    if mode == "lazy":
+        polars_aggregate = lazy.run_pipeline(path, polars_method, typed=typed)
+    else:
+        polars_aggregate = ag.aggregate_polars(
+            _clean("polars", raw("polars"), polars_method, typed, epsilon)
+        )
+    return {
+        "pandas": json.loads(pandas_aggregate.to_json()),
+        "polars": json.loads(polars_aggregate.write_json()),
+    }
+
+
+def run_benchmark(**params) -> dict:
+    """
+    Job body of /Time Comparison.
+    """
+    for key in ("engines", "stages"):
+        if key in params:
+            params[key] = tuple(params[key])
+    return bm.run_benchmark(**params)
+
+
+JOB_KINDS = {
+    "processing": run_processing,
+    "benchmark": run_benchmark,
+}
+# Parameters a client may set per job kind, with their type and
+# allowed values. Paths and output directories stay server-side.
+JOB_PARAMS = {
+    "processing": {
+        "mode": (str, ("eager", "lazy", "chunked")),
+        "pandas_method": (str, cl.METHODS),
+        "polars_method": (str, cl.METHODS),
+    },
+    "benchmark": {
+        "engines": (list, tuple(bm.ENGINES)),
+        "stages": (list, bm.STAGES),
+        "iterations": (int, range(1, 101)),
+        "warmup": (int, range(0, 101)),
+        "cold": (int, range(0, 101)),
+        "method": (str, cl.METHODS),
+    },
+}
+
+
+def validate_params(kind: str, params: dict) -> dict:
+    """
+    Check client parameters of a job against JOB_PARAMS.
+
+    Raises ValueError for unknown keys, wrong types and values
+    outside the allowed ones.
+
+    Args:
+        kind (str): Job kind.
+        params (dict): Client parameters.
+    """
+    spec = JOB_PARAMS[kind]
+    unknown = set(params) - set(spec)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {kind} jobs: {sorted(unknown)}")
+    for name, value in params.items():
+        expected, allowed = spec[name]
+        if expected is list:
+            valid = isinstance(value, list) and value and all(
+                isinstance(item, str) for item in value)
+        else:
+            # bool is an int subclass, but never a valid count.
+            valid = isinstance(value, expected) and not isinstance(value, bool)
+        if not valid:
+            raise ValueError(f"{name} must be a {expected.__name__}: {value!r}")
+        items = value if expected is list else [value]
+        if any(item not in allowed for item in items):
+            raise ValueError(f"Invalid {name}: {value!r}")
+    return params
+
+
+def _failed(future) -> bool:
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+
+def job_id(kind: str, params: dict, version: str = "") -> str:
+    """
+    Identifier shared by identical jobs.
+
+    Args:
+        kind (str): Job kind.
+        params (dict): Job parameters.
+        version (str, optional): Data version the job runs on.
+    """
+    payload = json.dumps([kind, params, version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class JobManager:
+    """
+    Runs jobs in a process pool with de-duplication and a result cache.
+
+    Args:
+        max_workers (int, optional): Worker processes.
+        path (str, optional): Source workbook every job reads.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, path: str = ld.DATA_FILE):
+        self.max_workers = max_workers
+        self.path = path
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # polars is not fork-safe, so workers are spawned.
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, kind: str, params: dict | None = None, version: str = "",
+               config: dict | None = None) -> dict:
+        """
+        Queue a job, or return the identical job already known.
+
+        Args:
+            kind (str): One of JOB_KINDS.
+            params (dict, optional): Client parameters of the job body;
+            see JOB_PARAMS.
+            version (str, optional): Data version of the source file
+            the job reads.
+            config (dict, optional): Server-side arguments of the job
+            body, e.g. run_processing's typed, optimize and epsilon.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        params = validate_params(kind, params or {})
+        config = config or {}
+        ident = job_id(kind, {**params, **config}, version)
+        with self._lock:
+            job = self._jobs.get(ident)
+            if job is not None and _failed(job["future"]):
+                job = None
+            if job is None:
+                job = {
+                    "id": ident,
+                    "kind": kind,
+                    "params": params,
+                    "submitted": time.time(),
+                    "future": self._pool().submit(JOB_KINDS[kind], path=self.path,
+                                                  **params, **config),
+                }
+                self._jobs[ident] = job
+                self._trim()
+            self._jobs.move_to_end(ident)
+        return self.status(ident)
+
+    def _trim(self):
+        finished = [k for k, j in self._jobs.items() if j["future"].done()]
+        for key in finished[: max(len(finished) - MAX_FINISHED, 0)]:
+            del self._jobs[key]
+
+    def status(self, ident: str) -> dict | None:
+        """
+        Public view of a job, or None if unknown.
+
+        Args:
+            ident (str): Job id.
+        """
+        with self._lock:
+            job = self._jobs.get(ident)
+        if job is None:
+            return None
+        future = job["future"]
+        if future.done():
+            state = "failed" if _failed(future) else "done"
+        else:
+            state = "running" if future.running() else "queued"
+        view = {k: job[k] for k in ("id", "kind", "params", "submitted")}
+        view["status"] = state
+        if state == "failed":
+            view["error"] = "cancelled" if future.cancelled() else repr(future.exception())
+        return view
+
+    def result(self, ident: str):
+        """
+        Result of a finished job.
+
+        Args:
+            ident (str): Job id.
+        """
+        with self._lock:
+            job = self._jobs[ident]
+        return job["future"].result(timeout=0)
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
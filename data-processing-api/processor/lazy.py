@@ -0,0 +1,59 @@
+"""
+Lazy end-to-end polars pipeline.
+
+The scan, NA handling, outlier handling, transformation and
+aggregation are chained into a single LazyFrame, so polars
+optimizes the whole plan and only materializes the aggregate.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import polars as pl
+from processor import load_data as ld
+from processor import clean as cl
+from processor import aggregate as ag
+
+
+def build_pipeline(path: str = ld.DATA_FILE, method="drop",
+                   typed: bool = False) -> pl.LazyFrame:
+    """
+    Query plan from the cached columnar source to the aggregate.
+
+    Args:
+        path (str, optional): Source workbook.
+        method (str, optional): Outlier method. Defaults to 'drop'.
+        typed (bool, optional): Typed datetime derivation, as
+        transform_df.
+    """
+    return ag.aggregate_polars(
+        cl.clean_pipeline(ld.scan_polars(path), method, typed=typed)
+    )
+
+
+def explain(path: str = ld.DATA_FILE, method="drop", optimized=True,
+            typed: bool = False) -> str:
+    """
+    Text dump of the pipeline's query plan.
+
+    Args:
+        path (str, optional): Source workbook.
+        method (str, optional): Outlier method. Defaults to 'drop'.
+        optimized (bool, optional): Show the plan after optimization.
+        typed (bool, optional): Typed datetime derivation.
+    """
+    return build_pipeline(path, method, typed).explain(optimized=optimized)
+
+
+def run_pipeline(path: str = ld.DATA_FILE, method="drop",
+                 typed: bool = False) -> pl.DataFrame:
+    """
+    Execute the lazy pipeline and return the aggregate.
+
+    Args:
+        path (str, optional): Source workbook.
+        method (str, optional): Outlier method. Defaults to 'drop'.
+        typed (bool, optional): Typed datetime derivation.
+    """
+    return build_pipeline(path, method, typed).collect()
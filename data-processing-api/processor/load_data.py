@@ -6,41 +6,290 @@ Email: Iyanuvicky@gmail.com\n
 GitHub: https://github.com/Iyanuvicky22/projects
 """
 
+import json
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import polars as pl
+import pyarrow.parquet as pq
+from processor import cache
+from processor import metrics as mt
 
+DATA_FILE = "online_retail_II.xlsx"
 
-def read_pandas() -> pd.DataFrame:
+
+def _read_sheet(engine: str, path: str, sheet: int):
+    if engine == "pandas":
+        return pd.read_excel(path, sheet_name=sheet)
+    # polars numbers sheets from 1.
+    return pl.read_excel(path, sheet_id=sheet + 1)
+
+
+def read_sheet(engine: str, path: str = DATA_FILE, sheet: int = 0,
+               use_cache: bool = True, cache_dir: str | None = None):
+    """
+    Read one sheet of the workbook with either engine.
+
+    The first read stores the sheet in the columnar cache and
+    later reads load the Parquet copy instead of parsing Excel.
+
+    Args:
+        engine (str): 'pandas' or 'polars'.
+        path (str, optional): Source workbook.
+        sheet (int, optional): Zero-based sheet position.
+        use_cache (bool, optional): Set to False to force the raw
+        Excel path, e.g. for benchmarks.
+        cache_dir (str, optional): Cache directory.
+    """
+    if not use_cache:
+        return _read_sheet(engine, path, sheet)
+    cached = cache.cache_file(path, sheet, engine, cache_dir)
+    if engine == "pandas":
+        if os.path.exists(cached):
+            return pd.read_parquet(cached, engine="pyarrow")
+        df = cache.arrow_safe(_read_sheet(engine, path, sheet))
+        cache.write_pandas(df, cached)
+        return df
+    if os.path.exists(cached):
+        return pl.read_parquet(cached)
+    df = _read_sheet(engine, path, sheet)
+    cache.write_polars(df, cached)
+    return df
+
+
+@mt.instrument("load", engine="pandas")
+def read_pandas(path: str = DATA_FILE, use_cache: bool = True) -> pd.DataFrame:
     """
     This function reads the year 2009-2010
     xlxs file using pandas.
+
+    Args:
+        path (str, optional): Source workbook.
+        use_cache (bool, optional): Set to False to force the raw
+        Excel path, e.g. for benchmarks.
     """
-    df_pd = pd.read_excel("online_retail_II.xlsx", sheet_name=0)
-    return df_pd
+    return read_sheet("pandas", path, 0, use_cache)
 
 
-def read_polars() -> pl.DataFrame:
+@mt.instrument("load", engine="polars")
+def read_polars(path: str = DATA_FILE, use_cache: bool = True) -> pl.DataFrame:
     """
-    This function reads the year 2010-2011
+    This function reads the year 2009-2010
     xlxs file using polars.
+
+    Args:
+        path (str, optional): Source workbook.
+        use_cache (bool, optional): Set to False to force the raw
+        Excel path, e.g. for benchmarks.
+    """
+    return read_sheet("polars", path, 0, use_cache)
+
+
+def sheet_names(path: str = DATA_FILE) -> list:
+    """
+    Names of the workbook's sheets, in order.
+
+    Args:
+        path (str, optional): Source workbook.
+    """
+    with pd.ExcelFile(path) as book:
+        return list(book.sheet_names)
+
+
+def _load_sheet(engine: str, path: str, sheet: int, use_cache: bool,
+                cache_dir: str) -> dict:
+    """
+    Worker body: parse one sheet into its cache entry.
+    """
+    start = time.perf_counter()
+    cached = cache.cache_file(path, sheet, engine, cache_dir)
+    if not use_cache or not os.path.exists(cached):
+        if engine == "pandas":
+            df = cache.arrow_safe(_read_sheet(engine, path, sheet))
+            cache.write_pandas(df, cached)
+        else:
+            df = _read_sheet(engine, path, sheet)
+            cache.write_polars(df, cached)
+        rows, parsed = len(df), True
+    else:
+        rows, parsed = pq.ParquetFile(cached).metadata.num_rows, False
+    return {
+        "sheet": sheet,
+        "path": cached,
+        "rows": rows,
+        "parsed": parsed,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def union_pandas(frames: list) -> pd.DataFrame:
+    """
+    Stack sheets read by pandas into one frame.
+
+    Columns that are numeric in one sheet and mixed in another
+    end up as object; arrow_safe turns them into strings again.
+
+    Args:
+        frames (list): Pandas Dataframes with the same columns.
+    """
+    return cache.arrow_safe(pd.concat(frames, ignore_index=True))
+
+
+def union_polars(frames: list) -> pl.DataFrame:
+    """
+    Stack sheets read by polars into one frame.
+
+    Numeric columns are widened to a common type; any other
+    column whose type differs between sheets becomes a string.
+
+    Args:
+        frames (list): Polars Dataframes with the same columns.
+    """
+    mixed = [
+        col for col in frames[0].columns
+        if len({df.schema[col] for df in frames}) > 1
+        and not all(df.schema[col].is_numeric() for df in frames)
+    ]
+    frames = [df.with_columns(pl.col(mixed).cast(pl.String)) for df in frames]
+    return pl.concat(frames, how="vertical_relaxed")
+
+
+def _sheet_report_path(combined: str) -> str:
+    return os.path.splitext(combined)[0] + "-sheets.json"
+
+
+def _write_sheet_report(combined: str, sheets: list):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(sheets, file)
+
+    cache._atomic_write(_sheet_report_path(combined), write)
+
+
+def _read_sheet_report(combined: str) -> list:
+    try:
+        with open(_sheet_report_path(combined), encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+@mt.instrument("load")
+def read_all_sheets(engine: str, path: str = DATA_FILE, use_cache: bool = True,
+                    workers: int | None = None) -> tuple:
     """
-    df_pl = pl.read_excel("online_retail_II.xlsx", sheet_id=1)
-    return df_pl
+    Read every sheet of the workbook and union them.
+
+    Sheets that are not cached yet are parsed in parallel worker
+    processes, each writing its own Parquet entry. The combined
+    frame is cached as well, with the per-sheet report next to it,
+    so later calls read a single file and never open the workbook.
 
+    Returns the frame and a timing report with one entry per sheet;
+    for a cached frame, the entries of the load that built it.
 
-def compare_time(pd_func, pl_func, action="Loading Time") -> list:
+    Args:
+        engine (str): 'pandas' or 'polars'.
+        path (str, optional): Source workbook.
+        use_cache (bool, optional): Set to False to re-parse every
+        sheet from Excel.
+        workers (int, optional): Worker processes; 1 parses the
+        sheets one after another in this process.
+    """
+    if engine not in ("pandas", "polars"):
+        raise ValueError(f"Unknown engine: {engine}")
+    start = time.perf_counter()
+    cache_dir = cache.CACHE_DIR
+    combined = cache.cache_file(path, "all", engine, cache_dir)
+    if use_cache and os.path.exists(combined):
+        df = (pd.read_parquet(combined, engine="pyarrow") if engine == "pandas"
+              else pl.read_parquet(combined))
+        return df, {
+            "engine": engine,
+            "sheets": _read_sheet_report(combined),
+            "combined_cached": True,
+            "rows": len(df),
+            "wall_seconds": round(time.perf_counter() - start, 4),
+        }
+
+    names = sheet_names(path)
+    workers = workers or len(names)
+    jobs = [(engine, path, sheet, use_cache, cache_dir)
+            for sheet in range(len(names))]
+    if workers == 1 or len(jobs) == 1:
+        loaded = [_load_sheet(*job) for job in jobs]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            loaded = list(pool.map(_load_sheet, *zip(*jobs)))
+
+    if engine == "pandas":
+        frames = [pd.read_parquet(item["path"], engine="pyarrow") for item in loaded]
+        df = union_pandas(frames)
+        cache.write_pandas(df, combined)
+    else:
+        frames = [pl.read_parquet(item["path"]) for item in loaded]
+        df = union_polars(frames)
+        cache.write_polars(df, combined)
+
+    wall = time.perf_counter() - start
+    sheets = [
+        {"name": names[item["sheet"]], **{k: v for k, v in item.items() if k != "path"}}
+        for item in loaded
+    ]
+    _write_sheet_report(combined, sheets)
+    return df, {
+        "engine": engine,
+        "sheets": sheets,
+        "combined_cached": False,
+        "rows": len(df),
+        "workers": min(workers, len(jobs)),
+        "wall_seconds": round(wall, 4),
+        "speedup": round(sum(item["seconds"] for item in loaded) / wall, 2),
+    }
+
+
+def polars_source(path: str = DATA_FILE) -> str:
+    """
+    Path of the cached Parquet copy of all sheets read by
+    polars, building it first if needed.
+
+    Args:
+        path (str, optional): Source workbook.
+    """
+    combined = cache.cache_file(path, "all", "polars")
+    if not os.path.exists(combined):
+        read_all_sheets("polars", path)
+    return combined
+
+
+def scan_polars(path: str = DATA_FILE) -> pl.LazyFrame:
+    """
+    Lazily scan the combined polars dataset from the columnar cache.
+
+    Args:
+        path (str, optional): Source workbook.
+    """
+    return pl.scan_parquet(polars_source(path))
+
+
+def compare_time(pd_func, pl_func, action="Loading Time", **kwargs) -> list:
     """
     This function compares loading
     times of the above two functions.
+
+    Extra keyword arguments (e.g. use_cache=False) are passed
+    to both functions.
     """
     try:
         start = time.time()
-        pd_func()
+        pd_func(**kwargs)
         end = time.time()
 
         start_2 = time.time()
-        pl_func()
+        pl_func(**kwargs)
         end_2 = time.time()
 
         res = [
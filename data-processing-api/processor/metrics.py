@@ -0,0 +1,244 @@
+"""
+Prometheus-style metrics of the pipeline stages.
+
+Stage functions are wrapped with instrument(); every call records
+its latency in a histogram, the rows of its input and output frame,
+and how far the resident set size grew from the start to the end
+of the call (memory the call kept, such as its output), labelled
+by stage and engine. render() writes the Prometheus text format for
+/metrics.
+
+Set PROCESSOR_METRICS=0 to turn recording off; a disabled wrapper
+only checks one flag before calling the function.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import functools
+import os
+import resource
+import sys
+import threading
+import time
+from bisect import bisect_left
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+ENABLED = os.environ.get("PROCESSOR_METRICS", "1") == "1"
+# Upper bounds in seconds; +Inf is implied.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_LOCK = threading.Lock()
+_STAGES = {}
+
+
+class StageMetrics:
+    """
+    Metrics of one (stage, engine) pair.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.seconds = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.max_rss_growth = 0
+
+    def observe(self, seconds: float, rows_in, rows_out, rss_growth: int, error: bool):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.seconds += seconds
+        self.calls += 1
+        self.errors += error
+        self.rows_in += rows_in or 0
+        self.rows_out += rows_out or 0
+        self.max_rss_growth = max(self.max_rss_growth, rss_growth)
+
+
+def enable(flag: bool = True):
+    """
+    Turn recording on or off at runtime.
+
+    Args:
+        flag (bool, optional): Whether to record.
+    """
+    global ENABLED
+    ENABLED = flag
+
+
+def _rows(obj) -> int | None:
+    if isinstance(obj, (pd.DataFrame, pl.DataFrame)):
+        return len(obj)
+    if isinstance(obj, pa.Table):
+        return obj.num_rows
+    return None
+
+
+def _engine(obj) -> str | None:
+    if isinstance(obj, pd.DataFrame):
+        return "pandas"
+    if isinstance(obj, (pl.DataFrame, pl.LazyFrame)):
+        return "polars"
+    if isinstance(obj, pa.Table):
+        return "duckdb"
+    if isinstance(obj, str) and obj in ("pandas", "polars", "duckdb"):
+        return obj
+    return None
+
+
+def _rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+def current_rss() -> int | None:
+    """
+    Resident set size of the process right now in bytes, or None
+    where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _growth(before: int | None) -> int:
+    after = current_rss()
+    return 0 if before is None or after is None else max(after - before, 0)
+
+
+def observe(stage: str, engine: str, seconds: float, rows_in=None, rows_out=None,
+            rss_growth: int = 0, error: bool = False):
+    """
+    Record one call of a stage.
+
+    Args:
+        stage (str): Stage name.
+        engine (str): Engine name.
+        seconds (float): Duration.
+        rows_in (int, optional): Rows of the input frame.
+        rows_out (int, optional): Rows of the output frame.
+        rss_growth (int, optional): Bytes the current RSS grew by
+        from the start to the end of the call.
+        error (bool, optional): Whether the call raised.
+    """
+    with _LOCK:
+        metrics = _STAGES.get((stage, engine))
+        if metrics is None:
+            metrics = _STAGES[stage, engine] = StageMetrics()
+        metrics.observe(seconds, rows_in, rows_out, rss_growth, error)
+
+
+def instrument(stage: str, engine: str | None = None):
+    """
+    Decorator recording every call of a stage function.
+
+    The engine label is taken from the first argument (a frame or
+    an engine name) or else from the result, unless given.
+
+    Args:
+        stage (str): Stage name: load, na, outliers, transform,
+        aggregate or serialize.
+        engine (str, optional): Fixed engine label.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            first = args[0] if args else None
+            rss = current_rss()
+            start = time.perf_counter()
+            result, error = None, True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                seconds = time.perf_counter() - start
+                observe(
+                    stage, engine or _engine(first) or _engine(result) or "unknown",
+                    seconds, _rows(first), _rows(result), _growth(rss), error,
+                )
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot() -> dict:
+    """
+    Current values per (stage, engine), for tests and JSON reports.
+    """
+    with _LOCK:
+        return {
+            key: {
+                "calls": m.calls, "errors": m.errors, "seconds": m.seconds,
+                "rows_in": m.rows_in, "rows_out": m.rows_out,
+                "max_rss_growth": m.max_rss_growth, "buckets": list(m.buckets),
+            }
+            for key, m in _STAGES.items()
+        }
+
+
+def reset():
+    """
+    Forget all recorded values.
+    """
+    with _LOCK:
+        _STAGES.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(stage: str, engine: str, **extra) -> str:
+    pairs = {"stage": stage, "engine": engine, **extra}
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items()) + "}"
+
+
+def render() -> str:
+    """
+    All metrics in the Prometheus text exposition format (0.0.4).
+    """
+    stages = snapshot()
+    lines = [
+        "# HELP processor_stage_seconds Duration of pipeline stage calls.",
+        "# TYPE processor_stage_seconds histogram",
+    ]
+    for (stage, engine), m in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), m["buckets"]):
+            cumulative += count
+            labels = _labels(stage, engine, le=bound)
+            lines.append(f"processor_stage_seconds_bucket{labels} {cumulative}")
+        lines.append(f"processor_stage_seconds_sum{_labels(stage, engine)} {m['seconds']:.9f}")
+        lines.append(f"processor_stage_seconds_count{_labels(stage, engine)} {m['calls']}")
+    counters = (
+        ("processor_stage_rows_in_total", "rows_in", "counter", "Rows of stage inputs."),
+        ("processor_stage_rows_out_total", "rows_out", "counter", "Rows of stage outputs."),
+        ("processor_stage_errors_total", "errors", "counter", "Stage calls that raised."),
+        ("processor_stage_max_rss_growth_bytes", "max_rss_growth", "gauge",
+         "Largest growth of the resident set size from the start to the end "
+         "of one stage call."),
+    )
+    for name, field, kind, text in counters:
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{_labels(stage, engine)} {m[field]}"
+                  for (stage, engine), m in sorted(stages.items())]
+    lines += [
+        "# HELP process_peak_rss_bytes Peak resident set size of the process.",
+        "# TYPE process_peak_rss_bytes gauge",
+        f"process_peak_rss_bytes {_rss()}",
+    ]
+    return "\n".join(lines) + "\n"
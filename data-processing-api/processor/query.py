@@ -0,0 +1,243 @@
+"""
+Filtered, paginated queries over the cleaned data.
+
+The cleaned frame is written once per data version as a Parquet
+layout sorted by InvoiceDateTime, with small row groups that carry
+min/max statistics. A query skips every row group whose statistics
+rule out its filters, reads only the columns it needs from the
+rest, in sort order, and stops as soon as the requested page is
+full, so a narrow date range never scans the whole dataset.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import os
+import threading
+from datetime import date, datetime, timedelta
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from processor import cache
+from processor import export as ex
+
+SORT_COLUMN = "InvoiceDateTime"
+ROW_GROUP_ROWS = 10_000
+MAX_LIMIT = 1000
+# Query parameter to column of the equality filters.
+FILTER_COLUMNS = {
+    "country": "Country",
+    "stock_code": "StockCode",
+    "customer_id": "Customer ID",
+}
+
+_BUILD_LOCK = threading.Lock()
+
+
+def layout_path(version: str, engine: str, method: str) -> str:
+    """
+    Location of the query layout of one cleaned dataset.
+
+    Args:
+        version (str): Data version.
+        engine (str): 'pandas' or 'polars'.
+        method (str): Outlier method.
+    """
+    key = ex.artifact_key(version, engine, method, "query", ROW_GROUP_ROWS)
+    return ex.artifact_path(key, "parquet")
+
+
+def write_layout(df: pd.DataFrame | pl.DataFrame, path: str,
+                 row_group_rows: int = ROW_GROUP_ROWS):
+    """
+    Write the frame sorted by SORT_COLUMN, with row group statistics
+    and a page index, atomically.
+
+    Args:
+        df (Dataframe): Cleaned Pandas or Polars Dataframe.
+        path (str): Layout location.
+        row_group_rows (int, optional): Rows per row group.
+    """
+    if isinstance(df, pl.DataFrame):
+        df = df.sort(SORT_COLUMN, maintain_order=True)
+    else:
+        df = df.sort_values(SORT_COLUMN, kind="stable")
+    schema = ex.arrow_schema(df)
+
+    def write(tmp):
+        with pq.ParquetWriter(
+            tmp, schema, write_statistics=True, write_page_index=True,
+            sorting_columns=[pq.SortingColumn(schema.get_field_index(SORT_COLUMN))],
+        ) as writer:
+            for table in ex.iter_arrow_tables(df, row_group_rows, schema):
+                writer.write_table(table, row_group_size=row_group_rows)
+
+    cache._atomic_write(path, write)
+
+
+def ensure_layout(path: str, frame) -> str:
+    """
+    Build the layout at path unless it exists.
+
+    Args:
+        path (str): Layout location from layout_path.
+        frame (callable): Zero-argument function returning the
+        cleaned frame; only called when the layout is built.
+    """
+    with _BUILD_LOCK:
+        if not os.path.exists(path):
+            write_layout(frame(), path)
+    return path
+
+
+def parse_bound(value: str | None, end: bool = False) -> datetime | None:
+    """
+    Date range bound from an ISO date or datetime. A date-only end
+    includes the whole day. InvoiceDateTime has no time zone, so
+    bounds with a UTC offset are rejected.
+
+    Args:
+        value (str): ISO date or datetime.
+        end (bool, optional): Whether this is the upper bound.
+    """
+    if not value:
+        return None
+    try:
+        bound = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid date: {value}") from e
+    if bound.tzinfo is not None:
+        raise ValueError(f"Dates must not have a UTC offset: {value}")
+    if end and _is_date(value):
+        bound += timedelta(days=1)
+    return bound
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _stats(row_group, index: int):
+    stats = row_group.column(index).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    return stats.min, stats.max
+
+
+def _may_match(row_group, positions: dict, start, end, filters: dict) -> bool:
+    """
+    Whether the row group's statistics allow rows matching the query.
+    """
+    bounds = _stats(row_group, positions[SORT_COLUMN])
+    if bounds is not None:
+        low, high = bounds
+        if (start is not None and high < start) or (end is not None and low >= end):
+            return False
+    for col, values in filters.items():
+        bounds = _stats(row_group, positions[col])
+        if bounds is not None and not any(bounds[0] <= v <= bounds[1] for v in values):
+            return False
+    return True
+
+
+def _value_type(schema: pa.Schema, col: str) -> pa.DataType:
+    # Categorical columns are stored dictionary-encoded; filter values
+    # are matched against the dictionary's values.
+    dtype = schema.field(col).type
+    return dtype.value_type if pa.types.is_dictionary(dtype) else dtype
+
+
+def _filter_values(schema: pa.Schema, col: str, values: list) -> list:
+    dtype = _value_type(schema, col)
+    try:
+        return [pa.scalar(value).cast(dtype).as_py() for value in values]
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Invalid values for {col}: {values}") from e
+
+
+def _mask(table: pa.Table, start, end, filters: dict):
+    mask = None
+    conditions = []
+    stamp = table.schema.field(SORT_COLUMN).type
+    if start is not None:
+        conditions.append(pc.greater_equal(table[SORT_COLUMN], pa.scalar(start, stamp)))
+    if end is not None:
+        conditions.append(pc.less(table[SORT_COLUMN], pa.scalar(end, stamp)))
+    for col, values in filters.items():
+        value_set = pa.array(values, _value_type(table.schema, col))
+        conditions.append(pc.is_in(table[col], value_set=value_set))
+    for condition in conditions:
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return mask
+
+
+def run_query(path: str, start: str | None = None, end: str | None = None,
+              filters: dict | None = None, columns=None, limit: int = 100,
+              offset: int = 0) -> dict:
+    """
+    One page of the rows matching the filters, in InvoiceDateTime
+    order, with the number of row groups and rows it had to read.
+
+    Args:
+        path (str): Query layout.
+        start (str, optional): First InvoiceDate (ISO date or datetime).
+        end (str, optional): Last InvoiceDate; a datetime is exclusive.
+        filters (dict, optional): Column to allowed values.
+        columns (list, optional): Columns to return; all by default.
+        limit (int, optional): Rows per page, at most MAX_LIMIT.
+        offset (int, optional): Matching rows to skip.
+    """
+    if not 0 < limit <= MAX_LIMIT or offset < 0:
+        raise ValueError(f"limit must be 1-{MAX_LIMIT} and offset at least 0")
+    parquet = pq.ParquetFile(path)
+    schema = parquet.schema_arrow
+    filters = filters or {}
+    columns = list(columns or schema.names)
+    unknown = (set(columns) | set(filters)) - set(schema.names)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    filters = {col: _filter_values(schema, col, values)
+               for col, values in filters.items()}
+    start, end = parse_bound(start), parse_bound(end, end=True)
+    positions = {name: i for i, name in enumerate(schema.names)}
+    read_columns = list(dict.fromkeys(columns + [SORT_COLUMN] + list(filters)))
+
+    pages, matched, scanned, rows_read = [], 0, 0, 0
+    # One extra row tells whether there is a next page.
+    wanted = offset + limit + 1
+    metadata = parquet.metadata
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        bounds = _stats(row_group, positions[SORT_COLUMN])
+        if end is not None and bounds is not None and bounds[0] >= end:
+            # Sorted layout: no later row group can match either.
+            break
+        if not _may_match(row_group, positions, start, end, filters):
+            continue
+        table = parquet.read_row_group(i, columns=read_columns)
+        scanned += 1
+        rows_read += table.num_rows
+        mask = _mask(table, start, end, filters)
+        if mask is not None:
+            table = table.filter(mask)
+        pages.append(table.select(columns))
+        matched += table.num_rows
+        if matched >= wanted:
+            break
+    result = pa.concat_tables(pages) if pages else schema.empty_table().select(columns)
+    page = result.slice(offset, limit)
+    return {
+        "rows": page.num_rows,
+        "next_offset": offset + limit if result.num_rows > offset + limit else None,
+        "row_groups_total": metadata.num_row_groups,
+        "row_groups_scanned": scanned,
+        "rows_scanned": rows_read,
+        "data": page.to_pylist(),
+    }
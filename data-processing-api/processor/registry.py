@@ -0,0 +1,195 @@
+"""
+Registry of the raw datasets served by the API.
+
+The first caller starts the load and every concurrent caller waits
+on the same future, so a cold start parses the workbook once. When
+the source file changes, the new version is loaded in the
+background while requests keep using the current one, and is then
+swapped in as a whole: a request always sees frames, load reports
+and data version of the same load.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    One load of the source: a frame and a load report per engine,
+    the data version and the source file's (size, mtime_ns).
+    derived holds data built from the frames, such as the revenue
+    cube, so it is swapped in with them. appended_rows counts rows
+    added since the load, which the source file does not have.
+    """
+
+    frames: dict
+    version: str
+    reports: dict = field(default_factory=dict)
+    stat: tuple | None = None
+    loaded_at: float = 0.0
+    appended_rows: int = 0
+    derived: dict = field(default_factory=dict)
+
+
+class DatasetRegistry:
+    """
+    Single-flight loading and hot-swapping of the dataset.
+
+    Args:
+        path (str): Source file; its size and mtime are watched.
+        loader (callable): loader(path) returns (frames, reports,
+        version), optionally followed by a dict of derived data.
+    """
+
+    def __init__(self, path: str, loader: Callable):
+        self.path = path
+        self.loader = loader
+        self._current = None
+        self._loading = None
+        self._error = None
+        self._failed_stat = None
+        self._on_reload = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="dataset")
+
+    def _stat(self) -> tuple | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _changed(self, dataset: Dataset) -> bool:
+        stat = self._stat()
+        # A file that is being replaced may be missing for a moment.
+        return stat is not None and stat != dataset.stat and stat != self._failed_stat
+
+    def _start(self) -> Future:
+        """
+        The running load, or a new one. Call with the lock held.
+        """
+        if self._loading is None:
+            self._loading = self._executor.submit(self._load)
+        return self._loading
+
+    def _load(self) -> Dataset:
+        stat = self._stat()
+        try:
+            start = time.perf_counter()
+            frames, reports, version, *derived = self.loader(self.path)
+            dataset = Dataset(frames=frames, version=version, reports=reports,
+                              stat=stat, loaded_at=time.time(),
+                              derived=derived[0] if derived else {})
+            logging.info("Loaded %s in %.2f s", self.path, time.perf_counter() - start)
+        except Exception as e:
+            with self._lock:
+                self._error = f"{type(e).__name__}: {e}"
+                self._failed_stat = stat
+                self._loading = None
+            raise
+        with self._lock:
+            old, self._current = self._current, dataset
+            self._error = self._failed_stat = None
+            self._loading = None
+            callbacks = list(self._on_reload) if old is not None else []
+        for callback in callbacks:
+            callback(old, dataset)
+        return dataset
+
+    def get(self) -> Dataset:
+        """
+        The current dataset, loading it on first use.
+
+        If the source changed, a reload is started and the current
+        dataset is returned until the new one replaces it.
+        """
+        with self._lock:
+            current = self._current
+            if current is not None and not self._changed(current):
+                return current
+            future = self._start()
+        if current is not None:
+            return current
+        return future.result()
+
+    def preload(self) -> Future:
+        """
+        Start loading in the background without waiting, unless the
+        current dataset is up to date. Returns the load's future.
+        """
+        with self._lock:
+            current = self._current
+            if self._loading is None and current is not None and not self._changed(current):
+                future = Future()
+                future.set_result(current)
+                return future
+            return self._start()
+
+    def reload(self) -> Future:
+        """
+        Load the source again, e.g. after a change the file's size
+        and mtime do not show. The result replaces the current one.
+        """
+        with self._lock:
+            return self._start()
+
+    def swap(self, old: Dataset, new: Dataset, publish: Callable | None = None) -> bool:
+        """
+        Replace old with new, unless another load replaced old first.
+
+        Args:
+            old (Dataset): Dataset new was derived from.
+            new (Dataset): Replacement, e.g. with appended rows.
+            publish (callable, optional): Called after the swap and
+            before any load can replace new, e.g. to store state
+            derived from new.
+        """
+        with self._lock:
+            if self._current is not old:
+                return False
+            self._current = new
+            if publish is not None:
+                publish()
+            return True
+
+    def on_reload(self, callback: Callable):
+        """
+        Call callback(old, new) whenever a load replaces a dataset.
+
+        Args:
+            callback (callable): Function of the old and new Dataset.
+        """
+        self._on_reload.append(callback)
+
+    def status(self) -> dict:
+        """
+        Whether a dataset is loaded, whether a load is running and
+        the last load error.
+        """
+        with self._lock:
+            current = self._current
+            return {
+                "ready": current is not None,
+                "loading": self._loading is not None,
+                "version": current.version if current else None,
+                "loaded_at": current.loaded_at if current else None,
+                "appended_rows": current.appended_rows if current else 0,
+                "error": self._error,
+            }
+
+    def shutdown(self):
+        """
+        Stop the loader thread once a running load finishes.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
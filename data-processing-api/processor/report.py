@@ -0,0 +1,180 @@
+"""
+Background rendering of the outlier box plots.
+
+Plots are written as static HTML (or PNG when kaleido is
+installed) by a small pool of worker processes, so rendering never
+holds the server's GIL, cached per dataset version and served by
+the API instead of being shown during requests.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import polars as pl
+from processor.clean import COLS
+
+REPORT_DIR = os.environ.get("PROCESSOR_REPORT_DIR", "reports")
+FORMATS = ("html", "png")
+
+MAX_WORKERS = int(os.environ.get("REPORT_WORKERS", 2))
+
+_EXECUTOR = None
+_PENDING = {}
+_LOCK = threading.Lock()
+
+
+def report_path(version: str, name: str, col: str, fmt: str = "html",
+                root: str | None = None) -> str:
+    """
+    Location of one rendered box plot.
+
+    Args:
+        version (str): Dataset version.
+        name (str): Report name, e.g. 'pandas-cap'.
+        col (str): Plotted column.
+        fmt (str, optional): 'html' or 'png'.
+        root (str, optional): Report folder; REPORT_DIR by default.
+    """
+    return os.path.join(root or REPORT_DIR, version[:16], f"{name}-{col}.{fmt}")
+
+
+def render_box_plots(
+    df: pd.DataFrame | pl.DataFrame, version: str, name: str, columns=None, fmt="html",
+    root: str | None = None,
+) -> list:
+    """
+    Render one box plot per column to files, skipping plots
+    already rendered for this version.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        version (str): Dataset version.
+        name (str): Report name.
+        columns (list, optional): Columns to plot. Defaults to COLS.
+        fmt (str, optional): 'html' or 'png'.
+        root (str, optional): Report folder; REPORT_DIR by default.
+    """
+    import plotly.express as px
+
+    paths = []
+    for col in columns or COLS:
+        path = report_path(version, name, col, fmt, root)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fig = px.box(df, col)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            if fmt == "png":
+                fig.write_image(tmp, format="png")
+            else:
+                fig.write_html(tmp, include_plotlyjs="cdn")
+            os.replace(tmp, path)
+        paths.append(path)
+    return paths
+
+
+def _pool() -> ProcessPoolExecutor:
+    """
+    The report worker pool, started on first use. Call with _LOCK held.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        # polars is not fork-safe, so workers are spawned.
+        _EXECUTOR = ProcessPoolExecutor(
+            MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _EXECUTOR
+
+
+def _done(key, future):
+    with _LOCK:
+        _PENDING.pop(key, None)
+    if future.exception() is not None:
+        logging.error("Report %s failed: %s", key, future.exception())
+
+
+def submit_report(
+    df: pd.DataFrame | pl.DataFrame, version: str, name: str, columns=None, fmt="html"
+):
+    """
+    Queue rendering in the worker processes. Only the plotted
+    columns are sent to them. A report that is already being
+    rendered is not queued twice.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        version (str): Dataset version.
+        name (str): Report name.
+        columns (list, optional): Columns to plot. Defaults to COLS.
+        fmt (str, optional): 'html' or 'png'.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    columns = list(columns or COLS)
+    key = (version, name, fmt)
+    with _LOCK:
+        future = _PENDING.get(key)
+        if future is None:
+            data = df.select(columns) if isinstance(df, pl.DataFrame) else df[columns]
+            future = _pool().submit(render_box_plots, data, version, name, columns,
+                                    fmt, REPORT_DIR)
+            _PENDING[key] = future
+            future.add_done_callback(lambda f: _done(key, f))
+    return future
+
+
+def list_reports(version: str | None = None) -> dict:
+    """
+    Rendered report files per dataset version and the reports
+    still being rendered.
+
+    Args:
+        version (str, optional): Only list this version.
+    """
+    reports = {}
+    if os.path.isdir(REPORT_DIR):
+        for folder in sorted(os.listdir(REPORT_DIR)):
+            if version is None or folder == version[:16]:
+                files = os.listdir(os.path.join(REPORT_DIR, folder))
+                reports[folder] = sorted(f for f in files if not f.endswith(".tmp"))
+    with _LOCK:
+        pending = [f"{v[:16]}/{name}.{fmt}" for v, name, fmt in _PENDING]
+    return {"reports": reports, "pending": pending}
+
+
+def find_report(folder: str, filename: str) -> str | None:
+    """
+    Path of a rendered report file, or None if it does not exist.
+
+    Args:
+        folder (str): Version folder as listed by list_reports.
+        filename (str): Report file name.
+    """
+    if folder in ("", ".", "..") or filename in ("", ".", ".."):
+        return None
+    if folder != os.path.basename(folder) or filename != os.path.basename(filename):
+        return None
+    path = os.path.join(REPORT_DIR, folder, filename)
+    root = os.path.realpath(REPORT_DIR)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        return None
+    if filename.endswith(".tmp") or not os.path.isfile(path):
+        return None
+    return path
+
+
+def shutdown():
+    """
+    Stop the worker processes.
+    """
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
@@ -0,0 +1,166 @@
+"""
+Response bodies of the processing endpoint.
+
+Aggregates are written to JSON bytes once, by the engine's own
+writer, and spliced into the response envelope as they are; they
+are never parsed back into Python objects and encoded a second
+time. Bodies are compressed with the best encoding the client
+accepts, and the aggregates can also be sent as one Arrow IPC
+table instead of JSON.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import gzip
+import json
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+from processor import metrics as mt
+from processor import interchange as ic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FORMATS = ("json", "arrow")
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+# Smaller bodies are sent as they are; compressing them saves less
+# than the headers it adds.
+MIN_COMPRESS_BYTES = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Columns of every engine's aggregate in the Arrow response.
+AGGREGATE_SCHEMA = pa.schema([
+    ("engine", pa.string()),
+    ("NameOfDay", pa.string()),
+    ("sum", pa.float64()),
+    ("mean", pa.float64()),
+    ("count", pa.int64()),
+])
+
+
+@mt.instrument("serialize")
+def frame_json(df) -> bytes:
+    """
+    JSON bytes of an aggregate from the engine's own writer.
+
+    pandas frames are written column by column with the day names
+    as keys, polars frames and Arrow tables as a list of rows.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe, or Arrow table.
+    """
+    if isinstance(df, pd.DataFrame):
+        return df.to_json().encode()
+    if isinstance(df, pa.Table):
+        df = pl.from_arrow(df)
+    return df.write_json().encode()
+
+
+def envelope(message: str, data: dict, success: bool = True) -> bytes:
+    """
+    Response body with already serialized JSON fragments as data.
+
+    Args:
+        message (str): Response message.
+        data (dict): Key to JSON bytes.
+        success (bool, optional): Value of the success field.
+    """
+    fields = b",".join(json.dumps(key).encode() + b":" + value
+                       for key, value in data.items())
+    return b"".join([
+        b'{"message":', json.dumps(message).encode(),
+        b',"success":', json.dumps(success).encode(),
+        b',"data":{', fields, b"}}",
+    ])
+
+
+def encodings() -> tuple:
+    """
+    Content encodings this server can produce, best first.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str | None, size: int) -> str | None:
+    """
+    Encoding for a body of the given size, or None to send it
+    uncompressed.
+
+    Args:
+        accept_encoding (str): Accept-Encoding request header.
+        size (int): Body size in bytes.
+    """
+    if not accept_encoding or size < MIN_COMPRESS_BYTES:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best = None
+    for encoding in encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+def compress(body: bytes, encoding: str | None) -> bytes:
+    """
+    Body compressed with a negotiated encoding.
+
+    Args:
+        body (bytes): Response body.
+        encoding (str): 'br', 'gzip' or None.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def _aggregate_table(df) -> pa.Table:
+    if isinstance(df, pd.DataFrame):
+        # aggregate_pandas keeps the day names in the index.
+        df = df.reset_index() if df.index.name == "NameOfDay" else df
+    if isinstance(df, (pd.DataFrame, pl.DataFrame)):
+        return ic.to_arrow(df)
+    return df
+
+
+@mt.instrument("serialize", engine="all")
+def arrow_aggregates(frames: dict) -> bytes:
+    """
+    Arrow IPC file with the aggregates of all engines, told apart
+    by an engine column.
+
+    Args:
+        frames (dict): Engine name to aggregate (Pandas or Polars
+        Dataframe, or Arrow table).
+    """
+    tables = []
+    for engine, df in frames.items():
+        table = _aggregate_table(df)
+        table = table.select(AGGREGATE_SCHEMA.names[1:])
+        table = table.add_column(0, "engine", pa.array([engine] * table.num_rows))
+        tables.append(table.cast(AGGREGATE_SCHEMA))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, AGGREGATE_SCHEMA) as writer:
+        writer.write_table(pa.concat_tables(tables))
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,267 @@
+"""
+Multi-core execution of the pandas pipeline.
+
+The raw frame is split into contiguous row shards, and the row-local
+stages (NA handling, outlier handling, transform and a partial
+aggregate) run in a pool of worker processes. The columns those
+stages need are written once as an Arrow IPC file in shared memory,
+one record batch per shard, and each worker reads its shard from
+there instead of receiving a pickled copy.
+
+Outlier limits stay global: a first round returns mergeable column
+summaries of every shard, which the parent merges into the same
+statistics the eager pipeline uses. The forward fill of Customer ID
+continues across shard boundaries from the last value of the shards
+before it, and the partial aggregates are merged as in chunked mode,
+so the result equals aggregate_pandas on the eagerly cleaned frame.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from processor import clean as cl
+from processor import aggregate as ag
+from processor import stats as st
+from processor.chunked import NaCarry, clean_batch
+
+WORKERS = int(os.environ.get("SHARD_WORKERS", os.cpu_count() or 1))
+# Largest pool a caller may ask for.
+MAX_WORKERS = int(os.environ.get("SHARD_MAX_WORKERS", max(os.cpu_count() or 1, 4)))
+# Columns the workers read. Of Description only its missing values
+# matter to the aggregate, so its text is not shipped.
+COLUMNS = ("Quantity", "InvoiceDate", "Price", "Customer ID")
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def new_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Worker pool of the given size, owned by the caller.
+
+    Workers are spawned rather than forked, so they never inherit
+    locks held by the server's threads.
+
+    Args:
+        workers (int): Number of processes, at most MAX_WORKERS.
+    """
+    if not 1 <= workers <= MAX_WORKERS:
+        raise ValueError(f"Workers must be between 1 and {MAX_WORKERS}: {workers}")
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Shared worker pool of the given size, started on first use and
+    kept until shutdown().
+
+    Args:
+        workers (int): Number of processes, at most MAX_WORKERS.
+    """
+    with _POOLS_LOCK:
+        if workers not in _POOLS:
+            _POOLS[workers] = new_pool(workers)
+        return _POOLS[workers]
+
+
+def shutdown():
+    """
+    Stop every worker pool.
+    """
+    with _POOLS_LOCK:
+        for executor in _POOLS.values():
+            executor.shutdown(cancel_futures=True)
+        _POOLS.clear()
+
+
+def shard_bounds(rows: int, shards: int) -> list:
+    """
+    (start, stop) of contiguous shards of nearly equal size.
+
+    Args:
+        rows (int): Rows of the frame.
+        shards (int): Number of shards.
+    """
+    edges = [rows * i // shards for i in range(shards + 1)]
+    return [(start, stop) for start, stop in zip(edges, edges[1:]) if stop > start]
+
+
+def _write_ipc(sink, schema: pa.Schema, batches: list):
+    with pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+class SharedFrame:
+    """
+    The worker columns of a frame as an Arrow IPC file in shared
+    memory, one record batch per shard. Use as a context manager;
+    the memory is released on exit.
+
+    Args:
+        raw (pd.DataFrame): Raw pandas Dataframe.
+        shards (int): Number of shards.
+    """
+
+    def __init__(self, raw: pd.DataFrame, shards: int):
+        table = pa.Table.from_pandas(raw[list(COLUMNS)], preserve_index=False)
+        missing = raw["Description"].isna().to_numpy()
+        table = table.append_column(
+            "Description", pa.array(np.zeros(len(raw), np.uint8), mask=missing)
+        ).combine_chunks()
+        batches = [table.slice(start, stop - start).to_batches()[0]
+                   for start, stop in shard_bounds(len(raw), shards)]
+        mock = pa.MockOutputStream()
+        _write_ipc(mock, table.schema, batches)
+        self.shards = len(batches)
+        self.memory = shared_memory.SharedMemory(create=True, size=mock.size())
+        _write_ipc(pa.FixedSizeBufferWriter(pa.py_buffer(self.memory.buf)),
+                   table.schema, batches)
+
+    @property
+    def name(self) -> str:
+        """
+        Name workers attach the shared memory by.
+        """
+        return self.memory.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def read_shard(name: str, index: int) -> pd.DataFrame:
+    """
+    One shard of a SharedFrame as a pandas frame of its own.
+
+    Args:
+        name (str): Shared memory name.
+        index (int): Shard number.
+    """
+    memory = shared_memory.SharedMemory(name)
+    try:
+        reader = pa.ipc.open_file(pa.py_buffer(memory.buf))
+        # Copied out, so nothing refers to the shared memory once
+        # it is closed.
+        df = reader.get_batch(index).to_pandas().copy()
+        del reader
+    finally:
+        memory.close()
+    return df
+
+
+def _summarize_shard(name: str, index: int, method: str, done: dict,
+                     columns: list, epsilon):
+    """
+    Summaries of the columns of one NA-handled shard after handling
+    the outliers of the done columns, and its last Customer ID.
+    """
+    na = NaCarry("pandas")
+    df = na(read_shard(name, index))
+    for col, stats in done.items():
+        df = cl.handle_outlier_pandas(df, col, method, stats=stats)
+    summaries = {col: st.summarize(df[col], epsilon) for col in columns}
+    return summaries, na.last.get("Customer ID")
+
+
+def _clean_shard(name: str, index: int, stats: dict, method: str, carry: dict,
+                 typed: bool) -> pd.DataFrame:
+    """
+    Partial aggregate of one cleaned shard, with the forward fill
+    continued from the shards before it.
+    """
+    df = NaCarry("pandas", carry)(read_shard(name, index))
+    return ag.partial_aggregate_pandas(clean_batch(df, stats, method, typed))
+
+
+def global_stats(frame: SharedFrame, executor, method: str = "cap", epsilon=None,
+                 stats: dict | None = None):
+    """
+    Statistics of the outlier columns over all shards, as the eager
+    pipeline sees them, and the forward-fill carry of every shard.
+
+    'cap' and 'mean' keep every row, so one round summarizes all
+    columns; 'drop' takes one round per column, each dropping the
+    earlier columns' outliers.
+
+    Args:
+        frame (SharedFrame): Sharded frame.
+        executor (Executor): Worker pool.
+        method (str, optional): Outlier method.
+        epsilon (float, optional): Rank error of approximate quartiles
+        from a QuantileSketch; exact when None or 0.
+        stats (dict, optional): Frozen statistics to use instead;
+        only the carries are collected.
+    """
+    if stats is not None:
+        rounds, stats = [[]], dict(stats)
+    else:
+        rounds = [[col] for col in cl.COLS] if method == "drop" else [list(cl.COLS)]
+        stats = {}
+    lasts = None
+    for columns in rounds:
+        results = list(executor.map(
+            _summarize_shard, repeat(frame.name), range(frame.shards), repeat(method),
+            repeat({} if not columns else dict(stats)), repeat(columns),
+            repeat(epsilon),
+        ))
+        for col in columns:
+            merged = functools.reduce(lambda a, b: a.merge(b),
+                                      (summaries[col] for summaries, _ in results))
+            stats[col] = merged.to_stats()
+        lasts = lasts or [last for _, last in results]
+    carries, previous = [], None
+    for last in lasts:
+        carries.append({} if previous is None else {"Customer ID": previous})
+        previous = previous if last is None else last
+    return stats, carries
+
+
+def run_sharded(raw: pd.DataFrame, method: str = "cap", workers: int | None = None,
+                shards: int | None = None, typed: bool = False,
+                epsilon: float | None = None, stats: dict | None = None,
+                executor: ProcessPoolExecutor | None = None) -> pd.DataFrame:
+    """
+    Clean, transform and aggregate a raw pandas frame across worker
+    processes.
+
+    Returns the same frame as aggregate_pandas on the eagerly
+    cleaned dataset, or on the dataset cleaned with stats when given.
+
+    Args:
+        raw (pd.DataFrame): Raw pandas Dataframe.
+        method (str, optional): Outlier method.
+        workers (int, optional): Processes; SHARD_WORKERS by default.
+        shards (int, optional): Row shards; one per worker by default.
+        typed (bool, optional): Typed datetime derivation.
+        epsilon (float, optional): Rank error of approximate outlier
+        limits; QUANTILE_EPSILON by default.
+        stats (dict, optional): Frozen statistics per outlier column,
+        e.g. of Appender, instead of limits over all rows.
+        executor (ProcessPoolExecutor, optional): Pool to run in; the
+        shared pool of workers processes by default.
+    """
+    workers = workers or WORKERS
+    epsilon = st.QUANTILE_EPSILON if epsilon is None else epsilon
+    executor = executor or pool(workers)
+    with SharedFrame(raw, shards or workers) as frame:
+        stats, carries = global_stats(frame, executor, method, epsilon, stats)
+        partials = list(executor.map(
+            _clean_shard, repeat(frame.name), range(frame.shards), repeat(stats),
+            repeat(method), carries, repeat(typed),
+        ))
+    return ag.merge_partials_pandas(partials)
@@ -0,0 +1,468 @@
+"""
+Column statistics shared by outlier detection and handling.
+
+All numeric columns of a frame are summarized in one vectorized
+call per engine and the result is cached against the frame, so
+repeated calls for Quantity and Price reuse the same numbers.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import math
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import polars as pl
+
+_CACHE = {}
+_LOCK = threading.Lock()
+# Rank error of the sketches that are merged (chunked and sharded
+# summaries) or kept with the loaded data; unset means exact.
+QUANTILE_EPSILON = float(os.environ.get("QUANTILE_EPSILON", "0")) or None
+
+
+@dataclass(frozen=True)
+class ColumnStats:
+    """
+    Summary of one numeric column.
+    """
+
+    count: int
+    mean: float
+    std: float
+    min: float
+    q1: float
+    q3: float
+    max: float
+
+    @property
+    def iqr(self) -> float:
+        """
+        Inter-quartile range.
+        """
+        return self.q3 - self.q1
+
+    def iqr_limits(self, k: float = 1.5) -> tuple[float, float]:
+        """
+        Lower and upper fences at k times the IQR.
+        """
+        return self.q1 - k * self.iqr, self.q3 + k * self.iqr
+
+    def std_limits(self, k: float = 3) -> tuple[float, float]:
+        """
+        Mean plus/minus k standard deviations.
+        """
+        return self.mean - k * self.std, self.mean + k * self.std
+
+
+def _numeric_columns(df: pd.DataFrame | pl.DataFrame) -> list:
+    if isinstance(df, pl.DataFrame):
+        return [col for col, dtype in df.schema.items() if dtype.is_numeric()]
+    return df.select_dtypes("number").columns.tolist()
+
+
+def compute_stats(df: pd.DataFrame | pl.DataFrame, columns=None,
+                  epsilon: float | None = None) -> dict:
+    """
+    Statistics for the given (default: all numeric) columns
+    in one vectorized pass.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        columns (list, optional): Columns to summarize.
+        epsilon (float, optional): Take the quartiles from a
+        QuantileSketch with this rank error instead of exact ones.
+        Building a sketch sorts the column, so this is not faster
+        than exact selection; sketches pay off when they are kept
+        and updated, see sketch_columns.
+    """
+    columns = _numeric_columns(df) if columns is None else list(columns)
+    if not columns:
+        return {}
+    if epsilon:
+        return {col: QuantileSketch.from_values(df[col], epsilon).to_stats()
+                for col in columns}
+    if isinstance(df, pl.DataFrame):
+        exprs = []
+        for i, col in enumerate(columns):
+            values = pl.col(col)
+            exprs += [
+                values.count().alias(f"{i}_count"),
+                values.mean().alias(f"{i}_mean"),
+                values.std().alias(f"{i}_std"),
+                values.min().cast(pl.Float64).alias(f"{i}_min"),
+                values.quantile(0.25, interpolation="linear").alias(f"{i}_q1"),
+                values.quantile(0.75, interpolation="linear").alias(f"{i}_q3"),
+                values.max().cast(pl.Float64).alias(f"{i}_max"),
+            ]
+        row = df.select(exprs).row(0)
+        return {
+            col: ColumnStats(*row[i * 7:(i + 1) * 7])
+            for i, col in enumerate(columns)
+        }
+    summary = df[columns].describe(percentiles=[0.25, 0.75])
+    return {
+        col: ColumnStats(
+            count=int(summary.at["count", col]),
+            mean=summary.at["mean", col],
+            std=summary.at["std", col],
+            min=summary.at["min", col],
+            q1=summary.at["25%", col],
+            q3=summary.at["75%", col],
+            max=summary.at["max", col],
+        )
+        for col in columns
+    }
+
+
+def _entry(df) -> dict:
+    key = id(df)
+    entry = _CACHE.get(key)
+    if entry is None:
+        entry = _CACHE[key] = {}
+        weakref.finalize(df, _CACHE.pop, key, None)
+    return entry
+
+
+def column_stats(df: pd.DataFrame | pl.DataFrame, col: str) -> ColumnStats:
+    """
+    Cached statistics of one column.
+
+    The first call on a frame summarizes all its numeric
+    columns at once; later calls are dictionary lookups.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        col (str): Column name.
+    """
+    with _LOCK:
+        entry = _entry(df)
+        if col in entry:
+            return entry[col]
+        first = not entry
+    columns = _numeric_columns(df) if first else [col]
+    if col not in columns:
+        columns.append(col)
+    stats = compute_stats(df, columns)
+    with _LOCK:
+        _entry(df).update(stats)
+    return stats[col]
+
+
+def invalidate(df: pd.DataFrame | pl.DataFrame, col: str | None = None):
+    """
+    Forget cached statistics after a pandas frame was changed in place.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        col (str, optional): Changed column; all columns if omitted.
+    """
+    with _LOCK:
+        entry = _CACHE.get(id(df))
+        if entry is None:
+            return
+        if col is None:
+            entry.clear()
+        else:
+            entry.pop(col, None)
+
+
+def carry(src, dst, exclude: str):
+    """
+    Reuse cached statistics on a derived frame that has the same
+    rows and unchanged values except in one column.
+
+    Args:
+        src (Dataframe): Frame the statistics were computed on.
+        dst (Dataframe): Derived frame.
+        exclude (str): Column whose values changed.
+    """
+    with _LOCK:
+        entry = _CACHE.get(id(src))
+        if not entry or src is dst:
+            return
+        _entry(dst).update({c: s for c, s in entry.items() if c != exclude})
+
+
+def clear():
+    """
+    Drop every cached statistic.
+    """
+    with _LOCK:
+        for entry in _CACHE.values():
+            entry.clear()
+
+
+def _present(values) -> np.ndarray:
+    if isinstance(values, pl.Series):
+        values = values.drop_nulls().to_numpy()
+    elif isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    return values[~missing] if missing.any() else values
+
+
+def summarize(values, epsilon: float | None = None):
+    """
+    Mergeable summary of a batch of values: an exact ColumnSummary,
+    or a QuantileSketch when an error bound is given.
+
+    Args:
+        values: pandas or polars Series, or a numpy array.
+        epsilon (float, optional): Rank error bound of the sketch.
+    """
+    if epsilon:
+        return QuantileSketch.from_values(values, epsilon)
+    return ColumnSummary.from_values(values)
+
+
+def sketch_columns(df: pd.DataFrame | pl.DataFrame, epsilon: float,
+                   columns=None) -> dict:
+    """
+    QuantileSketch of each given (default: all numeric) column, to
+    be kept with the frame and extended as rows arrive.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+        epsilon (float): Rank error bound of the sketches.
+        columns (list, optional): Columns to sketch.
+    """
+    columns = _numeric_columns(df) if columns is None else list(columns)
+    return {col: QuantileSketch.from_values(df[col], epsilon) for col in columns}
+
+
+def extend_sketches(sketches: dict, df: pd.DataFrame | pl.DataFrame) -> dict:
+    """
+    New sketches with the rows of df added, in time proportional to
+    the new rows; the given sketches are left unchanged.
+
+    Args:
+        sketches (dict): QuantileSketch per column.
+        df (Dataframe): New rows with those columns.
+    """
+    return {
+        col: sketch.merge(QuantileSketch.from_values(df[col], sketch.epsilon))
+        for col, sketch in sketches.items()
+    }
+
+
+@dataclass(frozen=True)
+class ColumnSummary:
+    """
+    Mergeable summary of one numeric column: its distinct values
+    and how often each occurs.
+
+    Summaries of row batches merge into the summary of all rows,
+    and the exact ColumnStats follow from it. Memory grows with the
+    number of distinct values, not with the number of rows.
+    """
+
+    values: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_values(cls, values) -> "ColumnSummary":
+        """
+        Summary of a batch of values; missing values are ignored.
+
+        Args:
+            values: pandas or polars Series, or a numpy array.
+        """
+        values, counts = np.unique(_present(values), return_counts=True)
+        return cls(values, counts)
+
+    def merge(self, other: "ColumnSummary") -> "ColumnSummary":
+        """
+        Summary of the rows of both summaries.
+        """
+        values, inverse = np.unique(
+            np.concatenate([self.values, other.values]), return_inverse=True
+        )
+        counts = np.bincount(
+            inverse, weights=np.concatenate([self.counts, other.counts])
+        )
+        return ColumnSummary(values, counts.astype(np.int64))
+
+    def quantile(self, q: float) -> float:
+        """
+        Exact quantile with linear interpolation, as pandas and polars
+        compute it.
+        """
+        cumulative = np.cumsum(self.counts)
+        position = (cumulative[-1] - 1) * q
+        low, high = np.searchsorted(
+            cumulative, [np.floor(position), np.ceil(position)], side="right"
+        )
+        low_value, high_value = self.values[low], self.values[high]
+        return low_value + (position - np.floor(position)) * (high_value - low_value)
+
+    def to_stats(self) -> ColumnStats:
+        """
+        ColumnStats of the summarized rows.
+        """
+        count = int(self.counts.sum())
+        mean = float(np.dot(self.values, self.counts) / count)
+        variance = np.dot(self.counts, (self.values - mean) ** 2) / (count - 1)
+        return ColumnStats(
+            count=count,
+            mean=mean,
+            std=float(np.sqrt(variance)),
+            min=float(self.values[0]),
+            q1=float(self.quantile(0.25)),
+            q3=float(self.quantile(0.75)),
+            max=float(self.values[-1]),
+        )
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate summary of one numeric column (KLL-style).
+
+    Values are kept in levels of at most k items; an item on level h
+    stands for 2**h rows. A full level is sorted and every other item,
+    starting at a random offset, moves up one level, so memory stays
+    O(k log(n / k)) however many rows are added. Quantiles are within
+    epsilon of the requested rank with high probability; count, mean,
+    std, min and max are exact. Until the first compaction the sketch
+    holds every value and its quantiles are exact.
+
+    Args:
+        epsilon (float, optional): Rank error bound, e.g. 0.005 for
+        half a percent of the rows.
+        seed (int, optional): Seed of the compaction offsets.
+    """
+
+    def __init__(self, epsilon: float = 0.005, seed: int = 0):
+        if not 0 < epsilon < 1:
+            raise ValueError(f"epsilon must be between 0 and 1, got {epsilon}")
+        self.epsilon = epsilon
+        self.k = max(8, math.ceil(2 / epsilon))
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, epsilon: float = 0.005) -> "QuantileSketch":
+        """
+        Sketch of a batch of values; missing values are ignored.
+
+        Args:
+            values: pandas or polars Series, or a numpy array.
+            epsilon (float, optional): Rank error bound.
+        """
+        return cls(epsilon).update(values)
+
+    def _moments(self, count: int, mean: float, m2: float, low: float, high: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def _add(self, level: int, items: np.ndarray):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind so weights add up.
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                offset = self._rng.integers(2)
+                self.levels[level] = keep
+                self._add(level + 1, items[offset:len(items) - len(keep):2])
+            level += 1
+
+    def update(self, values) -> "QuantileSketch":
+        """
+        Add a batch of values in place; missing values are ignored.
+
+        A batch much larger than k is sorted once and sampled at the
+        level it would reach by repeated compaction.
+
+        Args:
+            values: pandas or polars Series, or a numpy array.
+        """
+        values = _present(values)
+        if not len(values):
+            return self
+        mean = float(values.mean())
+        self._moments(len(values), mean, float(np.square(values - mean).sum()),
+                      float(values.min()), float(values.max()))
+        level = max(0, int(math.log2(len(values) / self.k)))
+        if level:
+            offset = self._rng.integers(2 ** level)
+            values = np.sort(values)[offset::2 ** level]
+        self._add(level, values)
+        self._compact()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Sketch of the rows of both sketches.
+        """
+        merged = QuantileSketch(min(self.epsilon, other.epsilon), self._seed)
+        merged.levels = list(self.levels)
+        merged.count, merged.mean, merged.m2 = self.count, self.mean, self.m2
+        merged.min, merged.max = self.min, self.max
+        if other.count:
+            merged._moments(other.count, other.mean, other.m2, other.min, other.max)
+        for level, items in enumerate(other.levels):
+            merged._add(level, items)
+        merged._compact()
+        return merged
+
+    @property
+    def size(self) -> int:
+        """
+        Number of values held.
+        """
+        return sum(len(items) for items in self.levels)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile; exact, with linear interpolation, while
+        no compaction has happened.
+        """
+        if self.count == 0:
+            return math.nan
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(values[order[min(index, len(order) - 1)]])
+
+    def to_stats(self) -> ColumnStats:
+        """
+        ColumnStats with exact moments and approximate quartiles.
+        """
+        return ColumnStats(
+            count=self.count,
+            mean=self.mean,
+            std=math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan,
+            min=self.min,
+            q1=self.quantile(0.25),
+            q3=self.quantile(0.75),
+            max=self.max,
+        )
@@ -0,0 +1,205 @@
+"""
+In-memory store of cleaned datasets shared by the API endpoints.
+
+Each cleaned frame is keyed by engine, outlier method and the raw
+data version, computed once, and kept in memory until the store
+grows past its size budget. Evicted frames are spilled to Parquet
+and read back on the next request instead of being recomputed;
+the files of a superseded data version are removed with it.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import glob
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import pandas as pd
+import polars as pl
+from processor import cache
+
+MAX_BYTES = int(os.environ.get("CLEANED_STORE_MAX_BYTES", 1 << 30))
+
+
+def frame_size(df: pd.DataFrame | pl.DataFrame) -> int:
+    """
+    Approximate in-memory size of a dataframe in bytes.
+
+    Args:
+        df (Dataframe): Pandas or Polars Dataframe.
+    """
+    if isinstance(df, pl.DataFrame):
+        return df.estimated_size()
+    return int(df.memory_usage(deep=True).sum())
+
+
+class CleanedStore:
+    """
+    Size-bounded LRU of cleaned frames with spill-to-disk.
+
+    Keys are (engine, method, version) tuples. Concurrent requests
+    for a key that is not ready yet wait for the single build
+    instead of running the pipeline themselves. Evicted frames are
+    written outside the lock and served from memory until then.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, spill_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._pending = {}
+        self._spilling = {}
+        self._lock = threading.Lock()
+
+    def _spill_dir(self) -> str:
+        return self.spill_dir or os.path.join(cache.CACHE_DIR, "cleaned")
+
+    def _spill_path(self, key: tuple) -> str:
+        engine, method, version = key
+        return os.path.join(self._spill_dir(), f"{version[:16]}-{engine}-{method}.parquet")
+
+    def _spill(self, key: tuple, df: pd.DataFrame | pl.DataFrame):
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        if isinstance(df, pl.DataFrame):
+            cache.write_polars(df, path)
+        else:
+            cache.write_pandas(cache.arrow_safe(df), path)
+
+    def _load_spilled(self, key: tuple):
+        path = self._spill_path(key)
+        if not os.path.exists(path):
+            return None
+        if key[0] == "polars":
+            return pl.read_parquet(path)
+        return pd.read_parquet(path, engine="pyarrow")
+
+    def _insert(self, key: tuple, df: pd.DataFrame | pl.DataFrame):
+        size = frame_size(df)
+        evicted = []
+        with self._lock:
+            self._frames[key] = df
+            self._sizes[key] = size
+            while sum(self._sizes.values()) > self.max_bytes and len(self._frames) > 1:
+                old_key, old_df = self._frames.popitem(last=False)
+                del self._sizes[old_key]
+                self._spilling[old_key] = old_df
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._spill(old_key, self._spilling[old_key])
+            with self._lock:
+                # Discarded while it was written.
+                dropped = self._spilling.pop(old_key, None) is None
+            if dropped:
+                self._remove_spilled(old_key)
+
+    def _remove_spilled(self, key: tuple):
+        try:
+            os.remove(self._spill_path(key))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._frames
+
+    def get(self, key: tuple, build):
+        """
+        Return the cleaned frame for key, building it at most once.
+
+        Args:
+            key (tuple): (engine, method, version).
+            build (callable): Zero-argument function computing the frame.
+        """
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+            if key in self._spilling:
+                return self._spilling[key]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._pending[key] = future
+        if not owner:
+            return future.result()
+        try:
+            df = self._load_spilled(key)
+            if df is None:
+                df = build()
+            self._insert(key, df)
+            future.set_result(df)
+            return df
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def peek(self, key: tuple):
+        """
+        The frame for key if it is held in memory, else None; never
+        builds or loads one.
+
+        Args:
+            key (tuple): (engine, method, version).
+        """
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+            return self._spilling.get(key)
+
+    def put(self, key: tuple, df: pd.DataFrame | pl.DataFrame):
+        """
+        Store an already computed frame under key.
+
+        Args:
+            key (tuple): (engine, method, version).
+            df (Dataframe): Cleaned Pandas or Polars Dataframe.
+        """
+        self._insert(key, df)
+
+    def discard(self, key: tuple):
+        """
+        Forget the frame for key, in memory and spilled.
+
+        Args:
+            key (tuple): (engine, method, version).
+        """
+        with self._lock:
+            self._frames.pop(key, None)
+            self._sizes.pop(key, None)
+            self._spilling.pop(key, None)
+        self._remove_spilled(key)
+
+    def drop_version(self, version: str):
+        """
+        Forget every frame of a superseded data version, in memory
+        and spilled.
+
+        Args:
+            version (str): Data version.
+        """
+        with self._lock:
+            keys = [key for key in [*self._frames, *self._spilling] if key[2] == version]
+            for key in keys:
+                self._frames.pop(key, None)
+                self._sizes.pop(key, None)
+                self._spilling.pop(key, None)
+        for path in glob.glob(os.path.join(self._spill_dir(), f"{version[:16]}-*.parquet")):
+            os.remove(path)
+
+    def clear(self):
+        """
+        Drop every in-memory frame. Spilled files are kept.
+        """
+        with self._lock:
+            self._frames.clear()
+            self._sizes.clear()
@@ -2,28 +2,292 @@
 This script loads the dataset
 from the specified url.
 
+The archive is streamed to disk in chunks. An interrupted download
+is resumed with an HTTP Range request, and an archive that is already
+on disk is only downloaded again when the server reports a change
+(ETag / Last-Modified conditional request); the archive is hashed
+again only when its size or modification time changed. Only the workbook is
+extracted from the archive, and only when it differs from the copy
+on disk.
+
 Name: Arowosegbe Victor\n
 Email: Iyanuvicky@gmail.com\n
 GitHub: https://github.com/Iyanuvicky22/projects
 """
 
+import hashlib
+import json
 import logging
-from io import BytesIO
+import os
+import shutil
+import tempfile
+import zlib
+from urllib.parse import unquote, urlparse
 from zipfile import ZipFile
 import requests
 
 URL = "https://archive.ics.uci.edu/static/public/502/online+retail+ii.zip"
+WORKBOOK = "online_retail_II.xlsx"
+CHUNK_BYTES = 1 << 20
+TIMEOUT = 20
+RETRIES = 3
+
+
+def _meta_path(archive: str) -> str:
+    return f"{archive}.json"
+
+
+def _part_path(archive: str) -> str:
+    return f"{archive}.part"
+
+
+def _load_meta(archive: str) -> dict:
+    try:
+        with open(_meta_path(archive), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_meta(archive: str, meta: dict):
+    with open(_meta_path(archive), "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+
+
+def file_sha256(path: str) -> str:
+    """
+    SHA-256 of a file, read in chunks.
+
+    Args:
+        path (str): File to hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_stat(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _archive_matches(archive: str, complete: dict) -> bool:
+    """
+    Whether the archive on disk is the one recorded in complete.
+
+    The archive is only hashed again when its size or modification
+    time differ from the recorded ones; a matching hash then records
+    the new values.
+    """
+    if not os.path.exists(archive) or not complete.get("sha256"):
+        return False
+    stat = _file_stat(archive)
+    if all(complete.get(key) == value for key, value in stat.items()):
+        return True
+    if complete["sha256"] != file_sha256(archive):
+        return False
+    complete.update(stat)
+    return True
+
+
+def _validators(res: requests.Response) -> dict:
+    return {
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+    }
+
 
+def _request_headers(url: str, archive: str, meta: dict) -> tuple:
+    """
+    Headers of the next request and the offset to resume from.
+
+    A partial download is resumed if the server can confirm, via
+    If-Range, that it has not changed; otherwise a complete archive
+    is revalidated with If-None-Match / If-Modified-Since.
+    """
+    part = _part_path(archive)
+    partial = meta.get("partial", {})
+    if os.path.exists(part) and partial.get("url") == url:
+        validator = partial.get("etag") or partial.get("last_modified")
+        offset = os.path.getsize(part)
+        if validator and offset:
+            return {"Range": f"bytes={offset}-", "If-Range": validator}, offset
+    complete = meta.get("complete", {})
+    headers = {}
+    if complete.get("url") == url and _archive_matches(archive, complete):
+        if complete.get("etag"):
+            headers["If-None-Match"] = complete["etag"]
+        if complete.get("last_modified"):
+            headers["If-Modified-Since"] = complete["last_modified"]
+    return headers, 0
+
+
+def _resume_offset(res: requests.Response) -> int | None:
+    # Content-Range: bytes <start>-<end>/<total>
+    value = res.headers.get("Content-Range", "")
+    unit, _, spec = value.partition(" ")
+    start = spec.split("-")[0]
+    return int(start) if unit == "bytes" and start.isdigit() else None
+
+
+def _fetch(url: str, archive: str, meta: dict, chunk_bytes: int) -> dict:
+    headers, offset = _request_headers(url, archive, meta)
+    part = _part_path(archive)
+    with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as res:
+        if res.status_code == 304:
+            return {"status": 304, "changed": False, "resumed": False, "bytes": 0}
+        if res.status_code == 206 and _resume_offset(res) == offset:
+            mode = "ab"
+        elif res.status_code == 200:
+            mode, offset = "wb", 0
+        elif res.status_code in (206, 416):
+            # The partial file cannot be continued; start over.
+            os.remove(part)
+            raise requests.exceptions.ConnectionError(
+                f"Cannot resume {url} at byte {offset}"
+            )
+        else:
+            return {"status": res.status_code, "changed": False, "resumed": False,
+                    "bytes": 0}
+        # Validators are kept before writing, so an interrupted
+        # download can be resumed by the next call.
+        meta["partial"] = {"url": url, **_validators(res)}
+        _save_meta(archive, meta)
+        written = 0
+        with open(part, mode) as file:
+            for chunk in res.iter_content(chunk_size=chunk_bytes):
+                file.write(chunk)
+                written += len(chunk)
+        return {"status": res.status_code, "changed": True, "resumed": mode == "ab",
+                "bytes": written, **_validators(res)}
+
+
+def download(url: str = URL, archive: str | None = None,
+             expected_sha256: str | None = None, chunk_bytes: int = CHUNK_BYTES,
+             retries: int = RETRIES) -> dict:
+    """
+    Stream the archive at url to disk.
+
+    Returns the HTTP status of the last response, whether the
+    archive changed, whether the download was resumed, the bytes
+    received and the archive's SHA-256.
+
+    Args:
+        url (str, optional): Archive location.
+        archive (str, optional): Local file; defaults to the URL's
+        file name in the working directory.
+        expected_sha256 (str, optional): Checksum the archive must have.
+        chunk_bytes (int, optional): Bytes written per chunk.
+        retries (int, optional): Resumed attempts after a broken
+        connection.
+    """
+    archive = archive or unquote(os.path.basename(urlparse(url).path)) or "dataset.zip"
+    meta = _load_meta(archive)
+    for attempt in range(retries + 1):
+        try:
+            res = _fetch(url, archive, meta, chunk_bytes)
+            break
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            if attempt == retries:
+                raise
+            logging.warning("Download interrupted, resuming: %s", e)
+    res["archive"] = archive
+    if not res["changed"]:
+        if res["status"] == 304:
+            # Keeps the size and mtime recorded after a rehash.
+            _save_meta(archive, meta)
+        res["sha256"] = meta.get("complete", {}).get("sha256")
+        return res
+    part = _part_path(archive)
+    sha256 = file_sha256(part)
+    if expected_sha256 and sha256 != expected_sha256.lower():
+        os.remove(part)
+        meta.pop("partial", None)
+        _save_meta(archive, meta)
+        raise ValueError(f"Checksum mismatch for {url}: {sha256}")
+    os.replace(part, archive)
+    meta.pop("partial", None)
+    meta["complete"] = {
+        "url": url, "etag": res.pop("etag"),
+        "last_modified": res.pop("last_modified"), "sha256": sha256,
+        **_file_stat(archive),
+    }
+    _save_meta(archive, meta)
+    res["sha256"] = sha256
+    return res
+
+
+def _file_crc(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_BYTES):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def extract_workbook(archive: str, dest_dir: str = ".", name: str = WORKBOOK) -> bool:
+    """
+    Extract only the workbook from the archive, unless the copy
+    in dest_dir already has the same size and CRC.
 
-def extract_from_url(url: str):
+    Returns whether the workbook was written.
+
+    Args:
+        archive (str): Downloaded zip archive.
+        dest_dir (str, optional): Where the workbook is placed.
+        name (str, optional): Workbook file name, matched without case.
+    """
+    dest = os.path.join(dest_dir, name)
+    with ZipFile(archive) as zip_file:
+        members = [info for info in zip_file.infolist()
+                   if os.path.basename(info.filename).lower() == name.lower()]
+        if not members:
+            raise ValueError(f"{name} not found in {archive}")
+        info = members[0]
+        if (
+            os.path.exists(dest)
+            and os.path.getsize(dest) == info.file_size
+            and _file_crc(dest) == info.CRC
+        ):
+            return False
+        os.makedirs(dest_dir or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest_dir or ".", suffix=".part")
+        try:
+            # Reading the member checks its CRC.
+            with os.fdopen(fd, "wb") as file, zip_file.open(info) as member:
+                shutil.copyfileobj(member, file, CHUNK_BYTES)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return True
+
+
+def extract_from_url(url: str = URL, dest_dir: str = ".",
+                     expected_sha256: str | None = None):
     """
     Extracting excel data from URL
+
+    Returns 200 once the workbook in dest_dir matches the archive
+    on the server, whether it was downloaded or already current,
+    and the HTTP status otherwise.
+
+    Args:
+        url (str, optional): Archive location.
+        dest_dir (str, optional): Where the archive and workbook go.
+        expected_sha256 (str, optional): Checksum the archive must have.
     """
-    res = requests.get(url, timeout=20)
-    if res.status_code == 200:
-        with ZipFile(BytesIO(res.content)) as zip_file:
-            zip_file.extractall()
-            logging.info("Download Successful")
+    name = unquote(os.path.basename(urlparse(url).path)) or "dataset.zip"
+    res = download(url, os.path.join(dest_dir, name), expected_sha256)
+    if res["status"] not in (200, 206, 304):
+        logging.error("Failed to download file %s ", res["status"])
+        return res["status"]
+    if extract_workbook(res["archive"], dest_dir):
+        logging.info("Download Successful")
     else:
-        logging.error("Failed to download file %s ", res.status_code)
-    return res.status_code
+        logging.info("Workbook is up to date")
+    return 200
@@ -0,0 +1,66 @@
+"""
+Shared test fixtures.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from processor import cache
+
+
+def make_retail(rows: int, seed: int, start: str) -> pd.DataFrame:
+    """
+    Small frame shaped like one sheet of the Online Retail II workbook.
+    """
+    rng = np.random.default_rng(seed)
+    invoice = rng.integers(489000, 490000, rows).astype(object)
+    invoice[rng.random(rows) < 0.05] = "C489449"
+    customer = rng.integers(12000, 18000, rows).astype(float)
+    customer[rng.random(rows) < 0.2] = np.nan
+    seconds = np.sort(rng.integers(0, 30_000_000, rows))
+    return pd.DataFrame(
+        {
+            "Invoice": invoice,
+            "StockCode": rng.choice(["85123A", 22423, "POST"], rows),
+            "Description": rng.choice(
+                ["WHITE HEART", "RED MUG", "BLUE BOWL", None],
+                rows, p=[0.4, 0.3, 0.28, 0.02]
+            ),
+            "Quantity": rng.integers(-5, 30, rows)
+            * np.where(rng.random(rows) < 0.01, 100, 1),
+            "InvoiceDate": pd.Timestamp(start) + pd.to_timedelta(seconds, unit="s"),
+            "Price": np.round(rng.gamma(2, 2, rows), 2),
+            "Customer ID": customer,
+            "Country": rng.choice(["United Kingdom", "France", "Germany"], rows),
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Keep every test's columnar cache in its own directory.
+    """
+    path = tmp_path / "cache"
+    monkeypatch.setattr(cache, "CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def retail_xlsx(tmp_path):
+    """
+    Two-sheet workbook standing in for online_retail_II.xlsx.
+    """
+    path = tmp_path / "online_retail_II.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        make_retail(300, 1, "2009-12-01").to_excel(
+            writer, sheet_name="Year 2009-2010", index=False
+        )
+        make_retail(300, 2, "2010-12-01").to_excel(
+            writer, sheet_name="Year 2010-2011", index=False
+        )
+    return str(path)
@@ -0,0 +1,173 @@
+"""
+Testing of incremental append ingest
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import io
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from processor import append as ap
+from processor import dtypes as dt
+from processor import stats as st
+from processor.chunked import NaCarry, clean_batch
+from processor.clean import clean_pipeline
+from processor.load_data import read_all_sheets
+
+
+@pytest.fixture
+def split(retail_xlsx):
+    """
+    Loaded pandas rows and a batch of new raw rows.
+    """
+    raw, _ = read_all_sheets("pandas", retail_xlsx)
+    batch = raw.iloc[400:].copy()
+    batch.loc[batch.index[:3], "Customer ID"] = np.nan
+    return raw.iloc[:400], batch
+
+
+def test_batch_format():
+    """
+    Explicit format wins; otherwise the content type decides.
+    """
+    assert ap.batch_format("text/csv; charset=utf-8") == "csv"
+    assert ap.batch_format("text/csv", "json") == "json"
+    with pytest.raises(ValueError):
+        ap.batch_format("image/png")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "json"])
+def test_read_batch_conforms(split, fmt):
+    """
+    Every format parses to the loaded dataset's dtypes in both engines.
+    """
+    loaded, batch = split
+    if fmt == "csv":
+        body = batch.to_csv(index=False).encode()
+    elif fmt == "parquet":
+        buffer = io.BytesIO()
+        batch.to_parquet(buffer)
+        body = buffer.getvalue()
+    else:
+        body = batch.to_json(orient="records", date_format="iso").encode()
+    res = ap.read_batch(body, fmt, loaded)
+    assert res.dtypes.equals(loaded.dtypes)
+    assert res.index[0] == len(loaded)
+    like = pl.from_pandas(loaded)
+    assert ap.read_batch(body, fmt, like).schema == like.schema
+
+
+def test_read_batch_missing_columns(split):
+    """
+    Batches without the dataset's columns are rejected.
+    """
+    with pytest.raises(ValueError):
+        ap.read_batch(b"a,b\n1,2\n", "csv", split[0])
+
+
+def test_pipeline_stats_mirror_clean_pipeline(split):
+    """
+    The frozen limits reproduce clean_pipeline on the same rows.
+    """
+    loaded, _ = split
+    for method in ("cap", "drop", "mean"):
+        stats = ap.pipeline_stats(loaded, method)
+        res = clean_batch(NaCarry("pandas")(loaded), stats, method)
+        pd.testing.assert_frame_equal(res, clean_pipeline(loaded.copy(), method))
+
+
+def test_append_matches_full_pass(split):
+    """
+    Appended rows are cleaned as the tail of one frame with
+    the loaded rows' limits, Customer ID fill included.
+    """
+    loaded, batch = split
+    stats = ap.pipeline_stats(loaded, "cap")
+    res = ap.Appender().clean("pandas", batch, loaded, ["cap"])["cap"]
+    full = clean_batch(NaCarry("pandas")(pd.concat([loaded, batch])), stats, "cap")
+    pd.testing.assert_frame_equal(res, full.loc[res.index])
+    assert res["Customer ID"].notna().all()
+
+
+def test_append_polars_carry(split):
+    """
+    Leading nulls of a polars batch are filled from the loaded rows.
+    """
+    loaded, batch = (pl.from_pandas(df) for df in split)
+    res = ap.Appender().clean("polars", batch, loaded, ["drop"])["drop"]
+    full = clean_batch(NaCarry("polars")(pl.concat([loaded, batch])),
+                       ap.pipeline_stats(loaded, "drop"), "drop")
+    assert_frame_equal(res, full.tail(res.height))
+
+
+def test_clean_frame_uses_frozen_limits(split):
+    """
+    Once a batch is appended, every method cleans the whole frame
+    with the limits of the loaded rows, matching the extended frames.
+    """
+    loaded, batch = split
+    appender = ap.Appender()
+    assert appender.frozen("pandas", "mean") is None
+    pd.testing.assert_frame_equal(appender.clean_frame("pandas", loaded, "cap"),
+                                  clean_pipeline(loaded.copy(), "cap"))
+    rows = appender.clean("pandas", batch, loaded, ["cap"])["cap"]
+    assert appender.frozen("pandas", "mean") == ap.pipeline_stats(loaded, "mean")
+    combined = pd.concat([loaded, batch])
+    res = appender.clean_frame("pandas", combined, "cap")
+    extended = pd.concat([clean_pipeline(loaded.copy(), "cap"), rows])
+    pd.testing.assert_frame_equal(res, extended)
+
+
+def test_prepare_keeps_state_until_commit(split):
+    """
+    A prepared batch leaves the carry and the limits alone until it
+    is committed.
+    """
+    loaded, batch = split
+    appender = ap.Appender()
+    cleaned, state = appender.prepare("pandas", batch, loaded, ["cap"])
+    assert appender.frozen("pandas", "cap") is None
+    appender.commit("pandas", state)
+    assert appender.frozen("pandas", "cap") == ap.pipeline_stats(loaded, "cap")
+    pd.testing.assert_frame_equal(
+        cleaned["cap"], ap.Appender().clean("pandas", batch, loaded, ["cap"])["cap"])
+
+
+def test_read_batch_optimized(split):
+    """
+    Batches conform to optimized frames; integers that do not fit the
+    optimized dtype keep 64 bits instead of failing.
+    """
+    loaded, batch = split
+    batch.loc[batch.index[0], "Quantity"] = 100_000
+    body = batch.to_csv(index=False).encode()
+    like = dt.optimize_pandas(loaded)
+    res = ap.read_batch(body, "csv", like)
+    assert res["Quantity"].dtype == "int64" and res["Quantity"].max() == 100_000
+    assert res["Customer ID"].dtype == like["Customer ID"].dtype
+    frame = dt.optimize_polars(pl.from_pandas(loaded))
+    res = ap.read_batch(body, "csv", frame)
+    assert res.schema["Quantity"] == pl.Int64
+    assert res.schema["Customer ID"] == frame.schema["Customer ID"]
+
+
+def test_sketches_give_cap_limits(split):
+    """
+    With kept sketches, 'cap' and 'mean' limits come from them and
+    the batch's NA-handled rows extend them; 'drop' stays exact.
+    """
+    loaded, batch = split
+    sketches = st.sketch_columns(NaCarry("pandas")(loaded), 0.01)
+    stats = ap.pipeline_stats(loaded, "cap", sketches)
+    assert stats == {col: sketches[col].to_stats() for col in ("Quantity", "Price")}
+    assert ap.pipeline_stats(loaded, "drop", sketches) == ap.pipeline_stats(loaded, "drop")
+    cleaned, state = ap.Appender().prepare("pandas", batch, loaded, ["cap"], sketches)
+    assert state.stats["cap"] == stats
+    assert state.sketches["Price"].count == sketches["Price"].count + len(
+        NaCarry("pandas")(batch.copy()))
+    assert sketches["Price"].count == len(NaCarry("pandas")(loaded))
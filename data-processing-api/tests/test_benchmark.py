@@ -0,0 +1,126 @@
+"""
+Testing of the stage-level benchmark
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import json
+import os
+import pytest
+from processor import benchmark as bm
+
+
+def test_percentile_nearest_rank():
+    """
+    p95 of 1..20 is 19, median of one value is itself.
+    """
+    assert bm.percentile(list(range(1, 21)), 95) == 19
+    assert bm.summarize([2_000_000])["median_ms"] == 2.0
+
+
+def test_benchmark_report(retail_xlsx, tmp_path):
+    """
+    Every requested stage is timed for both engines and saved.
+    """
+    out = str(tmp_path / "bench")
+    report = bm.run_benchmark(
+        retail_xlsx, stages=("load", "outliers"), iterations=2, output_dir=out
+    )
+    for engine in ("pandas", "polars"):
+        assert set(report["results"][engine]) == {"load", "outliers"}
+        stage = report["results"][engine]["outliers"]
+        assert stage["warm"]["runs"] == 2
+        assert stage["cold"]["runs"] == 1
+        assert stage["python_peak_bytes"] > 0
+    with open(report["saved_to"], encoding="utf-8") as file:
+        assert json.load(file)["params"]["stages"] == ["load", "outliers"]
+
+    again = bm.run_benchmark(
+        retail_xlsx, stages=("load",), iterations=2, output_dir=out
+    )
+    assert "change_pct" in again["results"]["polars"]["load"]
+    assert again["compared_with"] == report["timestamp"]
+    other = bm.run_benchmark(
+        retail_xlsx, engines=("polars",), stages=("load",), iterations=1, output_dir=out
+    )
+    assert "change_pct" not in other["results"]["polars"]["load"]
+    assert other["compared_with"] is None
+    assert len(os.listdir(out)) == 3
+
+
+def test_rss_sampler_measures_growth_over_baseline():
+    """
+    The RSS rise of a block is measured from its own start, not
+    the process's lifetime high-water mark.
+    """
+    with bm.RssSampler() as idle:
+        pass
+    with bm.RssSampler() as busy:
+        block = bytearray(64 << 20)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+    if idle.increase is None:
+        pytest.skip("RSS not readable on this platform")
+    assert busy.increase >= 32 << 20
+    assert idle.increase < 32 << 20
+
+
+def test_unknown_stage_rejected(retail_xlsx):
+    """
+    Typos in stage names are reported instead of ignored.
+    """
+    with pytest.raises(ValueError):
+        bm.run_benchmark(retail_xlsx, stages=("lod",), save=False)
+
+
+@pytest.mark.parametrize("runs", [{"iterations": 0}, {"warmup": -1}, {"cold": -1}])
+def test_run_counts_validated(retail_xlsx, runs):
+    """
+    Run counts that leave no timings are rejected before anything runs.
+    """
+    with pytest.raises(ValueError):
+        bm.run_benchmark(retail_xlsx, save=False, **runs)
+
+
+def test_serialize_stage(retail_xlsx):
+    """
+    Serialization is timed as its own stage and measured in bytes.
+    """
+    res = bm.run_benchmark(
+        retail_xlsx, engines=("pandas", "polars"), stages=("aggregate", "serialize"),
+        iterations=1, cold=0, save=False,
+    )
+    for engine in ("pandas", "polars"):
+        assert res["results"][engine]["serialize"]["bytes"] > 0
+        assert res["results"][engine]["serialize"]["warm"]["runs"] == 1
+    assert set(res["equivalence"]) == {"aggregate"}
+
+
+def test_bench_transform(retail_xlsx):
+    """
+    Current and typed transforms are timed, sized and give the
+    same aggregate.
+    """
+    res = bm.bench_transform(retail_xlsx, iterations=1, warmup=0)
+    for engine in ("pandas", "polars"):
+        assert res[engine]["equivalent"]
+        assert res[engine]["typed"]["warm"]["runs"] == 1
+        assert res[engine]["typed"]["derived_bytes"] < res[engine]["current"]["derived_bytes"]
+    assert res["pandas"]["typed"]["dtypes"]["NameOfDay"] == "category"
+    with pytest.raises(ValueError):
+        bm.bench_transform(retail_xlsx, engines=("duckdb",))
+    with pytest.raises(ValueError):
+        bm.bench_transform(retail_xlsx, iterations=0)
+
+
+def test_saved_runs_pruned(tmp_path):
+    """
+    Only the newest saved runs are kept.
+    """
+    for i in range(5):
+        (tmp_path / f"2024010{i}T000000-abc.json").write_text("{}")
+    bm._prune(str(tmp_path), keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "20240103T000000-abc.json", "20240104T000000-abc.json"]
@@ -0,0 +1,71 @@
+"""
+Testing of the columnar source cache
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import os
+import pandas as pd
+import polars as pl
+from processor import cache
+from processor.load_data import read_pandas, read_polars
+
+
+def test_pandas_reads_from_cache(retail_xlsx, monkeypatch):
+    """
+    Second pandas read must not parse Excel again.
+    """
+    first = read_pandas(retail_xlsx)
+    assert os.path.exists(cache.cache_file(retail_xlsx, sheet=0, engine="pandas"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Excel parsed despite cache")
+
+    monkeypatch.setattr(pd, "read_excel", fail)
+    second = read_pandas(retail_xlsx)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_polars_reads_from_cache(retail_xlsx, monkeypatch):
+    """
+    Second polars read must not parse Excel again.
+    """
+    first = read_polars(retail_xlsx)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Excel parsed despite cache")
+
+    monkeypatch.setattr(pl, "read_excel", fail)
+    assert read_polars(retail_xlsx).equals(first)
+
+
+def test_raw_path_bypasses_cache(retail_xlsx, cache_dir):
+    """
+    use_cache=False never touches the cache directory.
+    """
+    read_pandas(retail_xlsx, use_cache=False)
+    read_polars(retail_xlsx, use_cache=False)
+    assert not cache_dir.exists()
+
+
+def test_source_change_invalidates_cache(retail_xlsx):
+    """
+    Changing the workbook changes its version and cache entry.
+    """
+    before = cache.cache_file(retail_xlsx, sheet=0, engine="pandas")
+    with open(retail_xlsx, "ab") as file:
+        file.write(b"\0")
+    after = cache.cache_file(retail_xlsx, sheet=0, engine="pandas")
+    assert before != after
+
+
+def test_arrow_safe_mixed_columns():
+    """
+    Mixed int/str object columns become strings, NA stays NA.
+    """
+    df = pd.DataFrame({"Invoice": [489434, "C489449", None], "Price": [1.0, 2.0, 3.0]})
+    res = cache.arrow_safe(df)
+    assert res["Invoice"].tolist()[:2] == ["489434", "C489449"]
+    assert res["Invoice"].isna().iloc[2]
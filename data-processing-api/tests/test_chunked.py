@@ -0,0 +1,111 @@
+"""
+Testing of the out-of-core chunked pipeline
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from processor import chunked
+from processor.load_data import read_all_sheets
+from processor.clean import DAY_NAMES, clean_pipeline
+from processor.aggregate import aggregate_pandas, aggregate_polars
+
+
+@pytest.mark.parametrize("method", ["cap", "drop", "mean"])
+def test_pandas_chunked_matches_eager(retail_xlsx, method):
+    """
+    Small batches give the eager pandas aggregate.
+    """
+    raw, _ = read_all_sheets("pandas", retail_xlsx)
+    eager = aggregate_pandas(clean_pipeline(raw, method)).sort_index()
+    res = chunked.run_chunked(retail_xlsx, "pandas", method, batch_rows=64)
+    pd.testing.assert_frame_equal(res.sort_index(), eager, check_dtype=False)
+
+
+@pytest.mark.parametrize("method", ["cap", "drop", "mean"])
+def test_polars_chunked_matches_eager(retail_xlsx, method):
+    """
+    Small batches give the eager polars aggregate.
+    """
+    raw, _ = read_all_sheets("polars", retail_xlsx)
+    eager = aggregate_polars(clean_pipeline(raw, method)).sort("NameOfDay")
+    res = chunked.run_chunked(retail_xlsx, "polars", method, batch_rows=64)
+    assert_frame_equal(res.sort("NameOfDay"), eager, check_dtypes=False)
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_chunked_keeps_eager_day_order_and_dtypes(retail_xlsx, typed):
+    """
+    Both modes list the days in weekday order, and chunked mode
+    follows the typed transform like eager mode.
+    """
+    raw, _ = read_all_sheets("pandas", retail_xlsx)
+    eager = aggregate_pandas(clean_pipeline(raw, "cap", typed=typed))
+    res = chunked.run_chunked(retail_xlsx, "pandas", "cap", batch_rows=64, typed=typed)
+    assert list(eager.index) == list(res.index) == DAY_NAMES
+    assert isinstance(res.index, pd.CategoricalIndex) == typed
+    raw, _ = read_all_sheets("polars", retail_xlsx)
+    eager = aggregate_polars(clean_pipeline(raw, "drop", typed=typed))
+    res = chunked.run_chunked(retail_xlsx, "polars", "drop", batch_rows=64, typed=typed)
+    assert eager["NameOfDay"].cast(pl.String).to_list() == DAY_NAMES
+    assert res["NameOfDay"].dtype == eager["NameOfDay"].dtype
+    assert_frame_equal(res, eager, check_dtypes=False)
+
+
+def test_forward_fill_crosses_batches():
+    """
+    A batch starting with missing Customer IDs is filled from
+    the previous batch.
+    """
+    carry = chunked.NaCarry("pandas")
+    first = pd.DataFrame({"Description": ["a", "b"], "Customer ID": [1.0, 2.0]})
+    second = pd.DataFrame({"Description": ["c", "d"], "Customer ID": [np.nan, 3.0]})
+    carry(first)
+    assert carry(second)["Customer ID"].tolist() == [2.0, 3.0]
+
+    carry = chunked.NaCarry("polars")
+    carry(pl.DataFrame({"Invoice": ["1"], "Description": ["a"], "Customer ID": [7]}))
+    second = pl.DataFrame(
+        {"Invoice": ["2"], "Description": ["b"], "Customer ID": [None]},
+        schema_overrides={"Customer ID": pl.Int64},
+    )
+    res = carry(second)
+    assert res["Customer ID"].to_list() == [7]
+
+
+def test_batches_are_bounded(retail_xlsx):
+    """
+    No batch holds more than batch_rows rows.
+    """
+    source = chunked.source_file(retail_xlsx, "polars")
+    sizes = [len(df) for df in chunked.iter_batches(source, "polars", 100)]
+    assert max(sizes) <= 100
+    assert sum(sizes) == 600
+
+
+def test_unknown_engine(retail_xlsx):
+    """
+    Unsupported engines are rejected.
+    """
+    with pytest.raises(ValueError):
+        chunked.run_chunked(retail_xlsx, "spark")
+
+
+def test_sketch_limits_stay_close(retail_xlsx):
+    """
+    Streaming sketches give outlier limits close to the exact ones.
+    """
+    source = chunked.source_file(retail_xlsx, "pandas")
+    exact = chunked.global_stats(source, "pandas", "cap", batch_rows=64, epsilon=0)
+    approx = chunked.global_stats(source, "pandas", "cap", batch_rows=64, epsilon=0.01)
+    for col, stats in exact.items():
+        assert approx[col].count == stats.count
+        assert approx[col].mean == pytest.approx(stats.mean)
+        low, high = stats.iqr_limits()
+        assert approx[col].iqr_limits()[1] == pytest.approx(high, abs=0.2 * (high - low))
@@ -0,0 +1,140 @@
+"""
+Testing of the native polars outlier handling and the typed
+date transform
+
+The reference below is the previous pandas round-trip
+implementation; the polars expressions must give the same values.
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+from processor.clean import handle_outlier_polars, transform_df
+from processor.aggregate import aggregate_pandas, aggregate_polars
+from tests.conftest import make_retail
+
+
+def reference_outlier_polars(df: pl.DataFrame, col: str, method="cap"):
+    """
+    Previous implementation, kept as the equivalence oracle.
+    """
+    df = df.to_pandas()
+    q1 = df[col].quantile(0.25)
+    q3 = df[col].quantile(0.75)
+    iqr = q3 - q1
+    if method == "drop":
+        df[col] = df[col][
+            ~((df[col] < (q1 - 1.5 * iqr)) | (df[col] > (q3 + 1.5 * iqr)))
+        ]
+        return pl.from_pandas(df.dropna())
+    if method == "cap":
+        upper_limit = df[col].mean() + 3 * df[col].std()
+        lower_limit = df[col].mean() - 3 * df[col].std()
+    else:
+        lower_limit = df[col][~(df[col] < (q1 - 1.5 * iqr))].max()
+        upper_limit = df[col][~(df[col] > (q3 + 1.5 * iqr))].min()
+    df[col] = df[col].astype(float)
+    low_value = lower_limit if method == "cap" else df[col].mean()
+    high_value = upper_limit if method == "cap" else df[col].mean()
+    df[col] = np.where(
+        df[col] > upper_limit,
+        high_value,
+        np.where(df[col] < lower_limit, low_value, df[col]),
+    )
+    df[col] = df[col].astype(int)
+    return pl.from_pandas(df)
+
+
+def sample(seed: int, with_nulls: bool = False) -> pl.DataFrame:
+    """
+    Skewed integer and float columns with a few extreme values.
+    """
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(-5, 30, 2000) * np.where(rng.random(2000) < 0.02, 400, 1)
+    customer = rng.integers(12000, 18000, 2000).astype(float)
+    if with_nulls:
+        customer[rng.random(2000) < 0.1] = np.nan
+    return pl.DataFrame(
+        {
+            "Quantity": quantity,
+            "Price": np.round(rng.gamma(2, 2, 2000) * 10, 2),
+            "Customer ID": customer,
+        },
+        nan_to_null=True,
+    )
+
+
+@pytest.mark.parametrize("method", ["drop", "cap", "mean"])
+@pytest.mark.parametrize("col", ["Quantity", "Price"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_reference(method, col, seed):
+    """
+    Values match the pandas round-trip for every strategy.
+    """
+    df = sample(seed, with_nulls=method == "drop")
+    expected = reference_outlier_polars(df, col, method)
+    result = handle_outlier_polars(df, col, method)
+    assert result.height == expected.height
+    for name in df.columns:
+        np.testing.assert_allclose(
+            result[name].cast(pl.Float64).to_numpy(),
+            expected[name].cast(pl.Float64).to_numpy(),
+        )
+
+
+def test_keeps_polars_dtypes():
+    """
+    Dropping rows no longer turns integer columns into floats.
+    """
+    result = handle_outlier_polars(sample(0), "Quantity", "drop")
+    assert result.schema["Quantity"] == pl.Int64
+
+
+def test_works_on_lazy_frames():
+    """
+    The same expressions run inside a lazy query.
+    """
+    df = sample(1)
+    lazy = handle_outlier_polars(df.lazy(), "Price", "cap").collect()
+    assert lazy.equals(handle_outlier_polars(df, "Price", "cap"))
+
+
+def test_typed_transform_pandas():
+    """
+    Typed columns hold the same dates, times and day names as the
+    object columns, and give the same aggregate.
+    """
+    raw = make_retail(500, 4, "2010-01-01")
+    current = transform_df(raw.copy())
+    typed = transform_df(raw.copy(), typed=True)
+    assert typed["InvoiceDate"].dtype == "datetime64[ns]"
+    assert typed["InvoiceTime"].dtype == "timedelta64[ns]"
+    assert isinstance(typed["NameOfDay"].dtype, pd.CategoricalDtype)
+    assert (typed["InvoiceDate"].dt.date == current["InvoiceDate"]).all()
+    times = (pd.Timestamp("2000-01-01") + typed["InvoiceTime"]).dt.time
+    assert (times == current["InvoiceTime"]).all()
+    assert (typed["NameOfDay"].astype(str) == current["NameOfDay"]).all()
+    typed_agg = aggregate_pandas(typed)
+    typed_agg.index = typed_agg.index.astype(str)
+    assert typed_agg.sort_index().equals(aggregate_pandas(current).sort_index())
+
+
+def test_typed_transform_polars():
+    """
+    The day name is an Enum with the same values as the strings.
+    """
+    raw = pl.from_pandas(
+        make_retail(500, 5, "2010-01-01").astype({"Invoice": str, "StockCode": str})
+    )
+    current = transform_df(raw)
+    typed = transform_df(raw.lazy(), typed=True).collect()
+    assert isinstance(typed.schema["NameOfDay"], pl.Enum)
+    assert typed["NameOfDay"].cast(pl.String).equals(current["NameOfDay"])
+    by_day = lambda df: aggregate_polars(df).with_columns(
+        pl.col("NameOfDay").cast(pl.String)).sort("NameOfDay")
+    assert by_day(typed).equals(by_day(current))
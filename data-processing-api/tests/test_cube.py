@@ -0,0 +1,117 @@
+"""
+Testing of the revenue rollup cube
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from processor.cube import Cube, DIMENSIONS
+from processor.load_data import read_all_sheets
+from processor.clean import clean_pipeline
+
+
+@pytest.fixture
+def cleaned(retail_xlsx):
+    """
+    Cleaned polars frame of the test workbook.
+    """
+    raw, _ = read_all_sheets("polars", retail_xlsx)
+    return clean_pipeline(raw, "drop")
+
+
+def direct(df: pl.DataFrame, by: list, filters: dict) -> pl.DataFrame:
+    """
+    The same query computed from the cleaned rows.
+    """
+    df = df.with_columns(
+        pl.col("InvoiceDateTime").dt.hour().alias("Hour"),
+        pl.col("InvoiceDateTime").dt.month().alias("Month"),
+        (pl.col("Quantity") * pl.col("Price")).cast(pl.Float64).alias("Revenue"),
+    )
+    for dim, values in filters.items():
+        df = df.filter(pl.col(dim).is_in(values))
+    return (
+        df.group_by(by)
+        .agg(
+            pl.col("Revenue").sum().round(2).alias("sum"),
+            pl.col("Revenue").mean().round(2).alias("mean"),
+            pl.len().alias("count"),
+        )
+        .sort(by)
+    )
+
+
+@pytest.mark.parametrize(
+    "by, filters",
+    [
+        (["NameOfDay"], {}),
+        (["Country", "Hour"], {"Month": [12, 1]}),
+        (["StockCode"], {"Country": ["France"], "NameOfDay": ["Monday"]}),
+        (list(DIMENSIONS), {}),
+    ],
+)
+def test_query_matches_rows(cleaned, by, filters):
+    """
+    Cube answers equal group-bys over the cleaned rows.
+    """
+    result, _ = Cube(cleaned).query(by, filters)
+    assert_frame_equal(result, direct(cleaned, by, filters), check_dtypes=False,
+                       abs_tol=0.011)
+
+
+def test_query_uses_smallest_cuboid(cleaned):
+    """
+    Queries are answered from the smallest covering cuboid.
+    """
+    cube = Cube(cleaned)
+    _, source = cube.query(["Country"])
+    assert source == ["Country"]
+    assert cube.sizes()["Country"] == 3
+    _, source = cube.query(["Hour"], {"Country": ["France"]})
+    assert set(source) >= {"Hour", "Country"}
+
+
+def test_grand_total(cleaned):
+    """
+    No dimensions gives a single total row.
+    """
+    result, _ = Cube(cleaned).query()
+    assert result["count"].item() == cleaned.height
+
+
+def test_invalid_query(cleaned):
+    """
+    Unknown dimensions and badly typed values raise ValueError.
+    """
+    cube = Cube(cleaned)
+    with pytest.raises(ValueError):
+        cube.query(["Region"])
+    with pytest.raises(ValueError):
+        cube.query([], {"Hour": ["noon"]})
+
+
+def test_cube_from_pandas(retail_xlsx):
+    """
+    A cleaned pandas frame builds the same base cuboid.
+    """
+    raw, _ = read_all_sheets("pandas", retail_xlsx)
+    result, _ = Cube(clean_pipeline(raw, "cap")).query(["NameOfDay"])
+    assert result["count"].sum() == len(clean_pipeline(raw.copy(), "cap"))
+
+
+def test_append_matches_rebuild(cleaned):
+    """
+    Appending rows gives the cube of all rows.
+    """
+    first = Cube(cleaned.head(300))
+    sizes = first.sizes()
+    cube = first.appended(cleaned.tail(cleaned.height - 300), version="v2")
+    assert first.sizes() == sizes and cube.version == "v2"
+    rebuilt = Cube(cleaned)
+    for by in (["Country"], ["Hour", "NameOfDay"], list(DIMENSIONS)):
+        # Rounded values may differ in the last digit with summation order.
+        assert_frame_equal(cube.query(by)[0], rebuilt.query(by)[0], abs_tol=0.011)
@@ -0,0 +1,100 @@
+"""
+Testing of the memory-optimized dtype profile
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import pandas as pd
+import polars as pl
+import pytest
+from processor import cache
+from processor import dtypes as dt
+from processor.clean import clean_pipeline
+from processor.aggregate import aggregate_pandas, aggregate_polars
+from tests.conftest import make_retail
+
+
+@pytest.fixture
+def raw() -> pd.DataFrame:
+    """
+    Raw frame as read through the columnar cache.
+    """
+    return cache.arrow_safe(make_retail(5000, 4, "2010-01-01"))
+
+
+def test_pandas_profile(raw):
+    """
+    Strings are encoded, numbers downcast, whole-number floats made integers.
+    """
+    res = dt.optimize_pandas(raw)
+    assert isinstance(res["Country"].dtype, pd.CategoricalDtype)
+    assert res["Quantity"].dtype == "int16"
+    assert res["Customer ID"].dtype == "Int16"
+    assert res["Price"].dtype == "float64"
+    assert res["Customer ID"].isna().sum() == raw["Customer ID"].isna().sum()
+    report = dt.memory_report(raw)
+    assert report["total_bytes_after"] < report["total_bytes_before"]
+
+
+def test_polars_profile(raw):
+    """
+    Polars strings become categoricals and integers shrink.
+    """
+    res = dt.optimize_polars(pl.from_pandas(raw))
+    assert res.schema["Country"] == pl.Categorical
+    assert res.schema["Quantity"] == pl.Int16
+    assert res.schema["Customer ID"] == pl.Int16
+
+
+@pytest.mark.parametrize("method", ["cap", "drop", "mean"])
+def test_pipeline_results_unchanged(raw, method):
+    """
+    The optimized frames give the same aggregates.
+    """
+    expected = aggregate_pandas(clean_pipeline(raw.copy(), method))
+    result = aggregate_pandas(clean_pipeline(dt.optimize(raw), method))
+    pd.testing.assert_frame_equal(result, expected)
+
+    frame = pl.from_pandas(raw)
+    expected = aggregate_polars(clean_pipeline(frame, method)).sort("NameOfDay")
+    result = aggregate_polars(clean_pipeline(dt.optimize(frame), method)).sort("NameOfDay")
+    assert result.equals(expected)
+
+
+def test_optimize_is_idempotent(raw):
+    """
+    An optimized frame with missing Customer IDs can be optimized
+    again; nullable integers stay nullable.
+    """
+    once = dt.optimize_pandas(raw)
+    assert once["Customer ID"].isna().any()
+    twice = dt.optimize_pandas(once)
+    assert twice["Customer ID"].dtype == "Int16"
+    pd.testing.assert_frame_equal(twice, once)
+
+
+def test_extend_keeps_frame_dtypes(raw):
+    """
+    Appended rows take the optimized frame's dtypes; new strings
+    become categories and out-of-range integers widen the column.
+    """
+    df = dt.optimize_pandas(raw.iloc[:4000])
+    batch = raw.iloc[4000:].copy()
+    batch.loc[batch.index[0], "Country"] = "Spain"
+    batch.loc[batch.index[1], "Quantity"] = 100_000
+    res = dt.extend(df, batch)
+    assert res["Country"].dtype == "category"
+    assert "Spain" in res["Country"].cat.categories
+    assert res["Customer ID"].dtype == "Int16"
+    assert res["Quantity"].dtype == "int32"
+    expected = pd.concat([raw.iloc[:4000], batch])
+    assert res["Quantity"].tolist() == expected["Quantity"].tolist()
+    assert res["Country"].astype(object).tolist() == expected["Country"].tolist()
+
+    frame = dt.optimize_polars(pl.from_pandas(raw.iloc[:4000]))
+    res = dt.extend(frame, pl.from_pandas(batch))
+    assert res.schema["Country"] == pl.Categorical
+    assert res.schema["Customer ID"] == pl.Int16
+    assert res["Quantity"].to_list() == expected["Quantity"].tolist()
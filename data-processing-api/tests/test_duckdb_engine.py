@@ -0,0 +1,60 @@
+"""
+Testing of the DuckDB engine
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import pandas as pd
+import pytest
+from processor import engines as en
+from processor import benchmark as bm
+
+pytest.importorskip("duckdb")
+
+
+@pytest.mark.parametrize("method", ["cap", "drop", "mean"])
+def test_duckdb_matches_pandas(retail_xlsx, method):
+    """
+    The SQL pipeline gives the pandas aggregate.
+    """
+    duck = en.ENGINES["duckdb"]
+    pandas = en.ENGINES["pandas"]
+    res = duck.to_pandas(duck.run(retail_xlsx, method)).set_index("NameOfDay")
+    expected = pandas.run(retail_xlsx, method)
+    pd.testing.assert_frame_equal(res, expected, check_dtype=False)
+
+
+def test_duckdb_stages_match_pandas(retail_xlsx):
+    """
+    Every stage output has the pandas rows and totals.
+    """
+    duck, pandas = en.ENGINES["duckdb"], en.ENGINES["pandas"]
+    db_df, pd_df = duck.load(retail_xlsx), pandas.load(retail_xlsx)
+    for stage in ("na", "outliers", "transform"):
+        if stage == "outliers":
+            db_df, pd_df = duck.outliers(db_df, "cap"), pandas.outliers(pd_df, "cap")
+        else:
+            db_df, pd_df = duck.stage(stage)(db_df), pandas.stage(stage)(pd_df)
+        prints = {
+            "pandas": en.fingerprint(pandas.to_pandas(pd_df)),
+            "duckdb": en.fingerprint(duck.to_pandas(db_df)),
+        }
+        assert en.compare(prints, "pandas")["duckdb"]["equivalent"], stage
+
+
+def test_duckdb_has_no_cold_load(retail_xlsx, tmp_path):
+    """
+    DuckDB loads all sheets from the cache; its cold load is
+    reported as not applicable instead of timing another reader.
+    """
+    duck = en.ENGINES["duckdb"]
+    assert duck.load(retail_xlsx).num_rows == 600
+    with pytest.raises(ValueError):
+        duck.load(retail_xlsx, use_cache=False)
+    report = bm.run_benchmark(retail_xlsx, engines=("pandas", "duckdb"),
+                              stages=("load",), iterations=1, warmup=0,
+                              output_dir=str(tmp_path))
+    assert report["results"]["duckdb"]["load"]["cold"] == {"runs": 0, "applicable": False}
+    assert report["results"]["pandas"]["load"]["cold"]["runs"] == 1
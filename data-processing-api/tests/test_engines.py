@@ -0,0 +1,65 @@
+"""
+Testing of the engine interface and equivalence checks
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import pandas as pd
+import pytest
+from processor import engines as en
+from processor import benchmark as bm
+
+
+def test_builtin_engines_registered():
+    """
+    pandas and polars are always available.
+    """
+    assert {"pandas", "polars"} <= set(en.ENGINES)
+    with pytest.raises(ValueError):
+        en.ENGINES["pandas"].stage("clean")
+
+
+def test_run_matches_aggregate(retail_xlsx):
+    """
+    Engine.run gives the pipeline's aggregate.
+    """
+    res = en.ENGINES["pandas"].run(retail_xlsx, method="drop")
+    assert list(res.columns) == ["sum", "mean", "count"]
+    assert res.index.name == "NameOfDay"
+
+
+def test_compare_reports_differences():
+    """
+    Totals outside the tolerance are listed per engine.
+    """
+    prints = {
+        "pandas": en.fingerprint(pd.DataFrame({"Price": [1.0, 2.0]})),
+        "same": en.fingerprint(pd.DataFrame({"Price": [2.0, 1.0]})),
+        "other": en.fingerprint(pd.DataFrame({"Price": [1.0, 1.0]})),
+    }
+    res = en.compare(prints, reference="pandas")
+    assert res["same"]["equivalent"]
+    assert not res["other"]["equivalent"]
+    assert set(res["other"]["differences"]) == {"Price"}
+
+
+def test_registered_engine_is_benchmarked(retail_xlsx, monkeypatch):
+    """
+    A registered engine goes through timing and equivalence checks.
+    """
+    pandas = en.ENGINES["pandas"]
+    monkeypatch.setitem(en.ENGINES, "copy", en.Engine(
+        name="copy",
+        load=pandas.load,
+        na=pandas.na,
+        outliers=pandas.outliers,
+        transform=pandas.transform,
+        aggregate=pandas.aggregate,
+        to_pandas=pandas.to_pandas,
+    ))
+    report = bm.run_benchmark(retail_xlsx, engines=("pandas", "copy"),
+                              iterations=1, cold=0, save=False)
+    assert set(report["fastest"]) == set(bm.STAGES)
+    assert all(stage["copy"]["equivalent"] for stage in report["equivalence"].values())
@@ -0,0 +1,116 @@
+"""
+Testing of the streaming exports
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import polars as pl
+import pyarrow.parquet as pq
+from processor import export as ex
+from processor.clean import clean_pipeline
+from tests.conftest import make_retail
+
+
+def test_parquet_streamed_by_row_group():
+    """
+    Each row group is yielded separately and the file reads back whole.
+    """
+    df = clean_pipeline(make_retail(2500, 1, "2010-01-01"), "cap")
+    chunks = list(ex.iter_parquet(df, row_group_rows=1000))
+    assert len(chunks) == 4
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == len(df)
+    assert table.column("Price").to_pylist() == df["Price"].tolist()
+    assert pq.ParquetFile(io.BytesIO(b"".join(chunks))).num_row_groups == 3
+
+
+def test_ndjson_batches():
+    """
+    Every row becomes one JSON line across batch boundaries.
+    """
+    df = pl.from_pandas(make_retail(250, 2, "2010-01-01").astype({"Invoice": str, "StockCode": str}))
+    lines = b"".join(ex.iter_ndjson(df, batch_rows=100)).splitlines()
+    assert len(lines) == 250
+    assert json.loads(lines[-1])["Country"] == df["Country"][-1]
+
+
+def test_artifact_written_once(cache_dir):
+    """
+    Concurrent first requests get full bodies and leave one artifact.
+    """
+    path = ex.artifact_path(ex.artifact_key("v1", "polars", "drop", "ndjson"), "ndjson")
+
+    def chunks():
+        for i in range(50):
+            yield f"{i}\n".encode()
+
+    def fetch(_):
+        return b"".join(ex.stream_artifact(path, chunks))
+
+    with ThreadPoolExecutor(4) as pool:
+        bodies = list(pool.map(fetch, range(4)))
+    assert all(body == bodies[0] for body in bodies)
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+
+def test_aborted_stream_leaves_nothing(cache_dir):
+    """
+    A client that disconnects early does not leave a partial artifact.
+    """
+    path = ex.artifact_path("abc", "ndjson")
+    stream = ex.stream_artifact(path, lambda: iter([b"a\n", b"b\n"]))
+    next(stream)
+    stream.close()
+    assert os.listdir(os.path.dirname(path)) == []
+
+
+def test_footer_ranges_fetch_one_column_chunk(cache_dir):
+    """
+    The footer and one column chunk, at the byte ranges the metadata
+    gives, are enough to read that column of one row group.
+    """
+    df = clean_pipeline(make_retail(3000, 4, "2010-01-01"), "cap")
+    path = ex.ensure_artifact(os.path.join(cache_dir, "a.parquet"),
+                              lambda: ex.iter_parquet(df, row_group_rows=1000))
+    meta = ex.parquet_footer(path)
+    assert meta["num_rows"] == len(df) and len(meta["row_groups"]) == 3
+    chunk = next(c for c in meta["row_groups"][1]["columns"] if c["name"] == "Price")
+    assert chunk["min"] == df["Price"].iloc[1000:2000].min()
+    footer = meta["footer"]
+    assert footer["offset"] + footer["length"] == meta["size"]
+    with open(path, "rb") as file:
+        data = file.read()
+    # Only the fetched ranges are filled in; every other byte is zero.
+    sparse = bytearray(len(data))
+    ranges = [(footer["offset"], footer["length"]), (chunk["offset"], chunk["length"])]
+    for offset, length in ranges:
+        sparse[offset:offset + length] = data[offset:offset + length]
+    table = pq.ParquetFile(io.BytesIO(bytes(sparse))).read_row_group(1, columns=["Price"])
+    assert table.column("Price").to_pylist() == df["Price"].iloc[1000:2000].tolist()
+    assert sum(length for _, length in ranges) < len(data) / 4
+
+def test_ensure_artifact_and_etags(cache_dir):
+    """
+    An artifact is produced once; If-None-Match lists, weak tags and
+    '*' match the current ETag, other tags do not.
+    """
+    path = os.path.join(cache_dir, "b.ndjson")
+    calls = []
+
+    def chunks():
+        calls.append(1)
+        yield b"{}\n"
+
+    ex.ensure_artifact(path, chunks)
+    ex.ensure_artifact(path, chunks)
+    assert calls == [1]
+    assert ex.etag_matches('"x", W/"abc"', '"abc"')
+    assert ex.etag_matches("*", '"abc"')
+    assert not ex.etag_matches('"abd"', '"abc"')
+    assert not ex.etag_matches(None, '"abc"')
@@ -0,0 +1,90 @@
+"""
+Testing of the Arrow interchange layer
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+from processor import interchange as ic
+from processor import export as ex
+from processor import engines as en
+
+
+def _address(array) -> int:
+    """
+    Address of the data buffer of a single-chunk Arrow array.
+    """
+    if isinstance(array, pa.ChunkedArray):
+        array = array.chunk(0)
+    return array.buffers()[1].address
+
+
+def sample() -> pl.DataFrame:
+    """
+    Frame with integer, float (with nulls) and string columns.
+    """
+    return pl.DataFrame(
+        {
+            "Quantity": np.arange(1000, dtype="int64"),
+            "Price": [None if i % 7 == 0 else i / 3 for i in range(1000)],
+            "Country": ["France", "Germany"] * 500,
+        }
+    )
+
+
+def test_polars_to_pandas_zero_copy():
+    """
+    Numeric pandas columns share the polars buffers.
+    """
+    df = sample()
+    res = ic.polars_to_pandas(df)
+    assert isinstance(res["Quantity"].dtype, pd.ArrowDtype)
+    for col in ("Quantity", "Price"):
+        assert _address(res[col].array._pa_array) == _address(df[col].to_arrow())
+
+
+def test_pandas_to_polars_zero_copy():
+    """
+    ArrowDtype and numpy numeric columns are handed to polars as is.
+    """
+    arrow_backed = ic.polars_to_pandas(sample())
+    back = ic.pandas_to_polars(arrow_backed)
+    assert back.equals(sample())
+    assert _address(back["Quantity"].to_arrow()) == _address(
+        arrow_backed["Quantity"].array._pa_array
+    )
+    numpy_backed = pd.DataFrame({"x": np.arange(10.0)})
+    table = ic.pandas_to_arrow(numpy_backed)
+    assert _address(table.column("x")) == numpy_backed["x"].to_numpy().ctypes.data
+
+
+def test_arrow_ipc_export_memory_maps(tmp_path):
+    """
+    The streamed IPC file can be memory-mapped and read back.
+    """
+    df = sample()
+    path = tmp_path / "data.arrow"
+    chunks = list(ex.iter_arrow_ipc(df, batch_rows=300))
+    assert len(chunks) == 5
+    path.write_bytes(b"".join(chunks))
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        assert reader.num_record_batches == 4
+        assert pl.from_arrow(reader.read_all()).equals(df)
+
+
+def test_engines_convert_through_arrow():
+    """
+    Polars stage outputs reach the equivalence check without
+    copying numeric buffers.
+    """
+    df = sample()
+    res = en.ENGINES["polars"].to_pandas(df)
+    assert _address(res["Quantity"].array._pa_array) == _address(df["Quantity"].to_arrow())
+    prints = {"arrow": en.fingerprint(res), "numpy": en.fingerprint(df.to_pandas())}
+    assert en.compare(prints, reference="numpy")["arrow"]["equivalent"]
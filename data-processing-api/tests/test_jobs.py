@@ -0,0 +1,115 @@
+"""
+Testing of the background job manager
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import json
+import time
+import pytest
+from processor import dtypes as dt
+from processor import stats as st
+from processor.aggregate import aggregate_pandas
+from processor.append import Appender
+from processor.chunked import NaCarry
+from processor.jobs import JobManager
+from processor.load_data import read_all_sheets
+
+
+def wait(manager: JobManager, ident: str, timeout: float = 120) -> dict:
+    """
+    Poll a job until it leaves the queue.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.status(ident)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.2)
+    raise TimeoutError(ident)
+
+
+def test_processing_job(retail_xlsx, cache_dir, monkeypatch):
+    """
+    Identical submissions share one run; the result is cached.
+    """
+    monkeypatch.setenv("PROCESSOR_CACHE_DIR", str(cache_dir))
+    manager = JobManager(max_workers=1, path=retail_xlsx)
+    try:
+        first = manager.submit("processing", {"mode": "eager"}, version="v1")
+        second = manager.submit("processing", {"mode": "eager"}, version="v1")
+        assert first["id"] == second["id"]
+        assert wait(manager, first["id"])["status"] == "done"
+        result = manager.result(first["id"])
+        assert set(result) == {"pandas", "polars"}
+        other = manager.submit("processing", {"mode": "eager"}, version="v2")
+        assert other["id"] != first["id"]
+    finally:
+        manager.shutdown()
+
+
+def test_failed_job_reported(cache_dir, monkeypatch):
+    """
+    A job that raises fails the job instead of the API.
+    """
+    monkeypatch.setenv("PROCESSOR_CACHE_DIR", str(cache_dir))
+    manager = JobManager(max_workers=1, path=str(cache_dir / "missing.xlsx"))
+    try:
+        job = manager.submit("processing")
+        assert "FileNotFoundError" in wait(manager, job["id"])["error"]
+    finally:
+        manager.shutdown()
+
+
+@pytest.mark.parametrize("kind, params", [
+    ("processing", {"path": "/etc/passwd"}),
+    ("benchmark", {"output_dir": "/tmp"}),
+    ("processing", {"unknown": 1}),
+    ("processing", {"mode": "fast"}),
+    ("benchmark", {"iterations": "5"}),
+    ("benchmark", {"iterations": 0}),
+    ("benchmark", {"engines": "pandas"}),
+    ("benchmark", {"stages": ["load", "nope"]}),
+])
+def test_params_are_validated(kind, params):
+    """
+    Server-side, unknown and malformed parameters are rejected
+    before anything is queued.
+    """
+    manager = JobManager(max_workers=1)
+    with pytest.raises(ValueError):
+        manager.submit(kind, params)
+    assert manager._executor is None
+
+
+def test_unknown_kind():
+    """
+    Only registered job kinds are accepted.
+    """
+    with pytest.raises(ValueError):
+        JobManager().submit("mining")
+
+
+def test_processing_job_uses_server_config(retail_xlsx, cache_dir, monkeypatch):
+    """
+    The server's configuration reaches the worker and keys the job:
+    the result matches the endpoint's cleaning with the same flags.
+    """
+    monkeypatch.setenv("PROCESSOR_CACHE_DIR", str(cache_dir))
+    config = {"typed": True, "optimize": True, "epsilon": 0.01}
+    manager = JobManager(max_workers=1, path=retail_xlsx)
+    try:
+        plain = manager.submit("processing", {"mode": "eager"}, version="v1")
+        job = manager.submit("processing", {"mode": "eager"}, version="v1", config=config)
+        assert job["id"] != plain["id"]
+        assert job["params"] == {"mode": "eager"}
+        assert wait(manager, job["id"])["status"] == "done"
+        raw = dt.optimize(read_all_sheets("pandas", retail_xlsx)[0])
+        sketches = st.sketch_columns(NaCarry("pandas")(raw), 0.01)
+        cleaned = Appender(typed=True).clean_frame("pandas", raw, "cap", sketches)
+        expected = json.loads(aggregate_pandas(cleaned).to_json())
+        assert manager.result(job["id"])["pandas"] == expected
+    finally:
+        manager.shutdown()
@@ -0,0 +1,42 @@
+"""
+Testing of the lazy polars pipeline
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+from processor import lazy
+from processor.load_data import read_all_sheets
+from processor.clean import clean_pipeline
+from processor.aggregate import aggregate_polars
+
+
+def test_lazy_matches_eager(retail_xlsx):
+    """
+    The lazy plan gives the same aggregate as the eager steps.
+    """
+    eager = aggregate_polars(clean_pipeline(read_all_sheets("polars", retail_xlsx)[0], "drop"))
+    result = lazy.run_pipeline(retail_xlsx, method="drop")
+    assert result.sort("NameOfDay").equals(eager.sort("NameOfDay"))
+
+
+def test_explain_returns_plan(retail_xlsx):
+    """
+    The plan scans the Parquet cache and ends in the aggregate.
+    """
+    plan = lazy.explain(retail_xlsx)
+    assert "AGGREGATE" in plan
+    assert "Parquet SCAN" in plan
+
+
+def test_typed_lazy_matches_eager(retail_xlsx):
+    """
+    With the typed transform, the lazy plan derives the same
+    NameOfDay dtype and aggregate as the eager steps.
+    """
+    raw = read_all_sheets("polars", retail_xlsx)[0]
+    eager = aggregate_polars(clean_pipeline(raw, "drop", typed=True))
+    result = lazy.run_pipeline(retail_xlsx, method="drop", typed=True)
+    assert result.schema == eager.schema
+    assert result.equals(eager)
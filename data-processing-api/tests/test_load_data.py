@@ -0,0 +1,84 @@
+"""
+Testing of the multi-sheet loader
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import pandas as pd
+import polars as pl
+import pytest
+from processor import load_data as ld
+
+
+def test_read_sheet_reads_each_sheet(retail_xlsx):
+    """
+    Both engines address sheets by the same zero-based position.
+    """
+    first = ld.read_sheet("pandas", retail_xlsx, 0)
+    second = ld.read_sheet("polars", retail_xlsx, 1)
+    assert first["InvoiceDate"].min() < pd.Timestamp("2010-12-01")
+    assert second["InvoiceDate"].min() >= pd.Timestamp("2010-12-01")
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_read_all_sheets_parallel(retail_xlsx, engine):
+    """
+    Sheets parsed in worker processes are unioned in order.
+    """
+    df, report = ld.read_all_sheets(engine, retail_xlsx, workers=2)
+    assert len(df) == 600
+    assert [s["name"] for s in report["sheets"]] == ld.sheet_names(retail_xlsx)
+    assert all(s["parsed"] and s["rows"] == 300 for s in report["sheets"])
+    assert report["workers"] == 2
+    again, cached = ld.read_all_sheets(engine, retail_xlsx)
+    assert cached["combined_cached"]
+    assert len(again) == 600
+    assert cached["sheets"] == report["sheets"]
+
+
+def test_cached_union_skips_the_workbook(retail_xlsx, monkeypatch):
+    """
+    Once the combined frame is cached, the workbook is not opened
+    to list its sheets.
+    """
+    ld.read_all_sheets("polars", retail_xlsx, workers=1)
+
+    def fail(path):
+        raise AssertionError("workbook opened")
+
+    monkeypatch.setattr(ld, "sheet_names", fail)
+    df, report = ld.read_all_sheets("polars", retail_xlsx)
+    assert report["combined_cached"] and len(df) == 600
+
+
+def test_engines_agree_on_union(retail_xlsx):
+    """
+    pandas and polars unions have the same rows and totals.
+    """
+    pd_df, _ = ld.read_all_sheets("pandas", retail_xlsx, workers=1)
+    pl_df, _ = ld.read_all_sheets("polars", retail_xlsx, workers=1)
+    assert len(pd_df) == pl_df.height
+    assert pd_df["Quantity"].sum() == pl_df["Quantity"].sum()
+    assert pd_df["Invoice"].tolist() == pl_df["Invoice"].to_list()
+
+
+def test_union_polars_harmonizes_schema():
+    """
+    Numeric columns widen; conflicting types become strings.
+    """
+    first = pl.DataFrame({"Invoice": [1, 2], "Price": [1, 2]})
+    second = pl.DataFrame({"Invoice": ["C3"], "Price": [1.5]})
+    res = ld.union_polars([first, second])
+    assert res.schema["Invoice"] == pl.String
+    assert res.schema["Price"] == pl.Float64
+    assert res["Invoice"].to_list() == ["1", "2", "C3"]
+
+
+def test_unknown_engine(retail_xlsx):
+    """
+    Unsupported engines are rejected.
+    """
+    with pytest.raises(ValueError):
+        ld.read_all_sheets("spark", retail_xlsx)
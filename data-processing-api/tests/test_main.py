@@ -0,0 +1,297 @@
+"""
+Testing of the API endpoints against a small workbook
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import io
+import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+import main
+from processor import append as ap
+from processor import load_data as ld
+from processor import report as rp
+from processor import sharded
+from processor import stats as st
+from processor.jobs import JobManager
+from processor.registry import DatasetRegistry
+from processor.store import CleanedStore
+from tests.conftest import make_retail
+
+
+# Both optional profiles on, as a deployment would run them.
+FLAGS = {"OPTIMIZE_DTYPES": True, "TYPED_TRANSFORM": True}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def worker_pools():
+    """
+    Stop the sharded and report workers once the module is done.
+    """
+    yield
+    sharded.shutdown()
+    rp.shutdown()
+
+
+@pytest.fixture
+def client(retail_xlsx, monkeypatch, request):
+    """
+    Client of the app serving retail_xlsx, with the flags of the
+    test's parameter (e.g. {"OPTIMIZE_DTYPES": True}).
+    """
+    for name, value in getattr(request, "param", {}).items():
+        monkeypatch.setattr(main, name, value)
+    monkeypatch.setattr(ld, "DATA_FILE", retail_xlsx)
+    registry = DatasetRegistry(retail_xlsx, main.load_datasets)
+    registry.on_reload(main.forget_replaced)
+    monkeypatch.setattr(main, "DATASETS", registry)
+    monkeypatch.setattr(main, "STORE", CleanedStore())
+    monkeypatch.setattr(main, "APPENDER", ap.Appender(typed=main.TYPED_TRANSFORM))
+    yield TestClient(main.app)
+    registry.shutdown()
+
+
+def batch_csv(rows: int = 40, seed: int = 9) -> bytes:
+    """
+    New invoice rows as an uploaded CSV batch.
+    """
+    return make_retail(rows, seed, "2011-12-01").to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize("client", [{}, {"OPTIMIZE_DTYPES": True}, FLAGS],
+                         indirect=True)
+def test_append_twice(client):
+    """
+    Batches are appended one after another, with the optimized
+    dtype profile and the typed transform too, and the appended
+    rows are processed and queried.
+    """
+    total = main.data_loading().frames["pandas"].shape[0]
+    for seed in (9, 10):
+        res = client.post("/append?format=csv", content=batch_csv(seed=seed))
+        assert res.status_code == 200, res.text
+        total += 40
+        assert res.json()["total_rows"] == {"pandas": total, "polars": total}
+    assert main.DATASETS.status()["appended_rows"] == 80
+    eager = client.get("/Data Processing").json()
+    assert eager["success"], eager
+    assert client.get("/Data Processing?mode=sharded").json()["data"] == eager["data"]
+    res = client.get("/query?start=2011-12-01&columns=InvoiceDateTime&limit=1000")
+    assert res.status_code == 200 and res.json()["rows"] > 0
+
+
+def test_failed_append_changes_nothing(client, monkeypatch):
+    """
+    An append that is not swapped in leaves the store, the cube and
+    the cleaning state as they were.
+    """
+    data = main.data_loading()
+    main.cleaned_data("pandas", "cap", data)
+    monkeypatch.setattr(main.DATASETS, "swap", lambda old, new, publish=None: False)
+    res = client.post("/append?format=csv", content=batch_csv())
+    assert res.status_code == 409
+    assert main.APPENDER.frozen("pandas", "cap") is None
+    assert {key[2] for key in main.STORE._frames} == {data.version}
+    assert main.data_loading() is data
+    assert main.data_cube() is data.derived["cube"]
+
+
+@pytest.mark.parametrize("query", ["mode=bogus", "format=xml"])
+def test_processing_rejects_unknown_options(client, query):
+    """
+    Unknown modes and formats are rejected before any work.
+    """
+    res = client.get(f"/Data Processing?{query}")
+    assert res.status_code == 400
+    assert not main.DATASETS.status()["ready"]
+
+
+def test_processing_rejects_unknown_report_format(client):
+    """
+    An unknown report format is a 400, not a failed run.
+    """
+    res = client.get("/Data Processing?report=true&report_format=svg")
+    assert res.status_code == 400
+    assert not main.DATASETS.status()["ready"]
+
+
+def test_cube_built_with_load_and_replaced_by_append(client):
+    """
+    The cube comes with the loaded data; an append publishes a new
+    cube with the new rows and leaves the old one unchanged.
+    """
+    data = main.data_loading()
+    cube = data.derived["cube"]
+    assert cube.version == data.version
+    before = client.get("/cube").json()["data"][0]["count"]
+    res = client.post("/append?format=csv", content=batch_csv())
+    assert res.status_code == 200 and "cube" in res.json()["updated"]
+    after = client.get("/cube").json()["data"][0]["count"]
+    assert main.data_cube() is not cube
+    assert cube.query()[0]["count"][0] == before < after
+
+
+def test_sketches_kept_and_extended(client, monkeypatch):
+    """
+    With QUANTILE_EPSILON the loaded data keeps a sketch per numeric
+    column, appends extend it, and eager limits come from it.
+    """
+    monkeypatch.setattr(st, "QUANTILE_EPSILON", 0.01)
+    data = main.data_loading()
+    sketches = data.derived["sketches"]["pandas"]
+    assert {"Quantity", "Price", "Customer ID"} <= set(sketches)
+    assert client.get("/Data Processing").status_code == 200
+    assert main.APPENDER.frozen("pandas", "cap") is None
+    res = client.post("/append?format=csv", content=batch_csv())
+    assert res.status_code == 200
+    extended = main.data_loading().derived["sketches"]["pandas"]
+    assert extended["Price"].count > sketches["Price"].count
+    assert main.APPENDER.frozen("pandas", "cap") == ap.pipeline_stats(
+        data.frames["pandas"], "cap", sketches)
+
+
+def test_memory_report_uses_loaded_frames(client, monkeypatch):
+    """
+    The report reads the loaded and stored frames; it neither
+    reloads the workbook nor cleans the data itself.
+    """
+    main.data_loading()
+
+    def no_work(*args, **kwargs):
+        raise AssertionError("memory report must not reload or clean")
+
+    monkeypatch.setattr(ld, "read_all_sheets", no_work)
+    monkeypatch.setattr(main.cl, "clean_pipeline", no_work)
+    res = client.get("/memory-report?engine=polars")
+    assert res.status_code == 200
+    assert res.json()["total_bytes_before"] > 0
+    assert client.get("/memory-report?stage=cleaned&method=mean").status_code == 404
+    assert client.get("/memory-report?stage=cleaned&method=fast").status_code == 400
+    res = client.get("/memory-report?engine=polars&stage=cleaned&method=drop")
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize("query", ["iterations=0", "iterations=1000", "warmup=-1",
+                                   "cold=500", "engines=pandas,spark"])
+def test_time_comparison_bounded(client, query, monkeypatch):
+    """
+    Benchmark run counts have the limits of benchmark jobs.
+    """
+    monkeypatch.setattr(main.bm, "run_benchmark", lambda *a, **kw: pytest.fail("ran"))
+    assert client.get(f"/Time Comparison?{query}").status_code == 400
+
+
+def test_reload_forgets_replaced_dataset(client):
+    """
+    A reload with new data drops the old cleaned frames and the
+    appended batches' cleaning state; the same version keeps them.
+    """
+    data = main.data_loading()
+    main.cleaned_data("pandas", "cap", data)
+    assert client.post("/append?format=csv", content=batch_csv()).status_code == 200
+    appended = main.data_loading()
+    main.forget_replaced(appended, appended)
+    assert ("pandas", "cap", appended.version) in main.STORE
+    assert main.APPENDER.frozen("pandas", "cap") is None
+    main.forget_replaced(appended, data)
+    assert ("pandas", "cap", appended.version) not in main.STORE
+
+
+def test_health_and_readiness(client):
+    """
+    Liveness answers at once; readiness waits for the data, after
+    which the load and metrics endpoints report on it.
+    """
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/ready").status_code == 503
+    main.data_loading()
+    assert client.get("/ready").status_code == 200
+    assert len(client.get("/load-report").json()["sheets"]) == 2
+    res = client.get("/metrics")
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/plain")
+    assert client.get("/lazy-plan").json()["plan"]
+
+
+@pytest.mark.parametrize("client", [{}, FLAGS], indirect=True)
+def test_processing_modes_agree(client):
+    """
+    Every mode returns the eager aggregates, with the optimized
+    dtypes and the typed transform too; Arrow is served as Arrow.
+    """
+    eager = client.get("/Data Processing").json()
+    assert eager["success"], eager
+    for mode in ("lazy", "chunked", "sharded"):
+        res = client.get(f"/Data Processing?mode={mode}").json()
+        assert res["data"] == eager["data"], mode
+    res = client.get("/Data Processing?format=arrow")
+    assert res.headers["content-type"] == main.rsp.MEDIA_TYPES["arrow"]
+    assert pa.ipc.open_file(io.BytesIO(res.content)).read_all().num_rows > 0
+
+
+@pytest.mark.parametrize("client", [{}, FLAGS], indirect=True)
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_query_filters(client, engine):
+    """
+    /query filters on Country, categorical once optimized, in both
+    engines, and rejects bad input with 400.
+    """
+    res = client.get(f"/query?engine={engine}&country=France&columns=Country&limit=1000")
+    assert res.status_code == 200, res.text
+    rows = res.json()["data"]
+    assert rows and all(row["Country"] == "France" for row in rows)
+    assert client.get(f"/query?engine={engine}&limit=0").status_code == 400
+    assert client.get("/query?engine=spark").status_code == 400
+
+
+@pytest.mark.parametrize("client", [FLAGS], indirect=True)
+def test_downloads(client):
+    """
+    Exports hold every cleaned row, honour If-None-Match and Range,
+    and reject unknown engines.
+    """
+    cleaned = main.cleaned_data("pandas", "cap")
+    res = client.get("/download-parquet")
+    assert res.status_code == 200
+    assert pq.read_table(io.BytesIO(res.content)).num_rows == len(cleaned)
+    etag = res.headers["etag"]
+    assert client.get("/download-parquet",
+                      headers={"If-None-Match": etag}).status_code == 304
+    res = client.get("/download-parquet", headers={"Range": "bytes=0-3"})
+    assert res.status_code == 206 and res.content == b"PAR1"
+    assert client.get("/download-parquet/metadata").json()["etag"] == etag
+    res = client.get("/download-arrow?engine=pandas")
+    assert pa.ipc.open_file(io.BytesIO(res.content)).read_all().num_rows == len(cleaned)
+    lines = client.get("/download-json").text.splitlines()
+    assert len(lines) == main.cleaned_data("polars", "drop").height
+    assert client.get("/download-arrow?engine=spark").status_code == 400
+
+
+@pytest.mark.parametrize("client", [FLAGS], indirect=True)
+def test_jobs(client, retail_xlsx, monkeypatch):
+    """
+    A processing job gives the endpoint's result under the server's
+    flags; bad parameters are a 400 and appended data a 409.
+    """
+    monkeypatch.setattr(main, "JOBS", JobManager(max_workers=1, path=retail_xlsx))
+    try:
+        bad = {"kind": "processing", "params": {"mode": "fast"}}
+        assert client.post("/jobs", json=bad).status_code == 400
+        assert client.get("/jobs/unknown").status_code == 404
+        res = client.post("/jobs", json={"kind": "processing"})
+        assert res.status_code == 202
+        url = res.json()["status_url"]
+        deadline = time.time() + 120
+        while client.get(url).json()["status"] not in ("done", "failed"):
+            assert time.time() < deadline
+            time.sleep(0.2)
+        result = client.get(res.json()["result_url"]).json()["data"]
+        assert result == client.get("/Data Processing").json()["data"]
+        assert client.post("/append?format=csv", content=batch_csv()).status_code == 200
+        assert client.post("/jobs", json={"kind": "processing"}).status_code == 409
+    finally:
+        main.JOBS.shutdown()
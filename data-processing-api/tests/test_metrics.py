@@ -0,0 +1,116 @@
+"""
+Testing of the pipeline stage metrics
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import time
+import polars as pl
+import pytest
+from processor import metrics as mt
+from processor import clean as cl
+from processor import aggregate as ag
+from tests.conftest import make_retail
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    mt.reset()
+    mt.enable(True)
+    yield
+    mt.enable(True)
+    mt.reset()
+
+
+def test_stages_are_labelled_by_engine():
+    """
+    Stage calls are recorded per engine with their input and
+    output rows.
+    """
+    raw = make_retail(300, 2, "2010-01-01")
+    cleaned = cl.clean_pipeline(raw, "drop")
+    ag.aggregate_pandas(cleaned)
+    df = pl.from_pandas(raw.astype({"Invoice": str, "StockCode": str}))
+    cl.pl_na_handler(df)
+    stats = mt.snapshot()
+    assert stats["na", "pandas"]["calls"] == 1
+    assert stats["na", "pandas"]["rows_in"] == len(raw)
+    assert stats["na", "polars"]["rows_in"] == df.height
+    assert stats["outliers", "pandas"]["rows_out"] <= stats["outliers", "pandas"]["rows_in"]
+    assert stats["aggregate", "pandas"]["rows_in"] == len(cleaned)
+    assert stats["aggregate", "pandas"]["rows_out"] == 7
+
+
+def test_render_is_a_prometheus_histogram():
+    """
+    Buckets are cumulative and end with +Inf equal to the count.
+    """
+    mt.observe("load", "polars", 0.003, rows_out=10)
+    mt.observe("load", "polars", 2.0, rows_out=10)
+    text = mt.render()
+    assert "# TYPE processor_stage_seconds histogram" in text
+    assert 'processor_stage_seconds_bucket{stage="load",engine="polars",le="0.005"} 1' in text
+    assert 'processor_stage_seconds_bucket{stage="load",engine="polars",le="+Inf"} 2' in text
+    assert 'processor_stage_seconds_count{stage="load",engine="polars"} 2' in text
+    assert 'processor_stage_rows_out_total{stage="load",engine="polars"} 20' in text
+    assert "process_peak_rss_bytes " in text
+
+
+def test_errors_are_counted():
+    """
+    A raising stage is recorded as an error and still raises.
+    """
+
+    @mt.instrument("transform", engine="pandas")
+    def broken(df):
+        raise KeyError("InvoiceDate")
+
+    with pytest.raises(KeyError):
+        broken(None)
+    assert mt.snapshot()["transform", "pandas"]["errors"] == 1
+
+
+def test_disabled_overhead_is_sub_microsecond():
+    """
+    With recording off, a wrapped call costs well under a
+    microsecond more than the bare call and records nothing.
+    """
+    mt.enable(False)
+
+    def bare(x):
+        return x
+
+    wrapped = mt.instrument("aggregate", engine="pandas")(bare)
+    calls = 200_000
+
+    def best(func):
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for i in range(calls):
+                func(i)
+            times.append(time.perf_counter() - start)
+        return min(times) / calls
+
+    assert best(wrapped) - best(bare) < 1e-6
+    assert mt.snapshot() == {}
+
+
+def test_rss_growth_of_kept_output():
+    """
+    A stage whose output stays alive records the memory it added,
+    even below the process's earlier high-water mark.
+    """
+    if mt.current_rss() is None:
+        pytest.skip("RSS not readable on this platform")
+
+    @mt.instrument("load", engine="polars")
+    def load():
+        return pl.DataFrame({"a": range(4_000_000)})
+
+    kept = load()
+    assert mt.snapshot()["load", "polars"]["max_rss_growth"] >= 16 << 20
+    assert "processor_stage_max_rss_growth_bytes{" in mt.render()
+    del kept
@@ -0,0 +1,128 @@
+"""
+Testing of the filtered, paginated queries
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+from datetime import datetime
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+from processor import query as qy
+from processor import dtypes as dt
+from processor.clean import clean_pipeline
+from tests.conftest import make_retail
+
+
+@pytest.fixture
+def layout(tmp_path):
+    raw = make_retail(3000, 7, "2010-01-01").astype({"Invoice": str, "StockCode": str})
+    df = clean_pipeline(pl.from_pandas(raw), "drop")
+    path = str(tmp_path / "layout.parquet")
+    qy.write_layout(df, path, row_group_rows=200)
+    return path, df.sort("InvoiceDateTime", maintain_order=True)
+
+
+def test_layout_is_sorted_with_statistics(layout):
+    """
+    Row groups follow InvoiceDateTime order and carry min/max.
+    """
+    path, df = layout
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_row_groups == -(-df.height // 200)
+    index = pq.ParquetFile(path).schema_arrow.get_field_index(qy.SORT_COLUMN)
+    bounds = [metadata.row_group(i).column(index).statistics
+              for i in range(metadata.num_row_groups)]
+    assert all(a.max <= b.min for a, b in zip(bounds, bounds[1:]))
+
+
+def test_date_range_reads_few_row_groups(layout):
+    """
+    A one-day query reads only the row groups around that day and
+    returns exactly the rows of that day.
+    """
+    path, df = layout
+    day = df["InvoiceDateTime"][df.height // 2].date().isoformat()
+    res = qy.run_query(path, start=day, end=day, limit=qy.MAX_LIMIT)
+    expected = df.filter(pl.col("InvoiceDate") == datetime.fromisoformat(day).date())
+    assert res["rows"] == expected.height
+    assert [row["Invoice"] for row in res["data"]] == expected["Invoice"].to_list()
+    assert res["row_groups_scanned"] <= 2 < res["row_groups_total"]
+
+
+def test_pages_cover_all_matches(layout):
+    """
+    Consecutive pages give the filtered rows in order, once each.
+    """
+    path, df = layout
+    country = df["Country"][0]
+    expected = df.filter(pl.col("Country") == country)["Invoice"].to_list()
+    rows, offset = [], 0
+    while offset is not None:
+        res = qy.run_query(path, filters={"Country": [country]},
+                           columns=["Invoice", "Country"], limit=250, offset=offset)
+        assert all(set(row) == {"Invoice", "Country"} for row in res["data"])
+        rows += [row["Invoice"] for row in res["data"]]
+        offset = res["next_offset"]
+    assert rows == expected
+
+
+def test_first_page_stops_early(layout):
+    """
+    An unfiltered first page reads just enough row groups.
+    """
+    path, _ = layout
+    res = qy.run_query(path, limit=10)
+    assert res["rows"] == 10 and res["next_offset"] == 10
+    assert res["row_groups_scanned"] == 1
+
+
+def test_customer_filter_and_errors(layout):
+    """
+    Customer IDs are compared as numbers; bad input is rejected.
+    """
+    path, df = layout
+    customer = df["Customer ID"][5]
+    res = qy.run_query(path, filters={"Customer ID": [str(int(customer))]},
+                       limit=qy.MAX_LIMIT)
+    assert res["rows"] == df.filter(pl.col("Customer ID") == customer).height
+    with pytest.raises(ValueError):
+        qy.run_query(path, columns=["Nope"])
+    with pytest.raises(ValueError):
+        qy.run_query(path, start="yesterday")
+    with pytest.raises(ValueError):
+        qy.run_query(path, limit=0)
+    with pytest.raises(ValueError):
+        qy.run_query(path, start="2010-01-02T00:00:00+01:00")
+
+
+def test_date_only_end_includes_the_day():
+    """
+    Any ISO date form without a time, compact ones included, ends
+    after that day; a datetime end is exclusive as given.
+    """
+    assert qy.parse_bound("2010-12-01", end=True) == datetime(2010, 12, 2)
+    assert qy.parse_bound("20101201", end=True) == datetime(2010, 12, 2)
+    assert qy.parse_bound("2010-12-01T10:00", end=True) == datetime(2010, 12, 1, 10)
+    assert qy.parse_bound("20101201", end=False) == datetime(2010, 12, 1)
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_filters_on_categorical_columns(tmp_path, engine):
+    """
+    Optimized frames store categoricals dictionary-encoded; filters
+    on them match the dictionary values.
+    """
+    raw = make_retail(2000, 8, "2010-01-01").astype({"Invoice": str, "StockCode": str})
+    frame = raw if engine == "pandas" else pl.from_pandas(raw)
+    df = clean_pipeline(dt.optimize(frame), "drop")
+    path = str(tmp_path / "layout.parquet")
+    qy.write_layout(df, path, row_group_rows=200)
+    expected = clean_pipeline(frame.copy() if engine == "pandas" else frame, "drop")
+    expected = pl.from_pandas(expected) if engine == "pandas" else expected
+    for col, value in (("Country", "France"), ("StockCode", "POST")):
+        res = qy.run_query(path, filters={col: [value]}, limit=qy.MAX_LIMIT)
+        assert res["rows"] == expected.filter(pl.col(col) == value).height > 0
+        assert {row[col] for row in res["data"]} == {value}
@@ -0,0 +1,111 @@
+"""
+Testing of the dataset registry
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from processor.registry import DatasetRegistry
+
+
+class SlowLoader:
+    """
+    Loader that counts its calls and returns the file content.
+    """
+
+    def __init__(self, delay: float = 0.2, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise OSError("unreadable")
+        with open(path, encoding="utf-8") as file:
+            content = file.read()
+        return {"text": content}, {"text": {"rows": 1}}, content
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("v1", encoding="utf-8")
+    return path
+
+
+def test_concurrent_first_calls_share_one_load(source):
+    """
+    Every caller of a cold registry gets the result of one load.
+    """
+    loader = SlowLoader()
+    registry = DatasetRegistry(str(source), loader)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: registry.get(), range(8)))
+    assert loader.calls == 1
+    assert all(res is results[0] for res in results)
+    assert results[0].version == "v1"
+    assert registry.preload().result() is results[0]
+    assert loader.calls == 1
+    registry.shutdown()
+
+
+def test_changed_file_is_swapped_in(source):
+    """
+    After the file changes, the old dataset is served until the
+    new one is loaded, and reload callbacks run once.
+    """
+    loader = SlowLoader(delay=0.1)
+    registry = DatasetRegistry(str(source), loader)
+    swaps = []
+    registry.on_reload(lambda old, new: swaps.append((old.version, new.version)))
+    old = registry.get()
+    source.write_text("v2 longer", encoding="utf-8")
+    assert registry.get() is old
+    assert registry.status()["loading"]
+    registry.preload().result()
+    assert registry.get().version == "v2 longer"
+    assert swaps == [("v1", "v2 longer")]
+    assert loader.calls == 2
+    registry.shutdown()
+
+
+def test_swap_only_replaces_the_expected_dataset(source):
+    """
+    A derived dataset is not swapped in over a newer load.
+    """
+    registry = DatasetRegistry(str(source), SlowLoader(delay=0))
+    old = registry.get()
+    appended = dataclasses.replace(old, version="v1+rows", appended_rows=3)
+    assert registry.swap(old, appended)
+    assert registry.get() is appended
+    assert registry.status()["appended_rows"] == 3
+    assert not registry.swap(old, dataclasses.replace(old, version="stale"))
+    assert registry.get() is appended
+    registry.shutdown()
+
+
+def test_failed_load_is_reported_and_retried(source):
+    """
+    A failing load raises for its callers, shows in the status and
+    is attempted again on the next call.
+    """
+    loader = SlowLoader(delay=0, fail=True)
+    registry = DatasetRegistry(str(source), loader)
+    with pytest.raises(OSError):
+        registry.get()
+    status = registry.status()
+    assert not status["ready"] and "unreadable" in status["error"]
+    loader.fail = False
+    assert registry.get().version == "v1"
+    assert registry.status()["ready"] and registry.status()["error"] is None
+    registry.shutdown()
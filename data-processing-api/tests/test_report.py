@@ -0,0 +1,56 @@
+"""
+Testing of background report rendering
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import polars as pl
+import pytest
+from processor import report as rp
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    yield
+    rp.shutdown()
+
+
+def test_reports_rendered_in_background(tmp_path, monkeypatch):
+    """
+    Submitted reports end up as files listed under their version.
+    """
+    monkeypatch.setattr(rp, "REPORT_DIR", str(tmp_path))
+    df = pl.DataFrame({"Quantity": [1, 2, 300], "Price": [1.0, 2.5, 3.0]})
+    paths = rp.submit_report(df, "abc123", "polars-drop").result(timeout=60)
+    assert len(paths) == 2
+    listed = rp.list_reports("abc123")
+    assert listed["reports"]["abc123"] == [
+        "polars-drop-Price.html",
+        "polars-drop-Quantity.html",
+    ]
+    assert rp.find_report("abc123", "polars-drop-Price.html") == paths[1]
+
+
+def test_find_report_rejects_paths(tmp_path, monkeypatch):
+    """
+    Only plain file names inside the report folder are served.
+    """
+    monkeypatch.setattr(rp, "REPORT_DIR", str(tmp_path))
+    assert rp.find_report("..", "main.py") is None
+    assert rp.find_report("abc123", "../x.html") is None
+
+
+def test_find_report_stays_inside_report_dir(tmp_path, monkeypatch):
+    """
+    A '..' or '.' folder never reaches files outside REPORT_DIR, even
+    when they exist.
+    """
+    monkeypatch.setattr(rp, "REPORT_DIR", str(tmp_path / "reports"))
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "secret.txt").write_text("secret", encoding="utf-8")
+    (tmp_path / "reports" / "top.html").write_text("top", encoding="utf-8")
+    assert rp.find_report("..", "secret.txt") is None
+    assert rp.find_report(".", "top.html") is None
+    assert rp.find_report("abc123", "..") is None
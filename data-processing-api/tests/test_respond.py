@@ -0,0 +1,85 @@
+"""
+Testing of the processing response bodies
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import gzip
+import io
+import json
+import polars as pl
+import pyarrow as pa
+from processor import respond as rsp
+from processor import aggregate as ag
+from processor.clean import clean_pipeline
+from tests.conftest import make_retail
+
+
+def _aggregates():
+    raw = make_retail(400, 3, "2010-01-01")
+    pandas_agg = ag.aggregate_pandas(clean_pipeline(raw, "cap"))
+    polars_df = pl.from_pandas(raw.astype({"Invoice": str, "StockCode": str}))
+    polars_agg = ag.aggregate_polars(clean_pipeline(polars_df, "drop"))
+    return pandas_agg, polars_agg
+
+
+def test_envelope_matches_double_encoding():
+    """
+    Spliced fragments give the same document as parsing and
+    encoding the aggregates again.
+    """
+    pandas_agg, polars_agg = _aggregates()
+    body = rsp.envelope("Data Processing Results", {
+        "pandas": rsp.frame_json(pandas_agg),
+        "polars": rsp.frame_json(polars_agg),
+    })
+    assert json.loads(body) == {
+        "message": "Data Processing Results",
+        "success": True,
+        "data": {
+            "pandas": json.loads(pandas_agg.to_json()),
+            "polars": json.loads(polars_agg.write_json()),
+        },
+    }
+
+
+def test_negotiate():
+    """
+    The accepted encoding with the highest weight is picked; small
+    bodies and refused encodings stay uncompressed.
+    """
+    size = rsp.MIN_COMPRESS_BYTES
+    assert rsp.negotiate("gzip, deflate", size) == "gzip"
+    assert rsp.negotiate("gzip", size - 1) is None
+    assert rsp.negotiate("gzip;q=0, deflate", size) is None
+    assert rsp.negotiate(None, size) is None
+    assert rsp.negotiate("*", size) == rsp.encodings()[0]
+    if "br" in rsp.encodings():
+        assert rsp.negotiate("gzip;q=1.0, br;q=0.5", size) == "gzip"
+        assert rsp.negotiate("gzip, br", size) == "br"
+
+
+def test_compress_round_trip():
+    """
+    Compressed bodies decode to the original bytes.
+    """
+    body = b'{"data": "' + b"x" * 1000 + b'"}'
+    assert rsp.compress(body, None) is body
+    assert gzip.decompress(rsp.compress(body, "gzip")) == body
+    if "br" in rsp.encodings():
+        assert rsp.brotli.decompress(rsp.compress(body, "br")) == body
+
+
+def test_arrow_aggregates():
+    """
+    Both aggregates come back as one table with an engine column.
+    """
+    pandas_agg, polars_agg = _aggregates()
+    body = rsp.arrow_aggregates({"pandas": pandas_agg, "polars": polars_agg})
+    table = pa.ipc.open_file(io.BytesIO(body)).read_all()
+    assert table.schema == rsp.AGGREGATE_SCHEMA
+    assert table.num_rows == len(pandas_agg) + polars_agg.height
+    pandas_rows = table.filter(pa.compute.equal(table["engine"], "pandas"))
+    assert sorted(pandas_rows["NameOfDay"].to_pylist()) == sorted(pandas_agg.index)
@@ -0,0 +1,116 @@
+"""
+Testing of the sharded pandas pipeline
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from processor import sharded as sh
+from processor import benchmark as bm
+from processor.clean import clean_pipeline
+from processor.aggregate import aggregate_pandas
+from processor.append import pipeline_stats
+from processor.chunked import NaCarry, clean_batch
+from tests.conftest import make_retail
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pools():
+    yield
+    sh.shutdown()
+
+
+def test_shard_bounds_cover_all_rows():
+    """
+    Shards are contiguous, nearly equal and never empty.
+    """
+    assert sh.shard_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert sh.shard_bounds(2, 4) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("method", ["cap", "drop", "mean"])
+def test_sharded_matches_eager(method):
+    """
+    Sharded execution gives the eager pandas aggregate.
+    """
+    raw = make_retail(900, 4, "2010-01-01")
+    eager = aggregate_pandas(clean_pipeline(raw.copy(), method)).sort_index()
+    res = sh.run_sharded(raw, method, workers=2, shards=5)
+    pd.testing.assert_frame_equal(res.sort_index(), eager, check_dtype=False)
+
+
+def test_typed_sharded_matches_eager():
+    """
+    The typed transform gives the same aggregate when sharded.
+    """
+    raw = make_retail(600, 5, "2010-01-01")
+    eager = aggregate_pandas(clean_pipeline(raw.copy(), "cap", typed=True))
+    res = sh.run_sharded(raw, "cap", workers=2, shards=3, typed=True)
+    pd.testing.assert_frame_equal(
+        res.sort_index(), eager.sort_index(), check_dtype=False,
+        check_index_type=False, check_categorical=False,
+    )
+
+
+def test_sharded_with_frozen_stats():
+    """
+    Given frozen limits, shards are cleaned with them instead of
+    limits over all rows.
+    """
+    raw = make_retail(600, 7, "2010-01-01")
+    stats = pipeline_stats(raw.iloc[:300], "cap")
+    expected = aggregate_pandas(clean_batch(NaCarry("pandas")(raw.copy()), stats, "cap"))
+    res = sh.run_sharded(raw, "cap", workers=2, shards=3, stats=stats)
+    pd.testing.assert_frame_equal(res.sort_index(), expected.sort_index(),
+                                  check_dtype=False)
+
+
+def test_forward_fill_crosses_shards():
+    """
+    A shard starting with missing Customer IDs continues from the
+    last ID of the rows the eager pipeline keeps before it.
+    """
+    raw = make_retail(90, 6, "2010-01-01")
+    raw["Description"] = "RED MUG"
+    raw.loc[28, "Customer ID"] = 11111.0
+    raw.loc[29, ["Customer ID", "Description"]] = [22222.0, None]
+    raw.loc[30:34, "Customer ID"] = np.nan
+    raw.loc[60:89, "Customer ID"] = np.nan
+    with sh.SharedFrame(raw, 3) as frame:
+        _, carries = sh.global_stats(frame, sh.pool(2), "cap")
+        first = sh.read_shard(frame.name, 1)
+    assert carries[0] == {}
+    assert carries[1] == {"Customer ID": 11111.0}
+    expected = raw["Customer ID"][raw["Description"].notna()].ffill()
+    assert carries[2] == {"Customer ID": expected.loc[59]}
+    assert len(first) == 30 and first["Description"].isna().sum() == 0
+
+
+def test_bench_reports_speedup_per_core_count(retail_xlsx):
+    """
+    The report has a speedup and an equivalence check per core count.
+    """
+    pools = dict(sh._POOLS)
+    report = bm.bench_sharded(retail_xlsx, cores=(1, 2), iterations=1, warmup=0)
+    assert set(report["sharded"]) == {1, 2}
+    for res in report["sharded"].values():
+        assert res["equivalent"] and res["speedup"] > 0
+    assert sh._POOLS == pools
+
+
+@pytest.mark.parametrize("args", [
+    {"cores": (0,)},
+    {"cores": (sh.MAX_WORKERS + 1,)},
+    {"cores": (1,), "iterations": 0},
+])
+def test_bench_rejects_bad_counts(retail_xlsx, args):
+    """
+    Core counts outside 1..MAX_WORKERS and empty timings are
+    rejected before any pool starts.
+    """
+    with pytest.raises(ValueError):
+        bm.bench_sharded(retail_xlsx, **args)
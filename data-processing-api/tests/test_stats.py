@@ -0,0 +1,234 @@
+"""
+Testing of the shared column statistics
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import time
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+from processor import stats as st
+from processor.clean import (
+    check_outliers_info_pandas,
+    handle_outlier_pandas,
+    handle_outlier_polars,
+)
+
+
+def sample() -> pd.DataFrame:
+    """
+    Numeric frame with outliers in both columns.
+    """
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(
+        {
+            "Quantity": rng.integers(-5, 30, 1000) * np.where(rng.random(1000) < 0.02, 300, 1),
+            "Price": np.round(rng.gamma(2, 2, 1000), 2),
+        }
+    )
+
+
+def test_engines_agree():
+    """
+    pandas and polars produce the same statistics.
+    """
+    df = sample()
+    pd_stats = st.compute_stats(df)
+    pl_stats = st.compute_stats(pl.from_pandas(df))
+    for col in ["Quantity", "Price"]:
+        assert pd_stats[col].count == pl_stats[col].count
+        np.testing.assert_allclose(
+            [pd_stats[col].mean, pd_stats[col].std, pd_stats[col].q1, pd_stats[col].q3],
+            [pl_stats[col].mean, pl_stats[col].std, pl_stats[col].q1, pl_stats[col].q3],
+        )
+        assert pd_stats[col].q1 == df[col].quantile(0.25)
+
+
+def test_cached_per_frame():
+    """
+    The first lookup summarizes every numeric column once.
+    """
+    df = pl.from_pandas(sample())
+    first = st.column_stats(df, "Quantity")
+    assert st.column_stats(df, "Quantity") is first
+    assert "Price" in st._CACHE[id(df)]
+
+
+def test_in_place_change_invalidates():
+    """
+    Capping a pandas column refreshes only that column's statistics.
+    """
+    df = sample()
+    before = st.column_stats(df, "Quantity")
+    price = st.column_stats(df, "Price")
+    handle_outlier_pandas(df, "Quantity", method="cap")
+    assert st.column_stats(df, "Quantity").max < before.max
+    assert st.column_stats(df, "Price") is price
+
+
+def test_polars_stats_carried_after_cap():
+    """
+    Untouched columns keep their statistics on the capped frame.
+    """
+    df = pl.from_pandas(sample())
+    price = st.column_stats(df, "Price")
+    capped = handle_outlier_polars(df, "Quantity", method="cap")
+    assert st._CACHE[id(capped)]["Price"] is price
+    assert "Quantity" not in st._CACHE[id(capped)]
+
+
+@pytest.mark.parametrize("method", ["drop", "cap", "mean"])
+def test_pandas_results_unchanged(method):
+    """
+    Outlier handling gives the same values as computing limits inline.
+    """
+    df = sample()
+    col = "Quantity"
+    q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+    iqr = q3 - q1
+    expected = df.copy()
+    if method == "drop":
+        expected = expected[~((df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr))]
+    elif method == "cap":
+        mean, std = df[col].mean(), df[col].std()
+        expected[col] = df[col].clip(mean - 3 * std, mean + 3 * std)
+    else:
+        lower_limit = df[col][~(df[col] < q1 - 1.5 * iqr)].max()
+        upper_limit = df[col][~(df[col] > q3 + 1.5 * iqr)].min()
+        expected[col] = np.where(
+            df[col] > upper_limit, df[col].mean(),
+            np.where(df[col] < lower_limit, df[col].mean(), df[col]),
+        )
+    result = handle_outlier_pandas(df.copy(), col, method=method)
+    np.testing.assert_allclose(result[col].to_numpy(float), expected[col].to_numpy(float))
+
+
+def test_info_uses_given_stats():
+    """
+    Passing statistics skips the lookup and sets the fences.
+    """
+    df = sample()
+    stats = st.ColumnStats(count=1000, mean=0, std=1, min=0, q1=0, q3=0, max=0)
+    res = check_outliers_info_pandas(df, "Price", stats=stats)
+    assert res["Total Outliers"] == int((df["Price"] != 0).sum())
+
+
+def test_summary_merge_matches_compute_stats():
+    """
+    Merged batch summaries give the statistics of all rows.
+    """
+    df = sample()
+    summary = st.ColumnSummary.from_values(df["Price"].iloc[:300])
+    for start in range(300, len(df), 250):
+        summary = summary.merge(
+            st.ColumnSummary.from_values(df["Price"].iloc[start:start + 250])
+        )
+    expected = st.compute_stats(df, ["Price"])["Price"]
+    res = summary.to_stats()
+    assert res.count == expected.count
+    for field in ("mean", "std", "min", "q1", "q3", "max"):
+        assert getattr(res, field) == pytest.approx(getattr(expected, field))
+
+
+def _rank_error(sorted_values: np.ndarray, value: float, q: float) -> float:
+    low = np.searchsorted(sorted_values, value, "left") / len(sorted_values)
+    high = np.searchsorted(sorted_values, value, "right") / len(sorted_values)
+    return 0.0 if low <= q <= high else min(abs(low - q), abs(high - q))
+
+
+@pytest.mark.parametrize("epsilon", [0.01, 0.002])
+def test_sketch_quartiles_within_error_bound(epsilon):
+    """
+    Quartiles of a sketch built in batches are within epsilon of the
+    true rank, and it holds far fewer values than it has seen.
+    """
+    values = np.random.default_rng(3).lognormal(1, 1.2, 500_000)
+    sketch = st.QuantileSketch(epsilon)
+    for start in range(0, len(values), 7_000):
+        sketch.update(values[start:start + 7_000])
+    exact = np.sort(values)
+    for q in (0.25, 0.5, 0.75):
+        assert _rank_error(exact, sketch.quantile(q), q) <= epsilon
+    assert sketch.count == len(values)
+    assert sketch.size < len(values) / 20
+
+
+def test_sketch_merge_and_exact_moments():
+    """
+    Merged sketches keep exact count, mean, std, min and max, and
+    a sketch that never compacted gives exact quartiles.
+    """
+    df = sample()
+    sketch = st.QuantileSketch.from_values(df["Price"].iloc[:400], 0.001)
+    sketch = sketch.merge(st.QuantileSketch.from_values(df["Price"].iloc[400:], 0.001))
+    expected = st.compute_stats(df, ["Price"], epsilon=0)["Price"]
+    res = sketch.to_stats()
+    assert res.count == expected.count
+    for field in ("mean", "std", "min", "q1", "q3", "max"):
+        assert getattr(res, field) == pytest.approx(getattr(expected, field))
+
+
+def test_sketch_limits_in_compute_stats():
+    """
+    With an error bound, both engines take the IQR fences from the
+    sketch, close to the exact fences; nulls are ignored.
+    """
+    values = np.random.default_rng(5).gamma(2, 2, 200_000)
+    values[::50] = np.nan
+    df = pd.DataFrame({"Price": values})
+    exact = st.compute_stats(df, ["Price"], epsilon=0)["Price"]
+    present = np.sort(values[~np.isnan(values)])
+    for frame in (df, pl.from_pandas(df)):
+        approx = st.compute_stats(frame, ["Price"], epsilon=0.005)["Price"]
+        assert approx.count == exact.count
+        assert _rank_error(present, approx.q1, 0.25) <= 0.005
+        assert _rank_error(present, approx.q3, 0.75) <= 0.005
+        assert approx.iqr_limits()[1] == pytest.approx(exact.iqr_limits()[1], rel=0.05)
+    with pytest.raises(ValueError):
+        st.QuantileSketch(0)
+
+
+def test_sketch_update_beats_exact_recompute():
+    """
+    Adding a batch to a sketch and reading the fences is much faster
+    than recomputing exact statistics over all rows so far.
+    """
+    rng = np.random.default_rng(11)
+    base = pd.DataFrame({"Price": rng.lognormal(1, 1.2, 1_000_000)})
+    batch = pd.DataFrame({"Price": rng.lognormal(1, 1.2, 10_000)})
+    sketch = st.QuantileSketch.from_values(base["Price"], 0.005)
+    grown = pd.concat([base, batch], ignore_index=True)
+
+    def best(func):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    incremental = best(lambda: sketch.update(batch["Price"]).to_stats().iqr_limits())
+    exact = best(lambda: st.compute_stats(grown, ["Price"], epsilon=0)["Price"].iqr_limits())
+    assert incremental * 5 < exact
+
+
+def test_kept_sketches_extended_with_new_rows():
+    """
+    Extending kept sketches adds only the new rows, leaves the old
+    sketches as they were and stays within the error bound.
+    """
+    rng = np.random.default_rng(13)
+    base = pd.DataFrame({"Price": rng.lognormal(1, 1.2, 200_000), "Label": "x"})
+    batch = pd.DataFrame({"Price": rng.lognormal(1, 1.2, 5_000), "Label": "x"})
+    kept = st.sketch_columns(base, 0.005)
+    assert set(kept) == {"Price"}
+    extended = st.extend_sketches(kept, batch)
+    assert kept["Price"].count == len(base)
+    assert extended["Price"].count == len(base) + len(batch)
+    present = np.sort(np.concatenate([base["Price"], batch["Price"]]))
+    for q in (0.25, 0.75):
+        assert _rank_error(present, extended["Price"].quantile(q), q) <= 0.005
@@ -0,0 +1,100 @@
+"""
+Testing of the cleaned-dataset store
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+import polars as pl
+from processor.store import CleanedStore
+from processor.clean import clean_pipeline
+from tests.conftest import make_retail
+
+
+def test_store_builds_once():
+    """
+    Repeated and concurrent gets run the build a single time.
+    """
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return pl.DataFrame({"a": [1, 2, 3]})
+
+    store = CleanedStore()
+    key = ("polars", "drop", "v1")
+    with ThreadPoolExecutor(8) as pool:
+        frames = list(pool.map(lambda _: store.get(key, build), range(8)))
+    assert len(calls) == 1
+    assert all(df is frames[0] for df in frames)
+
+
+def test_store_spills_on_eviction(tmp_path):
+    """
+    Evicted frames are read back from disk, not rebuilt.
+    """
+    store = CleanedStore(max_bytes=1, spill_dir=str(tmp_path))
+    first = ("polars", "drop", "v1")
+    store.get(first, lambda: pl.DataFrame({"a": [1, 2, 3]}))
+    store.get(("polars", "cap", "v1"), lambda: pl.DataFrame({"a": [4]}))
+    assert first not in store
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def fail():
+        raise AssertionError("rebuilt despite spill")
+
+    assert store.get(first, fail)["a"].to_list() == [1, 2, 3]
+
+
+def test_pandas_frame_survives_spill(tmp_path):
+    """
+    A cleaned pandas frame read back from disk matches the original.
+    """
+    df = clean_pipeline(make_retail(200, 3, "2010-01-01"), method="cap")
+    store = CleanedStore(max_bytes=1, spill_dir=str(tmp_path))
+    key = ("pandas", "cap", "v1")
+    store.get(key, lambda: df)
+    store.get(("pandas", "drop", "v1"), lambda: df.head(1))
+    restored = store.get(key, lambda: None)
+    assert restored["Price"].tolist() == df["Price"].tolist()
+    assert restored["InvoiceDate"].tolist() == df["InvoiceDate"].tolist()
+
+
+def test_superseded_versions_leave_no_spill_files(tmp_path):
+    """
+    Discarded keys and dropped versions lose their spilled files;
+    other versions keep theirs.
+    """
+    store = CleanedStore(max_bytes=1, spill_dir=str(tmp_path))
+    for method in ("cap", "drop", "mean"):
+        store.get(("polars", method, "v1"), lambda: pl.DataFrame({"a": [1, 2, 3]}))
+    store.get(("polars", "cap", "v2"), lambda: pl.DataFrame({"a": [4]}))
+    assert len(list(tmp_path.iterdir())) == 3
+    store.discard(("polars", "cap", "v1"))
+    assert len(list(tmp_path.iterdir())) == 2
+    store.drop_version("v1")
+    assert list(tmp_path.iterdir()) == []
+    assert ("polars", "cap", "v2") in store
+
+
+def test_evicted_frame_served_while_spilling(tmp_path, monkeypatch):
+    """
+    Spilling runs outside the lock; the frame being written is
+    still served from memory.
+    """
+    store = CleanedStore(max_bytes=1, spill_dir=str(tmp_path))
+    first = ("polars", "drop", "v1")
+    store.get(first, lambda: pl.DataFrame({"a": [1, 2, 3]}))
+    seen = []
+
+    def spill(key, df):
+        assert not store._lock.locked()
+        seen.append(store.get(key, lambda: None))
+
+    monkeypatch.setattr(store, "_spill", spill)
+    store.get(("polars", "cap", "v1"), lambda: pl.DataFrame({"a": [4]}))
+    assert seen[0]["a"].to_list() == [1, 2, 3]
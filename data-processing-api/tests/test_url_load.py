@@ -0,0 +1,188 @@
+"""
+Testing of the dataset download against a local HTTP server
+
+Name: Arowosegbe Victor\n
+Email: Iyanuvicky@gmail.com\n
+GitHub: https://github.com/Iyanuvicky22/projects
+"""
+
+import hashlib
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zipfile import ZIP_DEFLATED, ZipFile
+import pytest
+import requests
+from processor import url_load as ul
+
+
+def make_archive(workbook: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("online_retail_II.xlsx", workbook)
+        zip_file.writestr("README.txt", b"not extracted")
+    return buffer.getvalue()
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """
+    Serves one archive with an ETag, Range support and an optional
+    dropped connection.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ArchiveHandler)
+        self.requests = []
+        self.cut_after = None
+        self.publish(make_archive(os.urandom(300_000)), '"v1"')
+
+    def publish(self, payload: bytes, etag: str):
+        self.payload = payload
+        self.etag = etag
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/online+retail+ii.zip"
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """
+    GET handler of ArchiveServer.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        payload = server.payload
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == server.etag:
+            start = int(range_header.split("=")[1].split("-")[0])
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header("Content-Range",
+                             f"bytes {start}-{len(payload) - 1}/{len(payload)}")
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(payload) - start))
+        self.end_headers()
+        body = payload[start:]
+        if server.cut_after is not None:
+            body, server.cut_after = body[:server.cut_after], None
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    srv = ArchiveServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_unchanged_archive_is_not_downloaded(server, tmp_path):
+    """
+    The second call revalidates with the ETag and gets 304.
+    """
+    archive = str(tmp_path / "data.zip")
+    first = ul.download(server.url, archive, chunk_bytes=4096)
+    assert first["status"] == 200 and first["changed"]
+    with open(archive, "rb") as file:
+        assert file.read() == server.payload
+    second = ul.download(server.url, archive)
+    assert second["status"] == 304 and not second["changed"]
+    assert second["sha256"] == first["sha256"]
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+    server.publish(make_archive(b"new workbook"), '"v2"')
+    third = ul.download(server.url, archive)
+    assert third["status"] == 200 and third["changed"]
+
+
+def test_interrupted_download_resumes(server, tmp_path):
+    """
+    A dropped connection leaves a partial file that the next call
+    continues with a Range request.
+    """
+    archive = str(tmp_path / "data.zip")
+    server.cut_after = 100_000
+    with pytest.raises(requests.exceptions.RequestException):
+        ul.download(server.url, archive, chunk_bytes=4096, retries=0)
+    # Only whole chunks reach the partial file.
+    received = os.path.getsize(f"{archive}.part")
+    assert 0 < received <= 100_000
+    res = ul.download(server.url, archive, chunk_bytes=4096, retries=0)
+    assert res["status"] == 206 and res["resumed"]
+    assert res["bytes"] == len(server.payload) - received
+    assert server.requests[-1]["Range"] == f"bytes={received}-"
+    assert res["sha256"] == hashlib.sha256(server.payload).hexdigest()
+    assert not os.path.exists(f"{archive}.part")
+
+
+def test_interruption_retried_within_call(server, tmp_path):
+    """
+    With retries, one call finishes the download by resuming.
+    """
+    archive = str(tmp_path / "data.zip")
+    server.cut_after = 50_000
+    res = ul.download(server.url, archive, chunk_bytes=4096, retries=1)
+    assert res["resumed"]
+    with open(archive, "rb") as file:
+        assert file.read() == server.payload
+
+
+def test_checksum_mismatch(server, tmp_path):
+    """
+    An archive with the wrong checksum is rejected and not kept.
+    """
+    archive = str(tmp_path / "data.zip")
+    with pytest.raises(ValueError):
+        ul.download(server.url, archive, expected_sha256="0" * 64)
+    assert not os.path.exists(archive)
+    assert not os.path.exists(f"{archive}.part")
+
+
+def test_extract_from_url(server, tmp_path):
+    """
+    Only the workbook is extracted, and only when it changed.
+    """
+    assert ul.extract_from_url(server.url, str(tmp_path)) == 200
+    assert not (tmp_path / "README.txt").exists()
+    workbook = tmp_path / ul.WORKBOOK
+    mtime = workbook.stat().st_mtime_ns
+    assert ul.extract_from_url(server.url, str(tmp_path)) == 200
+    assert workbook.stat().st_mtime_ns == mtime
+    assert not ul.extract_workbook(str(tmp_path / "online+retail+ii.zip"), str(tmp_path))
+
+
+def test_archive_rehashed_only_when_changed(server, tmp_path, monkeypatch):
+    """
+    Revalidation trusts the recorded size and mtime, and hashes the
+    archive again only after they change.
+    """
+    archive = str(tmp_path / "data.zip")
+    ul.download(server.url, archive)
+    hashed = []
+    file_sha256 = ul.file_sha256
+    monkeypatch.setattr(ul, "file_sha256", lambda path: hashed.append(path)
+                        or file_sha256(path))
+    assert ul.download(server.url, archive)["status"] == 304
+    assert hashed == []
+    os.utime(archive, ns=(0, 0))
+    assert ul.download(server.url, archive)["status"] == 304
+    assert hashed == [archive]
+    assert ul.download(server.url, archive)["status"] == 304
+    assert hashed == [archive]
+    with open(archive, "r+b") as file:
+        file.write(b"corrupt")
+    os.utime(archive, ns=(1, 1))
+    assert ul.download(server.url, archive)["status"] == 200